@@ -0,0 +1,147 @@
+# action_log.py
+
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from . import metrics
+
+# --- Logging Configuration ---
+# Actions log structured events (an event name plus fields such as action, sender and latency_ms)
+# instead of print(). Records go onto a bounded in-memory queue and a listener thread formats and
+# writes them, so a log call on the request path costs one queue put and never waits on stdout.
+ACTION_LOG_CONFIG = {
+    "level": os.environ.get("ACTION_LOG_LEVEL", "INFO").upper(),
+    # Share of turns whose DEBUG events are kept when the level is DEBUG; a kept turn keeps all of them
+    "debug_sample_rate": float(os.environ.get("ACTION_LOG_DEBUG_SAMPLE_RATE", 0.01)),
+    "format": os.environ.get("ACTION_LOG_FORMAT", "json"), # json (one object per line) or text
+    "queue_size": int(os.environ.get("ACTION_LOG_QUEUE_SIZE", 10000)), # Records beyond this are dropped and counted
+    "slow_action_ms": float(os.environ.get("ACTION_LOG_SLOW_MS", 2000)), # Slower actions are logged as warnings
+}
+
+_logger = logging.getLogger("actions")
+_context = threading.local()
+
+
+# --- Per-Turn Context ---
+def begin_action(action, sender):
+    """Adds action and sender to every event logged on this thread, and decides whether this turn's DEBUG events are kept."""
+    _context.fields = {"action": action, "sender": sender}
+    rate = ACTION_LOG_CONFIG["debug_sample_rate"]
+    _context.sampled = rate >= 1 or random.random() < rate
+
+def end_action():
+    _context.fields = None
+    _context.sampled = None
+
+
+# --- Logging Calls ---
+def _log(level, event, fields, exc_info=None):
+    context = getattr(_context, "fields", None)
+    if context:
+        fields = {**context, **fields}
+    if exc_info:
+        exc_info = sys.exc_info()
+    # makeRecord() skips the caller lookup logger.log() does; the event name says where it came from
+    _logger.handle(_logger.makeRecord(_logger.name, level, "(actions)", 0, event, (), exc_info,
+                                      extra={"fields": fields}))
+
+def debug(event, **fields):
+    """Kept only at level DEBUG and only in sampled turns; pass raw values, formatting happens off the request path."""
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
+    sampled = getattr(_context, "sampled", None)
+    if sampled is None: # Outside an action each event is sampled on its own
+        sampled = random.random() < ACTION_LOG_CONFIG["debug_sample_rate"]
+    if sampled:
+        _log(logging.DEBUG, event, fields)
+
+def info(event, **fields):
+    if _logger.isEnabledFor(logging.INFO):
+        _log(logging.INFO, event, fields)
+
+def warning(event, **fields):
+    if _logger.isEnabledFor(logging.WARNING):
+        _log(logging.WARNING, event, fields)
+
+def error(event, **fields):
+    if _logger.isEnabledFor(logging.ERROR):
+        _log(logging.ERROR, event, fields)
+
+def exception(event, **fields):
+    """Like error(), with the traceback of the exception being handled (formatted by the listener thread)."""
+    if _logger.isEnabledFor(logging.ERROR):
+        _log(logging.ERROR, event, fields, exc_info=True)
+
+
+# --- Formatting (listener thread) ---
+def _timestamp(record):
+    return datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, event, then the event's fields."""
+
+    def format(self, record):
+        entry = {"ts": _timestamp(record), "level": record.levelname, "event": record.getMessage()}
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str) # Dates, timedeltas and Decimals from MySQL rows
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development: ts LEVEL event key=value ..."""
+
+    def format(self, record):
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{_timestamp(record)} {record.levelname:<7} {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enqueues records untouched and drops them when the queue is full, instead of blocking the action."""
+
+    def prepare(self, record):
+        return record # The default formats the message and traceback here, on the request path
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_RECORDS_DROPPED.inc(record.levelname)
+
+
+# --- Setup ---
+_listener = None
+_listener_lock = threading.Lock()
+
+def configure():
+    """Routes the actions logger through the queue to a stdout writer thread; safe to call more than once."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(TextFormatter() if ACTION_LOG_CONFIG["format"] == "text" else StructuredFormatter())
+        log_queue = queue.Queue(maxsize=ACTION_LOG_CONFIG["queue_size"])
+        _logger.handlers[:] = [_NonBlockingQueueHandler(log_queue)]
+        _logger.setLevel(ACTION_LOG_CONFIG["level"])
+        _logger.propagate = False # Handlers on the root logger would format each record again, synchronously
+        _listener = QueueListener(log_queue, output)
+        _listener.start()
+        atexit.register(_flush)
+
+def _flush():
+    try:
+        _listener.stop() # Writes out what is still queued
+    except queue.Full:
+        pass
+
+configure()
@@ -5,87 +5,89 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, UserUtteranceReverted
 import mysql.connector
-import traceback # For detailed error logging
 import datetime
-
-# --- Database Connection Configuration ---
-# !!! IMPORTANT: Replace with your actual database credentials !!!
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",          # Replace with your MySQL username
-    "password": "Rp@25093",  # Replace with your MySQL password
-    "database": "railway_chatbot" # Replace with your database name
-}
-
-def connect_db():
-    """Establishes a connection to the MySQL database."""
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        # Setting autocommit might be useful for simple actions, but manage transactions explicitly if needed
-        # conn.autocommit = True # Uncomment if you prefer autocommit for simple operations
-        return conn
-    except mysql.connector.Error as err:
-        print(f"ERROR connecting to MySQL: {err}")
-        traceback.print_exc() # Print full traceback for connection errors
-        return None
-
-# --- Helper Function for Closing DB Resources ---
-def close_db_resources(cursor=None, conn=None):
-    """Safely closes cursor and connection."""
-    if cursor:
-        try:
-            cursor.close()
-        except Exception as e:
-            print(f"Warning: Error closing cursor: {e}")
-    if conn and conn.is_connected():
-        try:
-            conn.close()
-        except Exception as e:
-            print(f"Warning: Error closing connection: {e}")
+from .db import connect_db, close_db_resources # Pooled connections, see db.py
+from .db import DatabaseUnavailableError
+from . import action_log # Queued, sampled structured logging, see action_log.py
+from . import queries # Named prepared statements, see queries.py
+from .executor import OffloadedActionMixin # Runs blocking DB work off the event loop, see executor.py
+from .train_cache import train_cache # Read-through cache for train_details, see train_cache.py
+from .search_index import search_indexes # In-memory route/station search, see search_index.py
+from .station_resolver import station_resolver # Fuzzy station/place names, see station_resolver.py
+
+# --- Formatting Helpers ---
+
+def format_departure_time(raw_timings_value, train_number=None):
+    """Formats a raw TIME value (timedelta, time or 'HH:MM:SS' string) as HH:MM."""
+    departure_time_display = "N/A"
+    if raw_timings_value is not None: # A 00:00 departure is a falsy timedelta
+        if isinstance(raw_timings_value, (datetime.time, datetime.timedelta)):
+            try:
+                if hasattr(raw_timings_value, 'seconds'): # timedelta
+                    hours = raw_timings_value.seconds // 3600
+                    minutes = (raw_timings_value.seconds // 60) % 60
+                    departure_time_display = f"{hours:02d}:{minutes:02d}"
+                elif hasattr(raw_timings_value, 'hour'): # datetime.time
+                    departure_time_display = raw_timings_value.strftime('%H:%M')
+            except Exception as fmt_err:
+                action_log.warning("could not format timings", train_number=train_number, timings=raw_timings_value, error=fmt_err)
+                departure_time_display = str(raw_timings_value)
+        elif isinstance(raw_timings_value, str):
+            try:
+                parts = raw_timings_value.split(':')
+                if len(parts) >= 2:
+                    departure_time_display = f"{parts[0].zfill(2)}:{parts[1].zfill(2)}"
+            except Exception as parse_err:
+                action_log.warning("could not parse timings", train_number=train_number, timings=raw_timings_value, error=parse_err)
+                departure_time_display = raw_timings_value
+        else:
+            departure_time_display = str(raw_timings_value)
+    return departure_time_display
+
+# --- Paging Helpers ---
+# Long results are shown a page at a time, and only that page (plus one probe row, or a count the
+# route index already knows) is read from the database. Where the last page stopped is kept in the
+# page_cursor slot as "<listing>:<position>", and action_next_page ("next page") continues it.
+
+PAGE_CURSOR_SLOT = "page_cursor"
+
+def encode_page_cursor(listing, position):
+    return f"{listing}:{position}"
+
+def decode_page_cursor(value):
+    """Returns (listing, position) from a page_cursor value, or (None, None)."""
+    listing, sep, position = (value or "").partition(":")
+    return (listing, position) if sep and position else (None, None)
 
 # --- Action Classes ---
 
 # actions.py
-# ... (DB_CONFIG, connect_db, close_db_resources remain the same) ...
+# ... (DB_CONFIG, connect_db, close_db_resources live in db.py) ...
+
+class ActionGetTrainStatus(OffloadedActionMixin, Action):
+    reset_slots = ["train_number"]
 
-class ActionGetTrainStatus(Action):
     def name(self) -> Text:
         return "action_get_train_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         train_number = tracker.get_slot("train_number")
-        conn = None
-        cursor = None
 
         if not train_number:
             dispatcher.utter_message(text="Please provide a train number.")
             return [SlotSet("train_number", None)]
 
-        conn = connect_db()
-        if not conn:
-            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the railway database right now.")
-            return [SlotSet("train_number", None)]
-
         try:
-            cursor = conn.cursor(dictionary=True)
-            # Fetch the raw 'timings' column
-            query = """
-                SELECT train_number, from_location, to_location,
-                       timings, status  # <-- Fetch raw timings
-                FROM train_details
-                WHERE train_number = %s
-            """
-            cursor.execute(query, (train_number,))
-            train = cursor.fetchone()
+            # Row includes the raw 'timings' column; only reaches MySQL on a cache miss
+            train = train_cache.get_train(train_number)
 
             if train:
                 raw_timings_value = train.get('timings')
-                print(f"DEBUG in action_get_train_status: train_number='{train_number}' -> "
-                      f"RAW train['timings'] = {raw_timings_value}, "
-                      f"type = {type(raw_timings_value)}")
+                action_log.debug("train row", train_number=train_number, timings=raw_timings_value,
+                                 timings_type=type(raw_timings_value).__name__)
 
                 departure_display = "N/A"
                 if raw_timings_value is not None:
@@ -99,7 +101,7 @@ class ActionGetTrainStatus(Action):
                             if len(parts) >= 2:
                                 departure_display = f"{parts[0].zfill(2)}:{parts[1].zfill(2)}"
                         except Exception as time_parse_err:
-                            print(f"ERROR parsing time string '{raw_timings_value}': {time_parse_err}")
+                            action_log.warning("could not parse timings", timings=raw_timings_value, error=time_parse_err)
                             departure_display = "Error: Invalid time"
                     elif hasattr(raw_timings_value, 'hours') and hasattr(raw_timings_value, 'minutes'):
                         # Handles datetime.timedelta (common for TIME type from mysql.connector)
@@ -110,7 +112,7 @@ class ActionGetTrainStatus(Action):
                             minutes = int(raw_timings_value.minutes)
                             departure_display = f"{hours:02d}:{minutes:02d}"
                         except (TypeError, ValueError) as time_conv_err:
-                             print(f"ERROR converting time object components for '{raw_timings_value}': {time_conv_err}")
+                             action_log.warning("could not convert timings", timings=raw_timings_value, error=time_conv_err)
                              departure_display = "Error: Invalid time obj"
                     else:
                         # Fallback if it's an unknown type but not None
@@ -128,35 +130,34 @@ class ActionGetTrainStatus(Action):
             
             dispatcher.utter_message(text=msg)
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()} for train {train_number}: {err}")
-            traceback.print_exc()
+        except DatabaseUnavailableError:
+            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the railway database right now.")
+        except mysql.connector.Error:
+            action_log.exception("database error", train_number=train_number)
             dispatcher.utter_message(text="Sorry, a database error occurred while fetching train status.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()} for train {train_number}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error", train_number=train_number)
             dispatcher.utter_message(text="An unexpected error occurred while fetching train status.")
-        finally:
-            close_db_resources(cursor, conn)
 
         return [SlotSet("train_number", None)]
         
 # actions.py
-# ... (DB_CONFIG, connect_db, close_db_resources remain the same) ...
+# ... (DB_CONFIG, connect_db, close_db_resources live in db.py) ...
 
 import datetime # Add this import for date/time formatting
 
-class ActionPnrStatus(Action):
+class ActionPnrStatus(OffloadedActionMixin, Action):
+    reset_slots = ["pnr_number"]
+
     def name(self) -> Text:
         return "action_pnr_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         pnr_number_str = tracker.get_slot("pnr_number")
         conn = None
-        cursor = None
 
         if not pnr_number_str:
             dispatcher.utter_message(text="Please provide your PNR number.")
@@ -176,29 +177,16 @@ class ActionPnrStatus(Action):
             return [SlotSet("pnr_number", None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
             # Fetch raw journey_date from ps and raw timings from td
-            query = """
-                SELECT ps.pnr_number, ps.seat_number,
-                       ps.journey_date,  -- Fetch raw journey_date
-                       ps.status AS pnr_ticket_status,
-                       td.train_number, td.from_location, td.to_location,
-                       td.timings as train_timings,      -- Fetch raw train timings
-                       td.status AS train_operational_status
-                FROM pnr_status ps
-                JOIN train_details td ON ps.train_number = td.train_number
-                WHERE ps.pnr_number = %s
-            """
-            cursor.execute(query, (pnr_number,))
-            pnr_details = cursor.fetchone()
+            pnr_details = queries.fetch_one(conn, "pnr_details", (pnr_number,))
 
             if pnr_details:
                 raw_journey_date = pnr_details.get('journey_date')
                 raw_train_timings = pnr_details.get('train_timings')
 
-                print(f"DEBUG in action_pnr_status: pnr='{pnr_number}'")
-                print(f"  -> RAW ps.journey_date from DB = {raw_journey_date}, type = {type(raw_journey_date)}")
-                print(f"  -> RAW td.timings from DB = {raw_train_timings}, type = {type(raw_train_timings)}")
+                action_log.debug("pnr row", pnr_number=pnr_number,
+                                 journey_date=raw_journey_date, journey_date_type=type(raw_journey_date).__name__,
+                                 timings=raw_train_timings, timings_type=type(raw_train_timings).__name__)
 
                 journey_date_display = "N/A"
                 if raw_journey_date:
@@ -206,7 +194,7 @@ class ActionPnrStatus(Action):
                         try:
                             journey_date_display = raw_journey_date.strftime('%d-%b-%Y') # e.g., 15-Aug-2024
                         except Exception as fmt_err:
-                            print(f"ERROR formatting journey_date object: {fmt_err}")
+                            action_log.warning("could not format journey_date", journey_date=raw_journey_date, error=fmt_err)
                             journey_date_display = str(raw_journey_date) # fallback
                     elif isinstance(raw_journey_date, str): # If it comes as a string "YYYY-MM-DD"
                         try:
@@ -230,7 +218,7 @@ class ActionPnrStatus(Action):
                             elif hasattr(raw_train_timings, 'hour'): # datetime.time
                                 departure_time_display = raw_train_timings.strftime('%H:%M')
                         except Exception as fmt_err:
-                            print(f"ERROR formatting train_timings object: {fmt_err}")
+                            action_log.warning("could not format timings", timings=raw_train_timings, error=fmt_err)
                             departure_time_display = str(raw_train_timings) # fallback
                     elif isinstance(raw_train_timings, str): # If it's "HH:MM:SS" string
                         try:
@@ -238,7 +226,7 @@ class ActionPnrStatus(Action):
                             if len(parts) >= 2:
                                 departure_time_display = f"{parts[0].zfill(2)}:{parts[1].zfill(2)}"
                         except Exception as parse_err:
-                             print(f"ERROR parsing train_timings string: {parse_err}")
+                             action_log.warning("could not parse timings", timings=raw_train_timings, error=parse_err)
                              departure_time_display = raw_train_timings
                     else:
                         departure_time_display = str(raw_train_timings)
@@ -256,34 +244,34 @@ class ActionPnrStatus(Action):
                 msg = f"Sorry, I couldn't find any details for PNR number {pnr_number}."
             dispatcher.utter_message(text=msg)
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()} for PNR {pnr_number}: {err}")
-            traceback.print_exc()
+        except mysql.connector.Error:
+            action_log.exception("database error", pnr_number=pnr_number)
             dispatcher.utter_message(text="Sorry, a database error occurred while fetching PNR status.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()} for PNR {pnr_number}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error", pnr_number=pnr_number)
             dispatcher.utter_message(text="An unexpected error occurred while fetching PNR status.")
         finally:
-            close_db_resources(cursor, conn)
+            close_db_resources(conn=conn)
 
         return [SlotSet("pnr_number", None)]
 
 # actions.py
-# ... (DB_CONFIG, connect_db, close_db_resources, other imports like datetime remain the same) ...
+# ... (DB_CONFIG, connect_db, close_db_resources live in db.py; other imports like datetime remain the same) ...
+
+class ActionFindTrains(OffloadedActionMixin, Action):
+    reset_slots = ["from_location", "to_location"]
+    listing = "route"
+    page_size = 10
 
-class ActionFindTrains(Action):
     def name(self) -> Text:
         return "action_find_trains"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         from_location = tracker.get_slot("from_location")
         to_location = tracker.get_slot("to_location")
-        conn = None
-        cursor = None
 
         if not from_location:
             # In your actions.py, you used dispatcher.utter_message(response="utter_ask_from_location")
@@ -295,99 +283,77 @@ class ActionFindTrains(Action):
             dispatcher.utter_message(response="utter_ask_to_location")
             return [SlotSet("from_location", None), SlotSet("to_location", None)] # Clear both if one is missing after prompt
 
-        conn = connect_db()
-        if not conn:
-            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the railway database right now.")
-            return [SlotSet("from_location", None), SlotSet("to_location", None)]
+        events = self.show_page(dispatcher, f"0|{from_location}|{to_location}")
+        return [SlotSet("from_location", None), SlotSet("to_location", None)] + events
 
+    def show_page(self, dispatcher: CollectingDispatcher, position) -> List[Dict[Text, Any]]:
+        """Shows page_size trains for the route in position ("<offset>|<from>|<to>")."""
+        offset, from_location, to_location = position.split("|", 2)
+        offset = int(offset)
+        next_cursor = None
         try:
-            cursor = conn.cursor(dictionary=True)
-            # Fetch raw 'timings' column
-            query = """
-                SELECT train_number, from_location, to_location,
-                       timings, status  -- Fetch raw timings
-                FROM train_details
-                WHERE LOWER(from_location) LIKE %s AND LOWER(to_location) LIKE %s
-                ORDER BY timings
-            """
-            param_from = f"%{from_location.lower()}%"
-            param_to = f"%{to_location.lower()}%"
-
-            cursor.execute(query, (param_from, param_to))
-            trains_data = cursor.fetchall() # Renamed to avoid conflict with train loop variable
+            # Rows (with raw 'timings') ordered by timings; only this page is fetched
+            trains_data, total = train_cache.find_trains_page(from_location, to_location, offset, self.page_size)
+            typed_route = (from_location, to_location)
+            if not total and offset == 0:
+                # Nothing matched as typed; retry with the closest known places (e.g. "Mumbia" -> "mumbai")
+                resolved_from = station_resolver.resolve_location(from_location) or from_location
+                resolved_to = station_resolver.resolve_location(to_location) or to_location
+                if (resolved_from, resolved_to) != (from_location.lower(), to_location.lower()):
+                    trains_data, total = train_cache.find_trains_page(resolved_from, resolved_to, 0, self.page_size)
+                    if total:
+                        from_location, to_location = resolved_from, resolved_to
 
             if trains_data:
                 messages = [f"Trains from {from_location.title()} to {to_location.title()}:"]
-                limit = 10
-                for i, train_row in enumerate(trains_data): # Use train_row for clarity
-                    if i >= limit:
-                        messages.append(f"\n(Showing first {limit} of {len(trains_data)} trains found...)")
-                        break
-                    
+                if (from_location, to_location) != typed_route:
+                    messages.append(f"(Closest match for '{typed_route[0]}' to '{typed_route[1]}')")
+                for train_row in trains_data: # Use train_row for clarity
                     raw_timings_value = train_row.get('timings')
-                    # --- DEBUG PRINT for this specific action ---
-                    print(f"DEBUG in action_find_trains: train='{train_row.get('train_number')}' -> "
-                          f"RAW timings = {raw_timings_value}, type = {type(raw_timings_value)}")
-                    # --- END DEBUG PRINT ---
-
-                    departure_time_display = "N/A"
-                    if raw_timings_value:
-                        if isinstance(raw_timings_value, (datetime.time, datetime.timedelta)):
-                            try:
-                                if hasattr(raw_timings_value, 'seconds'): # timedelta
-                                    hours = raw_timings_value.seconds // 3600
-                                    minutes = (raw_timings_value.seconds // 60) % 60
-                                    departure_time_display = f"{hours:02d}:{minutes:02d}"
-                                elif hasattr(raw_timings_value, 'hour'): # datetime.time
-                                    departure_time_display = raw_timings_value.strftime('%H:%M')
-                            except Exception as fmt_err:
-                                print(f"ERROR formatting timings object for train '{train_row.get('train_number')}': {fmt_err}")
-                                departure_time_display = str(raw_timings_value)
-                        elif isinstance(raw_timings_value, str):
-                            try:
-                                parts = raw_timings_value.split(':')
-                                if len(parts) >= 2:
-                                    departure_time_display = f"{parts[0].zfill(2)}:{parts[1].zfill(2)}"
-                            except Exception as parse_err:
-                                print(f"ERROR parsing timings string for train '{train_row.get('train_number')}': {parse_err}")
-                                departure_time_display = raw_timings_value
-                        else:
-                            departure_time_display = str(raw_timings_value)
+                    action_log.debug("train row", train_number=train_row.get('train_number'),
+                                     timings=raw_timings_value, timings_type=type(raw_timings_value).__name__)
+
+                    departure_time_display = format_departure_time(raw_timings_value, train_row.get('train_number'))
 
                     part = (
                         f"- Train {train_row.get('train_number', 'N/A')}: Departs at {departure_time_display}, Status: {train_row.get('status', 'N/A')}"
                     )
                     messages.append(part)
+                shown = offset + len(trains_data)
+                if shown < total:
+                    next_cursor = encode_page_cursor(self.listing, f"{shown}|{from_location}|{to_location}")
+                    messages.append(f"\n(Showing {offset + 1}-{shown} of {total} trains found. Say 'next page' for more.)")
                 dispatcher.utter_message(text="\n".join(messages))
+            elif offset:
+                dispatcher.utter_message(text=f"No more trains from '{from_location.title()}' to '{to_location.title()}'.")
             else:
                 dispatcher.utter_message(text=f"Sorry, I couldn't find any direct trains matching '{from_location.title()}' to '{to_location.title()}'.")
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+        except DatabaseUnavailableError:
+            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the railway database right now.")
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="Sorry, a database error occurred while searching for trains.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while searching for trains.")
-        finally:
-            close_db_resources(cursor, conn)
 
-        return [SlotSet("from_location", None), SlotSet("to_location", None)]
+        return [SlotSet(PAGE_CURSOR_SLOT, next_cursor)]
 
 
-class ActionTrainFare(Action):
+class ActionTrainFare(OffloadedActionMixin, Action):
+    reset_slots = ["train_number", "travel_class"]
+
     def name(self) -> Text:
         return "action_train_fare"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         train_number = tracker.get_slot("train_number")
         travel_class = tracker.get_slot("travel_class")
         conn = None
-        cursor = None
 
         # Allow context from find_trains if needed, but prioritize explicit requests
         # Example: Could check tracker.latest_action_name == "action_find_trains"
@@ -410,20 +376,11 @@ class ActionTrainFare(Action):
             return [SlotSet("train_number", None), SlotSet("travel_class", None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
             # Assuming train_fare table stores fare for specific train and class
-            # JOIN on train_details might not be needed if fare table has all info,
-            # but kept here for potential route validation if schema requires it.
-            query = """
-                SELECT tf.class, tf.fare
-                FROM train_fare tf
-                WHERE tf.train_number = %s AND LOWER(tf.class) LIKE %s
-            """
             # Prepare parameter for class search (case-insensitive)
             class_search_term = f"%{travel_class.lower()}%"
 
-            cursor.execute(query, (train_number, class_search_term))
-            fares = cursor.fetchall()
+            fares = queries.fetch_all(conn, "train_fares", (train_number, class_search_term))
 
             if fares:
                 messages = [f"Fares for train {train_number}:"]
@@ -440,38 +397,37 @@ class ActionTrainFare(Action):
                 dispatcher.utter_message(text="\n".join(messages))
             else:
                 # Check if the train exists at all to give a better message
-                cursor.execute("SELECT 1 FROM train_details WHERE train_number = %s", (train_number,))
-                train_exists = cursor.fetchone()
+                train_exists = queries.fetch_one(conn, "train_exists", (train_number,))
                 if train_exists:
                     dispatcher.utter_message(text=f"Sorry, I couldn't find {travel_class.title()} class fare information for train {train_number}. It might not exist or the class name is different.")
                 else:
                     dispatcher.utter_message(text=f"Sorry, I couldn't find train {train_number} to check fares.")
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="Sorry, a database error occurred while fetching train fares.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while fetching train fares.")
         finally:
-            close_db_resources(cursor, conn)
+            close_db_resources(conn=conn)
 
         return [SlotSet("train_number", None), SlotSet("travel_class", None)]
 
 
-class ActionBookingHistory(Action):
+class ActionBookingHistory(OffloadedActionMixin, Action):
+    reset_slots = ["user_id"]
+    listing = "bookings"
+    page_size = 5
+
     def name(self) -> Text:
         return "action_booking_history"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         user_id_str = tracker.get_slot("user_id")
-        conn = None
-        cursor = None
 
         if not user_id_str:
             dispatcher.utter_message(response="utter_ask_user_id")
@@ -485,56 +441,42 @@ class ActionBookingHistory(Action):
             dispatcher.utter_message(text=f"Invalid User ID provided. {ve}")
             return [SlotSet("user_id", None)]
 
+        return [SlotSet("user_id", None)] + self.show_page(dispatcher, f"{user_id}|0")
+
+    def show_page(self, dispatcher: CollectingDispatcher, position) -> List[Dict[Text, Any]]:
+        """Shows page_size bookings for the user in position ("<user_id>|<offset>"), newest journey first."""
+        user_id, offset = (int(part) for part in position.split("|", 1))
+        conn = None
+        next_cursor = None
+
         conn = connect_db()
         if not conn:
             dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
-            return [SlotSet("user_id", None)]
+            return [SlotSet(PAGE_CURSOR_SLOT, None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
             # 1. Get user's name
-            cursor.execute("SELECT name FROM user_details WHERE user_id = %s", (user_id,))
-            user = cursor.fetchone()
+            user = queries.fetch_one(conn, "user_name", (user_id,))
             if not user:
                 dispatcher.utter_message(text=f"Sorry, I couldn't find a user with ID {user_id}.")
-                close_db_resources(cursor, conn)
-                return [SlotSet("user_id", None)]
+                return [SlotSet(PAGE_CURSOR_SLOT, None)]
             user_name = user['name']
 
-            # 2. Get booking history - Fetch RAW dates
-            query = """
-                SELECT bh.pnr_number,
-                       bh.booking_date,      -- Fetch raw booking_date
-                       ps.journey_date,      -- Fetch raw journey_date
-                       ps.seat_number, ps.status AS pnr_ticket_status,
-                       td.train_number, td.from_location, td.to_location
-                       -- td.timings is not used in the original message, so not fetching here
-                       -- td.status AS train_operational_status -- also not used in original message
-                FROM booking_history bh
-                JOIN pnr_status ps ON bh.pnr_number = ps.pnr_number
-                JOIN train_details td ON ps.train_number = td.train_number
-                WHERE bh.user_id = %s
-                ORDER BY ps.journey_date DESC, bh.booking_date DESC
-            """
-            cursor.execute(query, (user_id,))
-            bookings_data = cursor.fetchall() # Renamed to avoid conflict
+            # 2. Get one page of booking history - Fetch RAW dates
+            # One row past the page tells us whether there are older bookings, without counting them all
+            bookings_data = queries.fetch_all(conn, "booking_history_page", (user_id, self.page_size + 1, offset))
+            has_more = len(bookings_data) > self.page_size
+            bookings_data = bookings_data[:self.page_size]
 
             if bookings_data:
                 messages = [f"Booking history for {user_name} (User ID: {user_id}):"]
-                limit = 5
-                for i, booking_row in enumerate(bookings_data): # Use booking_row for clarity
-                    if i >= limit:
-                        messages.append(f"\n(Showing latest {limit} of {len(bookings_data)} bookings...)")
-                        break
-                    
+                for booking_row in bookings_data: # Use booking_row for clarity
                     raw_booking_date = booking_row.get('booking_date')
                     raw_journey_date = booking_row.get('journey_date')
 
-                    # --- DEBUG PRINTS for this specific action ---
-                    print(f"DEBUG in action_booking_history: PNR='{booking_row.get('pnr_number')}'")
-                    print(f"  -> RAW booking_date = {raw_booking_date}, type = {type(raw_booking_date)}")
-                    print(f"  -> RAW journey_date = {raw_journey_date}, type = {type(raw_journey_date)}")
-                    # --- END DEBUG PRINTS ---
+                    action_log.debug("booking row", pnr_number=booking_row.get('pnr_number'),
+                                     booking_date=raw_booking_date, booking_date_type=type(raw_booking_date).__name__,
+                                     journey_date=raw_journey_date, journey_date_type=type(raw_journey_date).__name__)
 
                     booking_date_display = "N/A"
                     if raw_booking_date:
@@ -542,7 +484,7 @@ class ActionBookingHistory(Action):
                             try:
                                 booking_date_display = raw_booking_date.strftime('%d-%b-%Y')
                             except Exception as fmt_err:
-                                print(f"ERROR formatting booking_date object: {fmt_err}")
+                                action_log.warning("could not format booking_date", booking_date=raw_booking_date, error=fmt_err)
                                 booking_date_display = str(raw_booking_date)
                         elif isinstance(raw_booking_date, str):
                             try:
@@ -557,7 +499,7 @@ class ActionBookingHistory(Action):
                             try:
                                 journey_date_display = raw_journey_date.strftime('%d-%b-%Y')
                             except Exception as fmt_err:
-                                print(f"ERROR formatting journey_date object: {fmt_err}")
+                                action_log.warning("could not format journey_date", journey_date=raw_journey_date, error=fmt_err)
                                 journey_date_display = str(raw_journey_date)
                         elif isinstance(raw_journey_date, str):
                             try:
@@ -571,36 +513,42 @@ class ActionBookingHistory(Action):
                         f"  Train: {booking_row.get('train_number', 'N/A')} ({booking_row.get('from_location', 'N/A')} to {booking_row.get('to_location', 'N/A')})\n"
                         f"  Seat: {booking_row.get('seat_number', 'N/A')}, Status: {booking_row.get('pnr_ticket_status', 'N/A')}"
                     )
+                if has_more:
+                    shown = offset + len(bookings_data)
+                    next_cursor = encode_page_cursor(self.listing, f"{user_id}|{shown}")
+                    messages.append(f"\n(Showing bookings {offset + 1}-{shown}. Say 'next page' for older bookings.)")
                 dispatcher.utter_message(text="\n".join(messages))
+            elif offset:
+                dispatcher.utter_message(text=f"No older bookings found for User ID {user_id} ({user_name}).")
             else:
                 dispatcher.utter_message(text=f"No booking history found for User ID {user_id} ({user_name}).")
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()} for user {user_id}: {err}")
-            traceback.print_exc()
+        except mysql.connector.Error:
+            action_log.exception("database error", user_id=user_id)
             dispatcher.utter_message(text="Sorry, a database error occurred while fetching booking history.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()} for user {user_id}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error", user_id=user_id)
             dispatcher.utter_message(text="An unexpected error occurred while fetching booking history.")
         finally:
-            close_db_resources(cursor, conn)
+            close_db_resources(conn=conn)
 
-        return [SlotSet("user_id", None)]
+        return [SlotSet(PAGE_CURSOR_SLOT, next_cursor)]
 
 # ... (Other action classes) ...
 
-class ActionCancelTicket(Action):
+class ActionCancelTicket(OffloadedActionMixin, Action):
+    reset_slots = ["pnr_number_to_cancel"]
+    timeout_message = "Sorry, I couldn't confirm the cancellation in time. Please check the PNR status before trying again."
+
     def name(self) -> Text:
         return "action_cancel_ticket"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         pnr_number_str = tracker.get_slot("pnr_number_to_cancel")
         conn = None
-        cursor = None
 
         if not pnr_number_str:
             dispatcher.utter_message(response="utter_ask_pnr_to_cancel") # Use domain utterance
@@ -621,12 +569,10 @@ class ActionCancelTicket(Action):
             return [SlotSet("pnr_number_to_cancel", None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
             conn.start_transaction() # Start transaction for update
 
             # Check current status
-            cursor.execute("SELECT status FROM pnr_status WHERE pnr_number = %s FOR UPDATE", (pnr_number,)) # Lock row
-            pnr_info = cursor.fetchone()
+            pnr_info = queries.fetch_one(conn, "pnr_status_for_update", (pnr_number,)) # Lock row
 
             if not pnr_info:
                 dispatcher.utter_message(text=f"Sorry, PNR number {pnr_number} was not found.")
@@ -645,10 +591,7 @@ class ActionCancelTicket(Action):
             #     return [SlotSet("pnr_number_to_cancel", None)]
 
             # Perform update
-            update_query = "UPDATE pnr_status SET status = 'Cancelled' WHERE pnr_number = %s"
-            cursor.execute(update_query, (pnr_number,))
-
-            if cursor.rowcount > 0:
+            if queries.execute(conn, "cancel_pnr", (pnr_number,)) > 0:
                 conn.commit() # Commit transaction
                 # Optionally: Log cancellation action here
                 msg = f"PNR number {pnr_number} has been successfully cancelled."
@@ -658,34 +601,33 @@ class ActionCancelTicket(Action):
                 msg = f"Could not cancel PNR {pnr_number}. An unexpected issue occurred (possibly already cancelled by another process)."
             dispatcher.utter_message(text=msg)
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+        except mysql.connector.Error:
+            action_log.exception("database error")
             if conn: conn.rollback() # Rollback on error
             dispatcher.utter_message(text="Sorry, a database error occurred while trying to cancel the ticket.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             if conn: conn.rollback() # Rollback on error
             dispatcher.utter_message(text="An unexpected error occurred during cancellation.")
         finally:
-            close_db_resources(cursor, conn)
+            close_db_resources(conn=conn)
 
         return [SlotSet("pnr_number_to_cancel", None)]
 
 
-class ActionAskStationInfo(Action):
+class ActionAskStationInfo(OffloadedActionMixin, Action):
+    reset_slots = ["station_identifier"]
+
     def name(self) -> Text:
         # Ensure this EXACT name is in domain.yml -> actions:
         return "action_ask_station_info"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         station_identifier = tracker.get_slot("station_identifier")
         conn = None
-        cursor = None
 
         if not station_identifier:
             dispatcher.utter_message(response="utter_ask_station_identifier") # Use domain utterance
@@ -697,20 +639,16 @@ class ActionAskStationInfo(Action):
             return [SlotSet("station_identifier", None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
-            # Query a hypothetical 'stations' table by name or code
+            # Resolve the name or code with the in-memory station index, then fetch by primary key
             # Assumes columns: station_code, station_name, details, state
-            query = """
-                SELECT station_code, station_name, details, state
-                FROM stations
-                WHERE LOWER(station_name) LIKE %s OR LOWER(station_code) = LOWER(%s)
-            """
-            # Prepare parameters for LIKE and exact match
-            name_param = f"%{station_identifier.lower()}%"
-            code_param = station_identifier.lower()
-
-            cursor.execute(query, (name_param, code_param))
-            station_info = cursor.fetchone() # Assuming name/code is unique enough to fetch one
+            station_codes = search_indexes.stations().find_station_codes(station_identifier)
+            if not station_codes:
+                # Misspelt names ("Mumbia", "Secundrabad") go through the fuzzy resolver
+                station_codes = [match.station_code for match in station_resolver.resolve_station(station_identifier, k=1)]
+            station_info = None
+            if station_codes:
+                # Exact code match first, else first name match
+                station_info = queries.fetch_one(conn, "station_by_code", (station_codes[0],))
 
             if station_info:
                 details = station_info.get('details') or "No specific details available."
@@ -723,172 +661,192 @@ class ActionAskStationInfo(Action):
             else:
                 dispatcher.utter_message(text=f"Sorry, I couldn't find information for station '{station_identifier}'. Please check the name or code.")
 
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="Sorry, a database error occurred while fetching station information.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while fetching station information.")
         finally:
-            close_db_resources(cursor, conn)
+            close_db_resources(conn=conn)
 
         return [SlotSet("station_identifier", None)]
 
 # --- Admin/Listing Actions ---
 
-class ActionListAllTrains(Action):
+class ActionListAllTrains(OffloadedActionMixin, Action):
+    listing = "trains"
+    page_size = 15
+
     def name(self) -> Text:
         return "action_list_all_trains"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-
-        conn = None
-        cursor = None
-        conn = connect_db()
-        if not conn:
-            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
-            return []
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        return self.show_page(dispatcher, after=None)
 
+    def show_page(self, dispatcher: CollectingDispatcher, after=None) -> List[Dict[Text, Any]]:
+        next_cursor = None
         try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT train_number, from_location, to_location, TIME_FORMAT(timings, '%%H:%%i') as departure_time, status FROM train_details ORDER BY train_number")
-            results = cursor.fetchall()
+            results, has_more = train_cache.list_trains_page(after, self.page_size)
 
             if results:
-                messages = ["Available Trains (showing a sample):"]
-                limit = 15
-                for i, row in enumerate(results):
-                     if i >= limit:
-                        messages.append(f"\n(Showing first {limit} of {len(results)} trains...)")
-                        break
-                     messages.append(f"- Train {row['train_number']}: {row['from_location']} → {row['to_location']} @ {row['departure_time']}, Status: {row['status']}")
+                messages = ["Available Trains:" if after is None else "More Trains:"]
+                for row in results:
+                    departure_time = format_departure_time(row['timings'], row['train_number'])
+                    messages.append(f"- Train {row['train_number']}: {row['from_location']} → {row['to_location']} @ {departure_time}, Status: {row['status']}")
+                if has_more:
+                    next_cursor = encode_page_cursor(self.listing, results[-1]['train_number'])
+                    messages.append("\n(Say 'next page' to see more trains.)")
                 dispatcher.utter_message(text="\n".join(messages))
             else:
-                dispatcher.utter_message(text="No trains found in the database.")
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+                dispatcher.utter_message(text="No trains found in the database." if after is None else "No more trains to show.")
+        except DatabaseUnavailableError:
+            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="An error occurred while listing trains.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while listing trains.")
-        finally:
-            close_db_resources(cursor, conn)
-        return []
+        return [SlotSet(PAGE_CURSOR_SLOT, next_cursor)]
+
+class ActionListAllUserDetails(OffloadedActionMixin, Action):
+    listing = "users"
+    page_size = 10
 
-class ActionListAllUserDetails(Action):
     def name(self) -> Text:
         return "action_list_all_user_details"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        return self.show_page(dispatcher, after=None)
 
+    def show_page(self, dispatcher: CollectingDispatcher, after=None) -> List[Dict[Text, Any]]:
         # !! SECURITY WARNING !! Highly sensitive action. Restrict access severely in production.
-        print("WARNING: Executing sensitive action 'action_list_all_user_details'")
+        action_log.warning("sensitive action executed")
 
         conn = None
-        cursor = None
+        next_cursor = None
         conn = connect_db()
         if not conn:
             dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
-            return []
+            return [SlotSet(PAGE_CURSOR_SLOT, None)]
 
         try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT user_id, name, email_id, phone_number FROM user_details ORDER BY user_id")
-            results = cursor.fetchall()
+            # One row past the page tells us whether there is a next page
+            if after is None:
+                results = queries.fetch_all(conn, "users_page_first", (self.page_size + 1,))
+            else:
+                results = queries.fetch_all(conn, "users_page_after", (after, self.page_size + 1))
+            has_more = len(results) > self.page_size
+            results = results[:self.page_size]
 
             if results:
-                messages = ["User Details (Admin View - Limited Sample):"]
-                limit = 10
-                for i, row in enumerate(results):
-                    if i >= limit:
-                        messages.append(f"\n(Showing first {limit} of {len(results)} users...)")
-                        break
+                messages = ["User Details (Admin View):" if after is None else "More User Details (Admin View):"]
+                for row in results:
                     # Basic masking for demo - consider more robust masking/logging
                     email_parts = row['email_id'].split('@') if row['email_id'] else ['','']
                     masked_email = f"{email_parts[0][:2]}...@{'...' if len(email_parts)<2 else email_parts[1]}"
                     phone = row['phone_number'] or ''
                     masked_phone = f"...{phone[-4:]}" if len(phone) > 4 else phone
                     messages.append(f"- ID: {row['user_id']}, Name: {row['name']}, Email: {masked_email}, Phone: {masked_phone}")
+                if has_more:
+                    next_cursor = encode_page_cursor(self.listing, results[-1]['user_id'])
+                    messages.append("\n(Say 'next page' to see more users.)")
                 messages.append("\nNote: Displaying user details is a security risk.")
                 dispatcher.utter_message(text="\n".join(messages))
             else:
-                dispatcher.utter_message(text="No user details found.")
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+                dispatcher.utter_message(text="No user details found." if after is None else "No more users to show.")
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="An error occurred while listing user details.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while listing user details.")
         finally:
-            close_db_resources(cursor, conn)
-        return []
+            close_db_resources(conn=conn)
+        return [SlotSet(PAGE_CURSOR_SLOT, next_cursor)]
+
+class ActionSearchTrainsBySource(OffloadedActionMixin, Action):
+    reset_slots = ["from_location"]
+    listing = "source"
+    page_size = 15
 
-class ActionSearchTrainsBySource(Action):
     def name(self) -> Text:
         return "action_search_trains_by_source"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         source = tracker.get_slot("from_location")
-        conn = None
-        cursor = None
 
         if not source:
             dispatcher.utter_message(text="Please specify the source station to search from.")
             return [SlotSet("from_location", None)]
 
-        conn = connect_db()
-        if not conn:
-            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
-            return [SlotSet("from_location", None)]
+        return [SlotSet("from_location", None)] + self.show_page(dispatcher, f"0|{source}")
 
+    def show_page(self, dispatcher: CollectingDispatcher, position) -> List[Dict[Text, Any]]:
+        """Shows page_size trains for the source in position ("<offset>|<source>")."""
+        offset, source = position.split("|", 1)
+        offset = int(offset)
+        next_cursor = None
         try:
-            cursor = conn.cursor(dictionary=True)
-            query = """
-                SELECT train_number, from_location, to_location,
-                       TIME_FORMAT(timings, '%%H:%%i') as departure_time, status
-                FROM train_details
-                WHERE LOWER(from_location) LIKE %s
-                ORDER BY timings
-            """
-            search_term = f"%{source.lower()}%"
-            cursor.execute(query, (search_term,))
-            results = cursor.fetchall()
+            # Source-only search, ordered by timings; only this page is fetched
+            results, total = train_cache.find_trains_page(source, None, offset, self.page_size)
+            if not total and offset == 0:
+                resolved_source = station_resolver.resolve_location(source)
+                if resolved_source and resolved_source != source.lower():
+                    results, total = train_cache.find_trains_page(resolved_source, None, 0, self.page_size)
+                    if total:
+                        source = resolved_source
 
             if results:
                 messages = [f"Trains departing from stations like '{source.title()}':"]
-                limit = 15
-                for i, row in enumerate(results):
-                    if i >= limit:
-                        messages.append(f"\n(Showing first {limit} of {len(results)} trains...)")
-                        break
-                    messages.append(f"- Train {row['train_number']}: From {row['from_location']} to {row['to_location']} @ {row['departure_time']}, Status: {row['status']}")
+                for row in results:
+                    departure_time = format_departure_time(row['timings'], row['train_number'])
+                    messages.append(f"- Train {row['train_number']}: From {row['from_location']} to {row['to_location']} @ {departure_time}, Status: {row['status']}")
+                shown = offset + len(results)
+                if shown < total:
+                    next_cursor = encode_page_cursor(self.listing, f"{shown}|{source}")
+                    messages.append(f"\n(Showing {offset + 1}-{shown} of {total} trains. Say 'next page' for more.)")
                 dispatcher.utter_message(text="\n".join(messages))
+            elif offset:
+                dispatcher.utter_message(text=f"No more trains departing from stations matching '{source.title()}'.")
             else:
                 dispatcher.utter_message(text=f"No trains found departing from stations matching '{source.title()}'.")
-        except mysql.connector.Error as err:
-            print(f"ERROR [DB] in {self.name()}: {err}")
-            traceback.print_exc()
+        except DatabaseUnavailableError:
+            dispatcher.utter_message(text="Sorry, I'm having trouble connecting to the database right now.")
+        except mysql.connector.Error:
+            action_log.exception("database error")
             dispatcher.utter_message(text="An error occurred while searching trains by source.")
-        except Exception as e:
-            print(f"ERROR [Unexpected] in {self.name()}: {e}")
-            traceback.print_exc()
+        except Exception:
+            action_log.exception("unexpected error")
             dispatcher.utter_message(text="An unexpected error occurred while searching trains by source.")
-        finally:
-            close_db_resources(cursor, conn)
-        return [SlotSet("from_location", None)]
+        return [SlotSet(PAGE_CURSOR_SLOT, next_cursor)]
+
+# --- Paging Action ---
+class ActionNextPage(OffloadedActionMixin, Action):
+    """Continues whichever paged listing set page_cursor last."""
+    reset_slots = [PAGE_CURSOR_SLOT]
+    listings = {action.listing: action for action in (ActionFindTrains, ActionBookingHistory, ActionListAllTrains,
+                                                      ActionListAllUserDetails, ActionSearchTrainsBySource)}
+
+    def name(self) -> Text:
+        return "action_next_page"
+
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        listing, position = decode_page_cursor(tracker.get_slot(PAGE_CURSOR_SLOT))
+        if listing not in self.listings:
+            dispatcher.utter_message(text="There is nothing more to show.")
+            return [SlotSet(PAGE_CURSOR_SLOT, None)]
+        return self.listings[listing]().show_page(dispatcher, position)
 
 
 # --- Fallback Action ---
@@ -0,0 +1,49 @@
+# admin_export.py
+
+import argparse
+import csv
+import sys
+from .db import streaming_cursor
+
+# --- Export Configuration ---
+# Full-table dumps for admins. The chat actions only ever show one page (see ActionListAllTrains);
+# exports stream rows from the server with an unbuffered cursor instead of fetchall().
+EXPORT_QUERIES = {
+    "trains": "SELECT train_number, from_location, to_location, timings, status FROM train_details ORDER BY train_number",
+    "users": "SELECT user_id, name, email_id, phone_number FROM user_details ORDER BY user_id",
+}
+
+
+def export_table(table, out, batch_size=1000):
+    """Writes every row of an EXPORT_QUERIES table to the file object `out` as CSV; returns the row count."""
+    written = 0
+    with streaming_cursor(dictionary=False) as cursor:
+        cursor.execute(EXPORT_QUERIES[table])
+        writer = csv.writer(out)
+        writer.writerow(cursor.column_names)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a railway_chatbot table to CSV without loading it into memory")
+    parser.add_argument("table", choices=sorted(EXPORT_QUERIES))
+    parser.add_argument("output", nargs="?", default="-", help="CSV file to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched from the server per round trip")
+    args = parser.parse_args(argv)
+    if args.table == "users":
+        print("WARNING: The users export contains unmasked personal data.", file=sys.stderr)
+
+    if args.output == "-":
+        written = export_table(args.table, sys.stdout, args.batch_size)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            written = export_table(args.table, out, args.batch_size)
+    print(f"Exported {written} {args.table} rows", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
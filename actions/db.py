@@ -0,0 +1,251 @@
+# db.py
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import mysql.connector
+from . import action_log, metrics
+
+# --- Database Connection Configuration ---
+# !!! IMPORTANT: Replace with your actual database credentials !!!
+# DB_HOST / DB_USER / DB_PASSWORD / DB_NAME override these (e.g. DB_NAME=railway_chatbot_bench for benchmark.py)
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "user": os.environ.get("DB_USER", "root"),              # Replace with your MySQL username
+    "password": os.environ.get("DB_PASSWORD", "Rp@25093"),  # Replace with your MySQL password
+    "database": os.environ.get("DB_NAME", "railway_chatbot") # Replace with your database name
+}
+
+# --- Connection Pool Configuration ---
+# Every action checks a connection out of one process-wide pool instead of opening a new one,
+# so a user turn only pays for its queries, not for a TCP + auth handshake.
+DB_POOL_CONFIG = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),                 # Max open connections per action server process
+    "checkout_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 5.0)),    # Seconds to wait for a free connection
+    "health_check_interval": float(os.environ.get("DB_POOL_PING_INTERVAL", 30.0)), # Ping connections idle longer than this
+    "query_timeout_ms": int(os.environ.get("DB_QUERY_TIMEOUT_MS", 5000)), # Server-side cap per SELECT (0 = no cap)
+}
+
+
+class ConnectionPool:
+    """A small thread-safe pool of MySQL connections built around DB_CONFIG."""
+
+    def __init__(self, db_config, pool_size=10, checkout_timeout=5.0, health_check_interval=30.0,
+                 query_timeout_ms=0):
+        self.db_config = dict(db_config)
+        self.pool_size = max(1, int(pool_size))
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.query_timeout_ms = query_timeout_ms
+        self._idle = queue.LifoQueue() # (connection, last_used) pairs; LIFO keeps hot connections hot
+        self._lock = threading.Lock()
+        self._open_count = 0
+
+    def _open_connection(self):
+        # autocommit keeps plain SELECTs from holding a stale snapshot across pooled reuse;
+        # actions that write still call start_transaction() explicitly.
+        # consume_results lets a cursor be closed after fetchone() on a multi-row result.
+        conn = mysql.connector.connect(**self.db_config, autocommit=True, consume_results=True)
+        if self.query_timeout_ms:
+            # Set once per connection so a runaway SELECT is killed by the server, not left holding a worker
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(self.query_timeout_ms),))
+                cursor.close()
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._open_count -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True # Recently used; skip the extra round trip
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def get_connection(self):
+        """Checks a connection out of the pool, opening one if the pool is not full.
+
+        Raises mysql.connector.errors.PoolError if none becomes free within checkout_timeout.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+
+            if conn is not None:
+                if self._is_healthy(conn, last_used):
+                    return conn
+                action_log.warning("discarding unhealthy pooled connection")
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                can_open = self._open_count < self.pool_size
+                if can_open:
+                    self._open_count += 1
+            if can_open:
+                try:
+                    return self._open_connection()
+                except Exception:
+                    with self._lock:
+                        self._open_count -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise mysql.connector.errors.PoolError(
+                    f"No database connection available within {self.checkout_timeout}s "
+                    f"(pool_size={self.pool_size})")
+            try:
+                conn, last_used = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            self._idle.put((conn, last_used)) # Re-run the health check on the next loop
+
+    def release(self, conn, broken=False):
+        """Returns a connection to the pool, discarding it if it is no longer usable.
+
+        Pass broken=True when the caller already knows it is not (e.g. its session state could not
+        be restored); the connection is then closed and its pool slot freed.
+        """
+        if broken:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback() # Never hand a half-finished transaction to the next action
+        except Exception as e:
+            action_log.warning("discarding pooled connection after failed reset", error=e)
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def close_all(self):
+        """Closes every idle connection (e.g. on shutdown or after a credentials change)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+    return _pool
+
+def connect_db():
+    """Checks out a pooled connection to the MySQL database."""
+    started = time.perf_counter()
+    try:
+        conn = get_pool().get_connection()
+    except mysql.connector.Error as err:
+        action_log.exception("could not connect to MySQL", error=err)
+        metrics.record_error("connection")
+        return None
+    metrics.CONNECTION_ACQUIRE_SECONDS.observe(time.perf_counter() - started, metrics.current_action())
+    return conn
+
+# --- Helper Function for Closing DB Resources ---
+def close_db_resources(cursor=None, conn=None):
+    """Safely closes cursor and returns the connection to the pool."""
+    if cursor:
+        try:
+            cursor.close()
+        except Exception as e:
+            action_log.warning("error closing cursor", error=e)
+    if conn:
+        try:
+            get_pool().release(conn)
+        except Exception as e:
+            action_log.warning("error releasing connection", error=e)
+
+class DatabaseUnavailableError(mysql.connector.errors.InterfaceError):
+    """Raised by pooled_cursor() when no database connection could be obtained."""
+
+@contextmanager
+def pooled_cursor(dictionary=True):
+    """Yields a cursor on a pooled connection and always returns the connection afterwards.
+
+    Used by helpers (caches, indexes) that only touch the database on a miss.
+    """
+    conn = connect_db()
+    if not conn:
+        raise DatabaseUnavailableError("Could not obtain a database connection.")
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=dictionary)
+        yield cursor
+    finally:
+        close_db_resources(cursor, conn)
+
+@contextmanager
+def pooled_connection():
+    """Yields a pooled connection (for queries.py statements) and always returns it afterwards."""
+    conn = connect_db()
+    if not conn:
+        raise DatabaseUnavailableError("Could not obtain a database connection.")
+    try:
+        yield conn
+    finally:
+        close_db_resources(None, conn)
+
+@contextmanager
+def streaming_cursor(dictionary=True):
+    """Yields an unbuffered cursor: rows stay on the server until fetched, so fetchmany() keeps
+    memory at one batch however large the result is. For exports, not for per-turn actions.
+
+    The per-SELECT cap (query_timeout_ms) is lifted for the duration and restored afterwards.
+    """
+    pool = get_pool()
+    conn = connect_db()
+    if not conn:
+        raise DatabaseUnavailableError("Could not obtain a database connection.")
+    cursor = None
+    try:
+        if pool.query_timeout_ms:
+            setup = conn.cursor()
+            setup.execute("SET SESSION MAX_EXECUTION_TIME = 0")
+            setup.close()
+        cursor = conn.cursor(dictionary=dictionary, buffered=False)
+        yield cursor
+    finally:
+        if cursor:
+            try:
+                cursor.close() # consume_results drains anything left unread
+            except Exception as e:
+                action_log.warning("error closing cursor", error=e)
+        try:
+            if pool.query_timeout_ms:
+                reset = conn.cursor()
+                reset.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(pool.query_timeout_ms),))
+                reset.close()
+        except Exception as e:
+            action_log.warning("discarding connection after failed timeout reset", error=e)
+            pool.release(conn, broken=True)
+        else:
+            pool.release(conn)
@@ -0,0 +1,95 @@
+# executor.py
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Text, Dict, List
+from rasa_sdk import Tracker
+from rasa_sdk.executor import CollectingDispatcher
+from rasa_sdk.events import SlotSet
+from . import action_log, metrics
+from .db import DB_POOL_CONFIG
+from .search_index import warm_indexes
+
+# --- Action Executor Configuration ---
+# rasa_sdk awaits async run() methods on its event loop, but runs plain run() methods right on
+# that loop too, so one slow query used to stall every other conversation on the worker.
+ACTION_EXECUTOR_CONFIG = {
+    # One worker per pooled connection: more threads would only queue on the pool
+    "max_workers": int(os.environ.get("ACTION_MAX_WORKERS", DB_POOL_CONFIG["pool_size"])),
+    "action_timeout": float(os.environ.get("ACTION_TIMEOUT", 10.0)), # Seconds, including time queued for a worker
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Returns the bounded, process-wide thread pool that runs blocking action bodies."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ACTION_EXECUTOR_CONFIG["max_workers"],
+                                               thread_name_prefix="action-db")
+    return _executor
+
+
+class OffloadedActionMixin:
+    """Gives an action an async run() that executes its blocking run_blocking() on the thread pool.
+
+    Usage: class ActionX(OffloadedActionMixin, Action) and implement run_blocking() with the
+    same signature a normal run() would have. Slots listed in reset_slots are cleared on timeout.
+    """
+    reset_slots: List[Text] = []
+    timeout_message = "Sorry, that is taking longer than expected. Please try again in a moment."
+
+    def run_blocking(self, dispatcher: CollectingDispatcher,
+                     tracker: Tracker,
+                     domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        raise NotImplementedError("Offloaded actions must implement run_blocking()")
+
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        # The worker gets its own dispatcher so a run that finishes after a timeout
+        # cannot append messages to a response that has already been sent.
+        worker_dispatcher = CollectingDispatcher()
+        metrics.start_metrics_server() # Started by the first action, so merely importing actions binds no port
+        warm_indexes()                 # Likewise, no DB connection until the first action
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        future = loop.run_in_executor(get_executor(), self._run_measured, started, worker_dispatcher, tracker, domain)
+        try:
+            events = await asyncio.wait_for(future, timeout=ACTION_EXECUTOR_CONFIG["action_timeout"])
+        except asyncio.TimeoutError:
+            action_log.error("action timed out", action=self.name(), sender=tracker.sender_id,
+                             timeout_s=ACTION_EXECUTOR_CONFIG["action_timeout"])
+            metrics.record_error("timeout", self.name())
+            dispatcher.utter_message(text=self.timeout_message)
+            return [SlotSet(slot, None) for slot in self.reset_slots]
+        except Exception:
+            metrics.record_error("exception", self.name())
+            raise
+        finally:
+            metrics.ACTION_SECONDS.observe(time.perf_counter() - started, self.name())
+
+        dispatcher.messages.extend(worker_dispatcher.messages)
+        return events
+
+    def _run_measured(self, submitted_at, dispatcher, tracker, domain):
+        # Runs on the worker thread; DB timings and log events recorded meanwhile are attributed to this action
+        started = time.perf_counter()
+        metrics.ACTION_QUEUE_SECONDS.observe(started - submitted_at, self.name())
+        metrics.set_current_action(self.name())
+        action_log.begin_action(self.name(), tracker.sender_id)
+        try:
+            return self.run_blocking(dispatcher, tracker, domain)
+        finally:
+            latency_ms = round((time.perf_counter() - submitted_at) * 1000, 1)
+            log = action_log.warning if latency_ms >= action_log.ACTION_LOG_CONFIG["slow_action_ms"] else action_log.debug
+            log("action finished", latency_ms=latency_ms, queue_ms=round((started - submitted_at) * 1000, 1))
+            action_log.end_action()
+            metrics.set_current_action(None)
+
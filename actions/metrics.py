@@ -0,0 +1,188 @@
+# metrics.py
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Metrics Configuration ---
+# The action server records per-action and per-query timings in memory and serves them in the
+# Prometheus text format at http://<host>:<port>/metrics from a small side thread.
+METRICS_CONFIG = {
+    "host": os.environ.get("ACTION_METRICS_HOST", "0.0.0.0"),
+    "port": int(os.environ.get("ACTION_METRICS_PORT", 9105)), # 0 disables the endpoint
+}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0) # Seconds
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 500, 1000, 10000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {} # label values -> count
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics: le buckets, _sum, _count)."""
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {} # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    labels = _labels(self.label_names, label_values, [("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# --- Action Server Metrics ---
+ACTION_SECONDS = Histogram("action_duration_seconds",
+                           "Time from the request reaching an action until its response, including queueing",
+                           ["action"])
+ACTION_QUEUE_SECONDS = Histogram("action_queue_seconds",
+                                 "Time an action waited for a free worker thread", ["action"])
+ACTION_ERRORS = Counter("action_errors_total",
+                        "Action failures by kind (timeout, db, connection, exception)", ["action", "kind"])
+CONNECTION_ACQUIRE_SECONDS = Histogram("db_connection_acquire_seconds",
+                                       "Time to check a connection out of the pool", ["action"])
+QUERY_SECONDS = Histogram("db_query_duration_seconds",
+                          "Execute plus fetch time of each registered query", ["query"])
+QUERY_ROWS = Histogram("db_query_rows", "Rows returned or affected per registered query", ["query"],
+                       buckets=ROW_BUCKETS)
+QUERY_ERRORS = Counter("db_query_errors_total", "Registered queries that raised a MySQL error", ["query"])
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log events dropped because the log queue was full",
+                              ["level"])
+
+ALL_METRICS = [ACTION_SECONDS, ACTION_QUEUE_SECONDS, ACTION_ERRORS, CONNECTION_ACQUIRE_SECONDS,
+               QUERY_SECONDS, QUERY_ROWS, QUERY_ERRORS, LOG_RECORDS_DROPPED]
+
+_current = threading.local()
+
+def set_current_action(name):
+    """Attributes DB timings and errors on this thread to the named action (None to clear)."""
+    _current.action = name
+
+def current_action():
+    return getattr(_current, "action", None) or "none"
+
+def record_error(kind, action=None):
+    ACTION_ERRORS.inc(action or current_action(), kind)
+
+def record_query(name, seconds, rows):
+    QUERY_SECONDS.observe(seconds, name)
+    QUERY_ROWS.observe(rows, name)
+
+def record_query_error(name):
+    QUERY_ERRORS.inc(name)
+    record_error("db")
+
+def render():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics Endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Scrapes every few seconds would drown the action server log
+
+
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+def start_metrics_server(host=None, port=None):
+    """Serves /metrics on a daemon thread; safe (and cheap) to call on every action.
+
+    Only the first call tries to bind, so a port already taken (e.g. by a second action server on
+    the same host) logs one warning and the process simply runs without the endpoint.
+    """
+    global _server, _server_attempted
+    if _server_attempted:
+        return _server
+    from . import action_log # Imported here: action_log itself records dropped events in this module
+    host = METRICS_CONFIG["host"] if host is None else host
+    port = METRICS_CONFIG["port"] if port is None else port
+    with _server_lock:
+        if _server_attempted:
+            return _server
+        _server_attempted = True
+        if not port:
+            return None
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                action_log.warning("could not start the metrics endpoint, continuing without it",
+                                   host=host, port=port, error=e)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            action_log.info("serving action metrics", url=f"http://{host}:{port}/metrics")
+    return _server
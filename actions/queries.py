@@ -0,0 +1,170 @@
+# queries.py
+
+import os
+import time
+from collections import OrderedDict
+import mysql.connector
+from . import metrics
+
+# --- Query Registry ---
+# Every per-turn statement the actions run, by name. They are executed as server-side prepared
+# statements that are kept open on each pooled connection, so MySQL parses each one once per
+# connection instead of on every turn. {in_list} expands to one %s per value, padded up to one of
+# IN_LIST_SIZES (see fetch_all()).
+QUERIES = {
+    # Trains (train_cache.py)
+    "trains_by_number": "SELECT train_number, from_location, to_location, timings, status FROM train_details "
+                        "WHERE train_number IN ({in_list})",
+    "train_status_by_number": "SELECT train_number, status FROM train_details WHERE train_number IN ({in_list})",
+    "trains_page_first": "SELECT train_number, from_location, to_location, timings, status FROM train_details "
+                         "ORDER BY train_number LIMIT %s",
+    "trains_page_after": "SELECT train_number, from_location, to_location, timings, status FROM train_details "
+                         "WHERE train_number > %s ORDER BY train_number LIMIT %s",
+    "train_exists": "SELECT 1 FROM train_details WHERE train_number = %s",
+    # PNR status and cancellation
+    "pnr_details": """
+        SELECT ps.pnr_number, ps.seat_number,
+               ps.journey_date,  -- Fetch raw journey_date
+               ps.status AS pnr_ticket_status,
+               td.train_number, td.from_location, td.to_location,
+               td.timings as train_timings,      -- Fetch raw train timings
+               td.status AS train_operational_status
+        FROM pnr_status ps
+        JOIN train_details td ON ps.train_number = td.train_number
+        WHERE ps.pnr_number = %s
+    """,
+    "pnr_status_for_update": "SELECT status FROM pnr_status WHERE pnr_number = %s FOR UPDATE", # Locks the row
+    "cancel_pnr": "UPDATE pnr_status SET status = 'Cancelled' WHERE pnr_number = %s",
+    # Fares
+    "train_fares": """
+        SELECT tf.class, tf.fare
+        FROM train_fare tf
+        WHERE tf.train_number = %s AND LOWER(tf.class) LIKE %s
+    """,
+    # Users and bookings
+    "user_name": "SELECT name FROM user_details WHERE user_id = %s",
+    "booking_history_page": """
+        SELECT bh.pnr_number,
+               bh.booking_date,      -- Fetch raw booking_date
+               ps.journey_date,      -- Fetch raw journey_date
+               ps.seat_number, ps.status AS pnr_ticket_status,
+               td.train_number, td.from_location, td.to_location
+        FROM booking_history bh
+        JOIN pnr_status ps ON bh.pnr_number = ps.pnr_number
+        JOIN train_details td ON ps.train_number = td.train_number
+        WHERE bh.user_id = %s
+        ORDER BY ps.journey_date DESC, bh.booking_date DESC, bh.pnr_number DESC
+        LIMIT %s OFFSET %s
+    """,
+    "users_page_first": "SELECT user_id, name, email_id, phone_number FROM user_details ORDER BY user_id LIMIT %s",
+    "users_page_after": "SELECT user_id, name, email_id, phone_number FROM user_details "
+                        "WHERE user_id > %s ORDER BY user_id LIMIT %s",
+    # Stations
+    "station_by_code": "SELECT station_code, station_name, details, state FROM stations WHERE station_code = %s",
+}
+
+# --- Prepared Statement Cache Configuration ---
+PREPARED_CACHE_CONFIG = {
+    # Statements kept open per connection; {in_list} queries take one slot per size in IN_LIST_SIZES
+    "max_statements": int(os.environ.get("DB_PREPARED_CACHE_SIZE", 32)),
+    # Longer {in_list} lists are one-off shapes; they run as plain queries instead of evicting hot statements
+    "max_in_list": int(os.environ.get("DB_PREPARED_MAX_IN_LIST", 64)),
+}
+
+# {in_list} lengths are padded up to the next of these (capped at max_in_list), so the two
+# {in_list} queries need 2 x 5 statements rather than one per length; with the other registered
+# queries that stays below max_statements and nothing hot is evicted.
+IN_LIST_SIZES = (1, 5, 15, 32)
+
+
+def _in_list_size(length):
+    """Returns the padded {in_list} length for `length` values, or None if it runs unprepared."""
+    limit = PREPARED_CACHE_CONFIG["max_in_list"]
+    if length > limit:
+        return None
+    return next((size for size in IN_LIST_SIZES if length <= size < limit), limit)
+
+
+def _prepared(conn, name, in_list):
+    """Returns (sql, cursor) for the query on this connection, preparing it on first use."""
+    cache = getattr(conn, "_prepared_statements", None)
+    if cache is None:
+        cache = conn._prepared_statements = OrderedDict() # (name, in_list) -> (sql, prepared cursor)
+    key = (name, in_list)
+    entry = cache.get(key)
+    if entry is not None:
+        cache.move_to_end(key)
+        return entry
+    sql = QUERIES[name]
+    if in_list:
+        sql = sql.format(in_list=", ".join(["%s"] * in_list))
+    # The cursor re-prepares whenever it is handed a different string object, so the same
+    # sql object is passed on every execute
+    entry = cache[key] = (sql, conn.cursor(prepared=True))
+    while len(cache) > PREPARED_CACHE_CONFIG["max_statements"]:
+        _, (_, stale) = cache.popitem(last=False)
+        _close_quietly(stale) # Deallocates the statement on the server
+    return entry
+
+def _close_quietly(cursor):
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+def _execute(conn, name, params, in_list):
+    sql, cursor = _prepared(conn, name, in_list)
+    try:
+        cursor.execute(sql, tuple(params))
+    except mysql.connector.Error:
+        # Re-prepare next time rather than reuse a statement in an unknown state
+        conn._prepared_statements.pop((name, in_list), None)
+        _close_quietly(cursor)
+        raise
+    return cursor
+
+def _rows(cursor):
+    columns = cursor.column_names
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def fetch_all(conn, name, params=(), in_list=0):
+    """Runs registered query `name` and returns its rows as dicts.
+
+    For {in_list} queries pass in_list=len(values). The values are padded to the next size in
+    IN_LIST_SIZES by repeating the last one, which IN () ignores, so few statements cover every length.
+    """
+    started = time.perf_counter()
+    try:
+        size = _in_list_size(in_list) if in_list else 0
+        if size is None:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(QUERIES[name].format(in_list=", ".join(["%s"] * in_list)), tuple(params))
+                rows = _rows(cursor)
+            finally:
+                cursor.close()
+        else:
+            if size > in_list:
+                params = tuple(params) + (params[-1],) * (size - in_list)
+            rows = _rows(_execute(conn, name, params, size))
+    except mysql.connector.Error:
+        metrics.record_query_error(name)
+        raise
+    metrics.record_query(name, time.perf_counter() - started, len(rows))
+    return rows
+
+def fetch_one(conn, name, params=(), in_list=0):
+    """Like fetch_all() for queries that match at most one row; returns the row or None."""
+    rows = fetch_all(conn, name, params, in_list)
+    return rows[0] if rows else None
+
+def execute(conn, name, params=()):
+    """Runs a registered INSERT/UPDATE/DELETE and returns the number of affected rows."""
+    started = time.perf_counter()
+    try:
+        affected = _execute(conn, name, params, 0).rowcount
+    except mysql.connector.Error:
+        metrics.record_query_error(name)
+        raise
+    metrics.record_query(name, time.perf_counter() - started, affected)
+    return affected
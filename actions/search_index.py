@@ -0,0 +1,224 @@
+# search_index.py
+
+import os
+import threading
+import time
+from . import action_log
+from .db import pooled_cursor
+
+# --- Search Index Configuration ---
+# LOWER(col) LIKE '%x%' cannot use a MySQL index, so substring search over station names and
+# train routes is answered from an in-memory n-gram index instead, rebuilt periodically.
+SEARCH_INDEX_CONFIG = {
+    "refresh_interval": float(os.environ.get("SEARCH_INDEX_REFRESH", 300)), # Seconds between rebuilds
+    "warm_on_startup": os.environ.get("SEARCH_INDEX_WARM", "1") == "1",       # Build in the background on the first action
+}
+
+GRAM_SIZE = 3
+
+
+def _normalize(value):
+    return value.strip().lower() if value else ""
+
+
+class SubstringIndex:
+    """Answers "which keys contain this text" using n-gram posting lists.
+
+    Grams of length 1..GRAM_SIZE are indexed, so short queries are a single dictionary lookup and
+    longer ones intersect trigram postings before a final substring check on the few survivors.
+    """
+
+    def __init__(self):
+        self._keys = [] # key id -> normalized key
+        self._key_ids = {}
+        self._postings = {} # gram -> set of key ids
+
+    def add(self, key):
+        key = _normalize(key)
+        if not key or key in self._key_ids:
+            return
+        key_id = len(self._keys)
+        self._keys.append(key)
+        self._key_ids[key] = key_id
+        for n in range(1, GRAM_SIZE + 1):
+            for i in range(len(key) - n + 1):
+                self._postings.setdefault(key[i:i + n], set()).add(key_id)
+
+    def search(self, text):
+        """Returns the normalized keys that contain text."""
+        text = _normalize(text)
+        if not text:
+            return []
+        if len(text) <= GRAM_SIZE:
+            return [self._keys[i] for i in self._postings.get(text, ())]
+
+        grams = {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+        return [self._keys[i] for i in candidates if text in self._keys[i]]
+
+
+class RouteIndex:
+    """In-memory index of train routes: substring search on from/to locations, ordered by timings."""
+
+    def __init__(self):
+        self.from_index = SubstringIndex()
+        self.to_index = SubstringIndex()
+        self._trains_by_from = {} # normalized from_location -> set of train numbers
+        self._trains_by_to = {}
+        self._departure = {} # train number -> sortable departure value
+        self.generation = 0 # Set by SearchIndexes.rebuild()
+
+    def add_train(self, train_number, from_location, to_location, timings):
+        key = str(train_number)
+        from_key, to_key = _normalize(from_location), _normalize(to_location)
+        self.from_index.add(from_key)
+        self.to_index.add(to_key)
+        self._trains_by_from.setdefault(from_key, set()).add(key)
+        self._trains_by_to.setdefault(to_key, set()).add(key)
+        self._departure[key] = _departure_sort_key(timings)
+
+    def find_trains(self, from_location, to_location=None):
+        """Returns train numbers (as strings) matching the locations, ordered like ORDER BY timings."""
+        matches = set()
+        for key in self.from_index.search(from_location):
+            matches |= self._trains_by_from[key]
+        if to_location is not None and matches:
+            to_matches = set()
+            for key in self.to_index.search(to_location):
+                to_matches |= self._trains_by_to[key]
+            matches &= to_matches
+        return sorted(matches, key=lambda n: (self._departure[n], int(n) if n.isdigit() else 0))
+
+    def locations(self):
+        """Returns every normalized from/to location name known to the index."""
+        return set(self._trains_by_from) | set(self._trains_by_to)
+
+
+class StationIndex:
+    """In-memory index of the stations table: exact code lookup plus substring search on names."""
+
+    def __init__(self):
+        self.name_index = SubstringIndex()
+        self._codes_by_name = {} # normalized name -> list of station codes
+        self._codes = {} # normalized code -> station code as stored
+
+    def add_station(self, station_code, station_name):
+        name_key = _normalize(station_name)
+        self.name_index.add(name_key)
+        self._codes_by_name.setdefault(name_key, []).append(station_code)
+        self._codes[_normalize(station_code)] = station_code
+
+    def find_station_codes(self, identifier):
+        """Returns station codes whose code equals, or whose name contains, identifier.
+
+        An exact code match comes first; name matches follow in name order.
+        """
+        codes = []
+        exact = self._codes.get(_normalize(identifier))
+        if exact:
+            codes.append(exact)
+        for name_key in sorted(self.name_index.search(identifier)):
+            codes.extend(c for c in self._codes_by_name[name_key] if c != exact)
+        return codes
+
+
+def _departure_sort_key(timings):
+    # MySQL returns TIME columns as timedelta; NULL sorts first, as in ORDER BY timings
+    if timings is None:
+        return -1
+    if hasattr(timings, "total_seconds"):
+        return timings.total_seconds()
+    if hasattr(timings, "hour"):
+        return timings.hour * 3600 + timings.minute * 60 + timings.second
+    try:
+        hours, minutes, *rest = str(timings).split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + (int(rest[0]) if rest else 0)
+    except ValueError:
+        return -1
+
+
+class SearchIndexes:
+    """Holds the current route and station indexes and rebuilds them when they go stale."""
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._routes = None
+        self._stations = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def routes(self):
+        self._ensure_fresh()
+        return self._routes
+
+    def stations(self):
+        self._ensure_fresh()
+        return self._stations
+
+    def invalidate(self):
+        """Forces a rebuild on the next lookup (e.g. after train_details or stations change)."""
+        self._built_at = 0.0
+
+    def _ensure_fresh(self):
+        if self._routes is not None and time.monotonic() - self._built_at < self.refresh_interval:
+            return
+        # Only a cold start makes readers wait; a stale index keeps serving while one thread rebuilds
+        if not self._lock.acquire(blocking=self._routes is None):
+            return
+        try:
+            if self._routes is not None and time.monotonic() - self._built_at < self.refresh_interval:
+                return # Another thread rebuilt it while we waited
+            self.rebuild()
+        finally:
+            self._lock.release()
+
+    def rebuild(self):
+        """Loads train routes and stations from MySQL and swaps in fresh indexes."""
+        routes, stations = RouteIndex(), StationIndex()
+        self._generation += 1
+        routes.generation = self._generation # Lets caches of lookup results tell which build they came from
+        with pooled_cursor() as cursor:
+            cursor.execute("SELECT train_number, from_location, to_location, timings FROM train_details")
+            for row in cursor.fetchall():
+                routes.add_train(row["train_number"], row["from_location"], row["to_location"], row["timings"])
+            cursor.execute("SELECT station_code, station_name FROM stations")
+            for row in cursor.fetchall():
+                stations.add_station(row["station_code"], row["station_name"])
+        # Readers keep using the old indexes until both new ones are ready
+        self._routes, self._stations = routes, stations
+        self._built_at = time.monotonic()
+
+
+search_indexes = SearchIndexes(refresh_interval=SEARCH_INDEX_CONFIG["refresh_interval"])
+
+_warm_started = False
+_warm_lock = threading.Lock()
+
+def warm_indexes():
+    """Builds the indexes on a background thread, once per process; safe (and cheap) to call on every action.
+
+    Called by the first action rather than at import, so importing actions opens no DB connection.
+    """
+    global _warm_started
+    if _warm_started or not SEARCH_INDEX_CONFIG["warm_on_startup"]:
+        return
+    with _warm_lock:
+        if _warm_started:
+            return
+        _warm_started = True
+    threading.Thread(target=_build_in_background, name="search-index-warmup", daemon=True).start()
+
+def _build_in_background():
+    try:
+        search_indexes.routes()
+        action_log.info("search indexes built")
+    except Exception as e:
+        action_log.warning("could not build search indexes in the background, will retry on first search", error=e)
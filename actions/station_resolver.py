@@ -0,0 +1,299 @@
+# station_resolver.py
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, NamedTuple, Optional, Text
+from .db import pooled_cursor
+from .search_index import search_indexes
+
+try:
+    from rapidfuzz import fuzz # Optional: faster and better at partial matches
+    def _similarity(a, b):
+        return fuzz.WRatio(a, b) / 100.0
+except ImportError:
+    from difflib import SequenceMatcher
+    def _similarity(a, b):
+        return SequenceMatcher(None, a, b).ratio()
+
+# --- Station Resolver Configuration ---
+STATION_RESOLVER_CONFIG = {
+    "check_interval": float(os.environ.get("STATION_RESOLVER_CHECK_INTERVAL", 60)), # Seconds between change checks
+    "min_score": float(os.environ.get("STATION_RESOLVER_MIN_SCORE", 0.75)),          # 0..1 similarity to accept a match
+    "max_candidates": 50, # Candidates scored per query, whatever the table size
+    "max_posting": 2000,  # n-grams shared by more keys than this are too common to help ranking
+}
+
+# Former and alternate city names; each group is treated as one place
+ALIAS_GROUPS = [
+    {"mumbai", "bombay"},
+    {"kolkata", "calcutta"},
+    {"chennai", "madras"},
+    {"bengaluru", "bangalore"},
+    {"prayagraj", "allahabad"},
+    {"thiruvananthapuram", "trivandrum"},
+    {"vadodara", "baroda"},
+    {"kochi", "cochin"},
+    {"varanasi", "banaras", "benares"},
+    {"mughalsarai", "mughal sarai"},
+    {"tiruchirappalli", "trichy"},
+]
+
+# Words that describe the station rather than the place, dropped for an extra lookup key
+GENERIC_WORDS = {"railway", "station", "junction", "jn", "jct", "central", "terminus", "terminal", "cantt", "city"}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_name(value):
+    """Lowercases, strips punctuation and collapses whitespace."""
+    return " ".join(_NON_ALNUM.sub(" ", value.lower()).split()) if value else ""
+
+
+def _grams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """Character-trigram index over normalized keys, each pointing at one or more targets.
+
+    search() shortlists keys by shared trigrams and only scores that shortlist, so query time
+    is bounded by max_candidates rather than by the number of keys.
+    """
+
+    def __init__(self, max_candidates=50, max_posting=2000):
+        self.max_candidates = max_candidates
+        self.max_posting = max_posting
+        self._targets = {} # key -> {target: weight}
+        self._postings = {} # trigram -> set of keys
+        self._lock = threading.Lock() # Incremental reloads mutate the sets searches iterate
+
+    def add(self, key, target, weight=1.0):
+        """Indexes key for target; weight < 1 ranks this key below equally similar ones."""
+        key = normalize_name(key)
+        if not key:
+            return
+        with self._lock:
+            self._add(key, target, weight)
+
+    def _add(self, key, target, weight):
+        if key not in self._targets:
+            self._targets[key] = {}
+            for gram in _grams(key):
+                self._postings.setdefault(gram, set()).add(key)
+        self._targets[key][target] = max(weight, self._targets[key].get(target, 0.0))
+
+    def remove(self, key, target):
+        key = normalize_name(key)
+        with self._lock:
+            self._remove(key, target)
+
+    def _remove(self, key, target):
+        targets = self._targets.get(key)
+        if not targets:
+            return
+        targets.pop(target, None)
+        if not targets:
+            del self._targets[key]
+            for gram in _grams(key):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self._postings[gram]
+
+    def search(self, text, k=3, min_score=0.0):
+        """Returns up to k (target, score) pairs, best first.
+
+        min_score applies to the raw similarity; ranking and the returned score include key weights.
+        """
+        query = normalize_name(text)
+        if not query:
+            return []
+        with self._lock:
+            return self._search(query, k, min_score)
+
+    def _search(self, query, k, min_score):
+        if query in self._targets:
+            exact = self._targets[query]
+            return sorted(exact.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+        postings = [self._postings[g] for g in _grams(query) if g in self._postings]
+        informative = [p for p in postings if len(p) <= self.max_posting] or postings
+        shared = Counter()
+        for posting in informative:
+            shared.update(posting)
+
+        best = {}
+        for key, _ in shared.most_common(self.max_candidates):
+            score = _similarity(query, key)
+            if score < min_score:
+                continue
+            for target, weight in self._targets[key].items():
+                if score * weight > best.get(target, -1.0):
+                    best[target] = score * weight
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class StationMatch(NamedTuple):
+    station_code: Text
+    station_name: Text
+    score: float
+
+
+class StationResolver:
+    """Resolves free-text station and place names to station codes and to route locations.
+
+    Stations are indexed by name, code, name without generic words, city and city aliases.
+    Route locations (the from/to names used in train_details) get their own index, fed by the
+    route search index and by station cities, so "Mumbia" or "Howrah" still find trains.
+    """
+
+    def __init__(self, check_interval=60, min_score=0.75, max_candidates=50, max_posting=2000):
+        self.check_interval = check_interval
+        self.min_score = min_score
+        self._station_index = FuzzyIndex(max_candidates, max_posting)
+        self._location_index = FuzzyIndex(max_candidates, max_posting)
+        self._stations = {} # station code -> (station_name, location)
+        self._station_keys = {} # station code -> keys it was indexed under
+        self._location_keys = set() # (key, route location) pairs currently in the location index
+        self._table_version = None
+        self._checked_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # --- Lookups ---
+
+    def resolve_station(self, text, k=3) -> List[StationMatch]:
+        """Returns up to k station matches for text, best first."""
+        self._ensure_fresh()
+        return [StationMatch(code, self._stations[code][0], score)
+                for code, score in self._station_index.search(text, k=k, min_score=self.min_score)
+                if code in self._stations]
+
+    def resolve_location(self, text) -> Optional[Text]:
+        """Returns the closest route location (normalized, as searched in train_details), or None."""
+        self._ensure_fresh()
+        matches = self._location_index.search(text, k=1, min_score=self.min_score)
+        return matches[0][0] if matches else None
+
+    # --- Loading ---
+
+    def _ensure_fresh(self):
+        if self._loaded and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if not self._lock.acquire(blocking=not self._loaded):
+            return # Another thread is refreshing; keep serving the current index
+        try:
+            if self._loaded and time.monotonic() - self._checked_at < self.check_interval:
+                return
+            self.refresh()
+        finally:
+            self._lock.release()
+
+    def refresh(self, force=False):
+        """Re-reads the stations table if it changed and applies only the differences."""
+        with pooled_cursor() as cursor:
+            cursor.execute(
+                "SELECT UPDATE_TIME FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'stations'")
+            row = cursor.fetchone()
+            version = row["UPDATE_TIME"] if row else None
+            # UPDATE_TIME can be NULL (e.g. right after a server restart); then always diff
+            if force or not self._loaded or version is None or version != self._table_version:
+                cursor.execute("SELECT station_code, station_name, location FROM stations")
+                rows = cursor.fetchall()
+                self._apply_station_rows(rows)
+                self._table_version = version
+        self._sync_locations()
+        self._loaded = True
+        self._checked_at = time.monotonic()
+
+    def _apply_station_rows(self, rows):
+        current = {row["station_code"]: (row["station_name"], row.get("location")) for row in rows}
+        for code in [c for c in self._stations if c not in current]:
+            self._unindex_station(code)
+        for code, value in current.items():
+            if self._stations.get(code) != value:
+                if code in self._stations:
+                    self._unindex_station(code)
+                self._index_station(code, *value)
+
+    def _index_station(self, code, name, location):
+        keys = _station_keys(code, name, location)
+        for key, weight in keys.items():
+            self._station_index.add(key, code, weight)
+        self._stations[code] = (name, location)
+        self._station_keys[code] = keys
+
+    def _unindex_station(self, code):
+        for key in self._station_keys.pop(code, ()):
+            self._station_index.remove(key, code)
+        del self._stations[code]
+
+    def _sync_locations(self):
+        routes = search_indexes.routes()
+        route_locations = routes.locations() if routes else set()
+        wanted = set()
+        for location in route_locations:
+            for key in _with_aliases(location):
+                wanted.add((key, location))
+        for name, station_location in self._stations.values():
+            city = _city(station_location)
+            location = _route_location_for(city, route_locations)
+            if location:
+                wanted.add((city, location))
+                wanted.add((normalize_name(name), location))
+                wanted.add((normalize_name(_strip_generic(name)), location))
+        for key, location in self._location_keys - wanted:
+            self._location_index.remove(key, location)
+        for key, location in wanted - self._location_keys:
+            self._location_index.add(key, location)
+        self._location_keys = wanted
+
+
+def _city(location):
+    # stations.location looks like "Mumbai, Maharashtra"
+    return normalize_name(location.split(",")[0]) if location else ""
+
+def _strip_generic(name):
+    words = [w for w in normalize_name(name).split() if w not in GENERIC_WORDS]
+    return " ".join(words)
+
+def _with_aliases(name):
+    name = normalize_name(name)
+    for group in ALIAS_GROUPS:
+        if name in group:
+            return set(group)
+    return {name}
+
+def _route_location_for(city, route_locations):
+    if not city:
+        return None
+    for candidate in _with_aliases(city):
+        if candidate in route_locations:
+            return candidate
+    # e.g. city "delhi" when train_details only says "new delhi"; only trust an unambiguous hit
+    containing = [loc for loc in route_locations if city in loc]
+    return containing[0] if len(containing) == 1 else None
+
+# City and alias keys are shared by every station in the city, so they rank below the station's own names
+CITY_KEY_WEIGHT = 0.9
+
+def _station_keys(code, name, location):
+    """Returns {lookup key: weight} for a station."""
+    keys = {}
+    city = _city(location)
+    if city:
+        for alias in _with_aliases(city):
+            keys[alias] = CITY_KEY_WEIGHT
+    for key in (normalize_name(code), normalize_name(name), _strip_generic(name)):
+        keys[key] = 1.0
+    keys.pop("", None)
+    return keys
+
+
+station_resolver = StationResolver(**STATION_RESOLVER_CONFIG)
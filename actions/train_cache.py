@@ -0,0 +1,232 @@
+# train_cache.py
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from . import queries
+from .db import pooled_connection
+from .search_index import search_indexes
+
+# --- Train Details Cache Configuration ---
+# Schedule columns (route, timings) change rarely; the status column changes during the day,
+# so it gets its own, much shorter, TTL.
+TRAIN_CACHE_CONFIG = {
+    "schedule_ttl": float(os.environ.get("TRAIN_CACHE_SCHEDULE_TTL", 3600)), # Seconds
+    "status_ttl": float(os.environ.get("TRAIN_CACHE_STATUS_TTL", 30)),       # Seconds
+    "max_bytes": int(os.environ.get("TRAIN_CACHE_MAX_BYTES", 8 * 1024 * 1024)), # Approximate memory cap
+}
+
+
+def _approx_size(value):
+    """Rough in-memory size of a cached value (containers one level deep)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL and an approximate byte budget."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        size = _approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return # Would evict everything else; just don't cache it
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_where(self, predicate):
+        """Drops every entry whose key matches predicate(key)."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+def _normalize_location(value):
+    return value.strip().lower() if value else None
+
+
+class TrainDetailsCache:
+    """Read-through cache for train_details, keyed by train number and by (from, to) route.
+
+    Schedule rows use schedule_ttl; the status column uses status_ttl, so a fresh schedule with a
+    stale status costs one narrow status query. Route -> train number lists are keyed by the route
+    index build they came from and live no longer than its refresh interval, so a rebuild is
+    picked up on the next lookup instead of after schedule_ttl.
+    """
+
+    def __init__(self, schedule_ttl=3600, status_ttl=30, max_bytes=8 * 1024 * 1024):
+        self.schedule_ttl = schedule_ttl
+        self.status_ttl = status_ttl
+        self._cache = LRUCache(max_bytes)
+
+    # --- Lookups ---
+
+    def get_train(self, train_number):
+        """Returns the train_details row for train_number as a dict, or None if it does not exist."""
+        return self.get_trains([train_number]).get(str(train_number))
+
+    def get_trains(self, train_numbers):
+        """Returns {str(train_number): row} for the given numbers, fetching only what is missing or stale."""
+        keys = [str(n) for n in train_numbers]
+        rows, missing, stale_status = {}, [], []
+        for key in keys:
+            schedule = self._cache.get(("train", key))
+            if schedule is None:
+                missing.append(key)
+                continue
+            status = self._cache.get(("status", key))
+            if status is None:
+                stale_status.append(key)
+            rows[key] = dict(schedule, status=status)
+
+        if missing or stale_status:
+            with pooled_connection() as conn:
+                if missing:
+                    for row in queries.fetch_all(conn, "trains_by_number", missing, in_list=len(missing)):
+                        rows[self._store_row(row)] = row
+                if stale_status:
+                    found = set()
+                    for row in queries.fetch_all(conn, "train_status_by_number", stale_status, in_list=len(stale_status)):
+                        key = str(row["train_number"])
+                        found.add(key)
+                        self._cache.set(("status", key), row["status"], self.status_ttl)
+                        rows[key]["status"] = row["status"]
+                    for key in set(stale_status) - found: # Deleted since it was cached
+                        self.invalidate_train(key)
+                        rows.pop(key, None)
+        return rows
+
+    def find_trains(self, from_location, to_location=None):
+        """Returns rows whose from/to locations contain the given text, ordered by timings.
+
+        to_location=None searches by source only.
+        """
+        return self.find_trains_page(from_location, to_location, offset=0, limit=None)[0]
+
+    def find_trains_page(self, from_location, to_location=None, offset=0, limit=10):
+        """Returns (rows, total): rows offset..offset+limit of find_trains() and the number of matches.
+
+        The ordered match list comes from the route index, so only the requested page of rows is
+        read from the cache or the database. limit=None returns every row from offset on.
+        """
+        numbers = self._route_numbers(from_location, to_location)
+        page = numbers[offset:] if limit is None else numbers[offset:offset + limit]
+        rows = self.get_trains(page)
+        return [rows[n] for n in page if n in rows], len(numbers)
+
+    def list_trains_page(self, after=None, limit=15):
+        """Returns (rows, has_more): up to limit rows ordered by train_number, starting after the
+        train number `after` (None = first page). Only the page is read, never the whole table."""
+        page_key = ("all", None if after is None else str(after), limit)
+        cached = self._cache.get(page_key)
+        if cached is not None:
+            numbers, has_more = cached
+            rows = self.get_trains(numbers)
+            return [rows[n] for n in numbers if n in rows], has_more
+
+        # Keyset pagination: one extra row tells us whether there is a next page
+        with pooled_connection() as conn:
+            if after is None:
+                rows = queries.fetch_all(conn, "trains_page_first", (limit + 1,))
+            else:
+                rows = queries.fetch_all(conn, "trains_page_after", (after, limit + 1))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        numbers = tuple(self._store_row(row) for row in rows)
+        self._cache.set(page_key, (numbers, has_more), self.schedule_ttl)
+        return rows, has_more
+
+    # --- Invalidation hooks ---
+
+    def invalidate_train(self, train_number):
+        """Call after a train's row changes; route lists are dropped too since its route may have moved."""
+        key = str(train_number)
+        self._cache.invalidate(("train", key))
+        self._cache.invalidate(("status", key))
+        self._cache.invalidate_where(lambda k: k[0] in ("route", "all"))
+        search_indexes.invalidate()
+
+    def invalidate_status(self, train_number):
+        """Call after only the status column of a train changes."""
+        self._cache.invalidate(("status", str(train_number)))
+
+    def invalidate_all(self):
+        self._cache.clear()
+        search_indexes.invalidate()
+
+    def stats(self):
+        return self._cache.stats()
+
+    # --- Internals ---
+
+    def _route_numbers(self, from_location, to_location):
+        from_key, to_key = _normalize_location(from_location), _normalize_location(to_location)
+        routes = search_indexes.routes()
+        route_key = ("route", from_key, to_key, routes.generation)
+        numbers = self._cache.get(route_key)
+        if numbers is None:
+            # The route index replaces a LIKE '%x%' full scan of train_details
+            numbers = tuple(routes.find_trains(from_key, to_key))
+            self._cache.set(route_key, numbers, min(self.schedule_ttl, search_indexes.refresh_interval))
+        return numbers
+
+    def _store_row(self, row):
+        key = str(row["train_number"])
+        schedule = {k: v for k, v in row.items() if k != "status"}
+        self._cache.set(("train", key), schedule, self.schedule_ttl)
+        self._cache.set(("status", key), row["status"], self.status_ttl)
+        return key
+
+
+train_cache = TrainDetailsCache(**TRAIN_CACHE_CONFIG)
@@ -0,0 +1,390 @@
+"""End-to-end benchmark of the full stack: the REST webhook script.js calls, NLU and dialogue in the
+Rasa server, the action server and MySQL. Replays multi-turn conversations built from
+data/stories.yml and single-turn ones from intent_accuracy.csv at a chosen concurrency, and reports
+throughput plus p50/p95/p99 latency per intent and per action.
+
+    python benchmark.py --load-fixture                    # (re)create railway_chatbot_bench from the SQL dump
+    DB_NAME=railway_chatbot_bench rasa run actions        # action server against the fixture database
+    rasa run --enable-api
+    python benchmark.py --concurrency 20 --conversations 500 --save-baseline bench_baseline.json
+    python benchmark.py --concurrency 20 --conversations 500 --baseline bench_baseline.json
+
+Per-intent latencies are measured here, per user turn. Per-action latencies and error counts are read
+from the action server's /metrics (actions/metrics.py) before and after the run. With --baseline the
+exit status is 1 if any p95 got slower by more than --max-regression.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import yaml
+
+# --- Benchmark Configuration ---
+BENCH_CONFIG = {
+    "rasa_url": os.environ.get("RASA_URL", "http://localhost:5005"),
+    "metrics_url": os.environ.get("ACTION_METRICS_URL", "http://localhost:9105/metrics"),
+    "fixture": "railway_chatbot database", # SQL dump shipped with the repo
+    "database": os.environ.get("BENCH_DB_NAME", "railway_chatbot_bench"),
+}
+
+LIVE_DATABASE = "railway_chatbot" # Name used inside the SQL dump; never dropped by --load-fixture
+
+
+# --- Fixture Database ---
+def iter_sql_statements(path):
+    """Yields the statements of a SQL script (one per trailing ';', '--' comment lines skipped)."""
+    statement = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("--"):
+                continue
+            statement.append(line)
+            if stripped.endswith(";"):
+                yield "".join(statement).strip().rstrip(";")
+                statement = []
+    if statement:
+        yield "".join(statement).strip()
+
+ROW_RETURNING = re.compile(r"(SELECT|SHOW|DESCRIBE|DESC|EXPLAIN|WITH|TABLE|VALUES)\b", re.I)
+
+def fixture_statements(sql_path):
+    """Yields the dump's DDL/DML statements for the fixture database.
+
+    The dump's own CREATE DATABASE / USE lines are skipped so everything lands in the fixture
+    database, and so are the example queries at its end: a result set nobody reads would make the
+    next execute() fail with "Unread result found".
+    """
+    for statement in iter_sql_statements(sql_path):
+        if re.match(rf"(CREATE DATABASE( IF NOT EXISTS)?|USE)\s+`?{LIVE_DATABASE}`?\s*$", statement, re.I):
+            continue
+        if ROW_RETURNING.match(statement):
+            continue
+        yield statement
+
+def load_fixture(sql_path, database):
+    """Drops and recreates `database` from the SQL dump, so every run starts from the same data."""
+    import mysql.connector
+    from actions.db import DB_CONFIG
+
+    if database == LIVE_DATABASE:
+        raise ValueError(f"Refusing to drop '{LIVE_DATABASE}'; pick another --database for the fixture.")
+    server_config = {k: v for k, v in DB_CONFIG.items() if k != "database"}
+    conn = mysql.connector.connect(**server_config)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}`")
+        cursor.execute(f"USE `{database}`")
+        count = 0
+        for statement in fixture_statements(sql_path):
+            cursor.execute(statement)
+            if cursor.with_rows:
+                cursor.fetchall() # Anything ROW_RETURNING missed must still be read before the next statement
+            count += 1
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"Loaded {count} statements from '{sql_path}' into database '{database}'.")
+
+
+# --- Conversations ---
+ENTITY_PATTERN = re.compile(r"\[([^\]]+)\]\((\w+)\)") # [New Delhi](from_location)
+
+def load_nlu_examples(path):
+    """Returns {intent: [example text, ...]} from an NLU training data file."""
+    with open(path, encoding="utf-8") as f:
+        nlu = yaml.safe_load(f).get("nlu", [])
+    examples = defaultdict(list)
+    for block in nlu:
+        if "intent" not in block:
+            continue # regex / lookup / synonym blocks
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                examples[block["intent"]].append(line[2:].strip())
+    return examples
+
+def _step_entities(step):
+    entities = {}
+    for entity in step.get("entities") or []:
+        if isinstance(entity, dict):
+            entities.update({name: str(value) for name, value in entity.items()})
+        else:
+            entities[entity] = None
+    return entities
+
+def render_user_turn(intent, entities, examples, rng):
+    """Picks a training example for the intent with the same entities and puts the story's values in.
+
+    Falls back to the "/intent{...}" shortcut (which skips NLU) when no example fits.
+    """
+    wanted = set(entities)
+    candidates = [text for text in examples.get(intent, [])
+                  if {name for _, name in ENTITY_PATTERN.findall(text)} == wanted]
+    if not candidates:
+        values = {name: value for name, value in entities.items() if value is not None}
+        return f"/{intent}{json.dumps(values)}" if values else f"/{intent}"
+    text = rng.choice(candidates)
+    return ENTITY_PATTERN.sub(lambda m: entities.get(m.group(2)) or m.group(1), text)
+
+def story_conversations(stories_path, examples, rng):
+    """Returns one conversation per story: a list of (intent, user text) turns."""
+    with open(stories_path, encoding="utf-8") as f:
+        stories = yaml.safe_load(f).get("stories", [])
+    conversations = []
+    for story in stories:
+        turns = []
+        for step in story.get("steps", []):
+            if "or" in step:
+                step = step["or"][0] # Any branch is a valid user turn
+            if "intent" in step:
+                turns.append((step["intent"], render_user_turn(step["intent"], _step_entities(step), examples, rng)))
+        if turns:
+            conversations.append(turns)
+    return conversations
+
+def csv_conversations(csv_path):
+    """Single-turn conversations from the intent evaluation CSV (UserInput, ExpectedIntent)."""
+    df = pd.read_csv(csv_path)
+    return [[(row["ExpectedIntent"], str(row["UserInput"]))] for _, row in df.iterrows()]
+
+
+# --- Load Generation ---
+def send_turn(rasa_url, sender_id, text, timeout):
+    """POSTs one message to the REST channel; returns (seconds, error or None)."""
+    body = json.dumps({"sender": sender_id, "message": text}).encode("utf-8")
+    request = urllib.request.Request(f"{rasa_url}/webhooks/rest/webhook", data=body,
+                                     headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            json.loads(response.read() or b"[]")
+        return time.perf_counter() - started, None
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        return time.perf_counter() - started, type(e).__name__
+
+def run_load(conversations, count, concurrency, rasa_url, timeout, record=True):
+    """Replays `count` conversations (cycling through the list), `concurrency` at a time.
+
+    Returns ([(intent, seconds, error)], wall seconds).
+    """
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+    results_lock = threading.Lock()
+
+    def replay(n):
+        sender_id = f"bench-{run_id}-{n}" # Fresh tracker per conversation
+        for intent, text in conversations[n % len(conversations)]:
+            seconds, error = send_turn(rasa_url, sender_id, text, timeout)
+            if record:
+                with results_lock:
+                    results.append((intent, seconds, error))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        list(pool.map(replay, range(count)))
+    return results, time.perf_counter() - started
+
+
+# --- Statistics ---
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(latencies, errors=0):
+    values = sorted(latencies)
+    return {"count": len(values), "errors": errors,
+            "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99)}
+
+def summarize_by_intent(results):
+    latencies, errors = defaultdict(list), defaultdict(int)
+    for intent, seconds, error in results:
+        if error:
+            errors[intent] += 1
+        else:
+            latencies[intent].append(seconds)
+    return {intent: summarize(latencies[intent], errors[intent]) for intent in sorted(set(latencies) | set(errors))}
+
+
+# --- Action Server Histograms ---
+BUCKET_LINE = re.compile(r'^action_duration_seconds_bucket\{action="([^"]*)",le="([^"]+)"\} (\S+)$')
+ERROR_LINE = re.compile(r'^action_errors_total\{action="([^"]*)",kind="([^"]*)"\} (\S+)$')
+
+def scrape_action_metrics(metrics_url):
+    """Returns ({action: {le: cumulative count}}, {action: error count}) from the action server,
+    or None if unreachable."""
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=5) as response:
+            text = response.read().decode("utf-8")
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Warning: Could not read action metrics from {metrics_url}: {e}")
+        return None
+    return parse_action_metrics(text)
+
+def parse_action_metrics(text):
+    histograms, errors = defaultdict(dict), defaultdict(float)
+    for line in text.splitlines():
+        match = BUCKET_LINE.match(line)
+        if match:
+            action, le, value = match.groups()
+            histograms[action][float(le)] = float(value)
+            continue
+        match = ERROR_LINE.match(line)
+        if match:
+            action, _, value = match.groups()
+            errors[action] += float(value) # Summed over kinds (timeout, db, connection, exception)
+    return histograms, errors
+
+def histogram_quantile(q, buckets):
+    """Quantile (0..1) from cumulative buckets {le: count}, interpolated like Prometheus' histogram_quantile."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return float("nan")
+    rank = q * total
+    previous_bound, previous_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return previous_bound # Beyond the largest finite bucket
+            width = count - previous_count
+            return previous_bound + (bound - previous_bound) * ((rank - previous_count) / width if width else 0)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+def summarize_actions(before, after):
+    """Per-action latency and errors over the run, from the difference of two metrics scrapes."""
+    (before_histograms, before_errors), (after_histograms, after_errors) = before, after
+    summary = {}
+    for action in sorted(set(after_histograms) | set(after_errors)):
+        buckets, earlier = after_histograms.get(action, {}), before_histograms.get(action, {})
+        run_buckets = {le: count - earlier.get(le, 0) for le, count in buckets.items()}
+        count = run_buckets.get(float("inf"), 0)
+        errors = after_errors.get(action, 0) - before_errors.get(action, 0)
+        if count > 0 or errors > 0:
+            summary[action] = {"count": int(count), "errors": int(errors),
+                               **{f"p{q}": histogram_quantile(q / 100, run_buckets) for q in (50, 95, 99)}}
+    return summary
+
+
+# --- Reporting ---
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'':<36}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in rows.items():
+        print(f"{name:<36}{stats['count']:>8}{stats['errors']:>8}"
+              f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}")
+
+def find_regressions(report, baseline, max_regression, min_count):
+    """Returns a message for every intent/action whose p95 exceeds the baseline's by more than max_regression."""
+    regressions = []
+    base, current = baseline.get("overall"), report.get("overall")
+    if base and current and current["p95"] > base["p95"] * (1 + max_regression):
+        regressions.append(f"all turns: p95 {base['p95'] * 1000:.1f} ms -> {current['p95'] * 1000:.1f} ms")
+    for section in ("intents", "actions"):
+        for name, base in baseline.get(section, {}).items():
+            current = report.get(section, {}).get(name)
+            if not current or current["count"] < min_count or base["count"] < min_count:
+                continue
+            if current["p95"] > base["p95"] * (1 + max_regression):
+                regressions.append(f"{section[:-1]} '{name}': p95 {base['p95'] * 1000:.1f} ms -> {current['p95'] * 1000:.1f} ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end load test of the Rasa server, action server and MySQL")
+    parser.add_argument("--load-fixture", action="store_true", help="Recreate the fixture database from the SQL dump and exit")
+    parser.add_argument("--database", default=BENCH_CONFIG["database"], help="Fixture database name")
+    parser.add_argument("--fixture", default=BENCH_CONFIG["fixture"], help="SQL dump to load")
+    parser.add_argument("--rasa-url", default=BENCH_CONFIG["rasa_url"])
+    parser.add_argument("--metrics-url", default=BENCH_CONFIG["metrics_url"], help="Action server /metrics ('' to skip)")
+    parser.add_argument("--source", choices=["stories", "csv", "both"], default="both",
+                        help="Replay data/stories.yml conversations, intent_accuracy.csv utterances, or both")
+    parser.add_argument("--conversations", type=int, default=200, help="Conversations to replay")
+    parser.add_argument("--concurrency", type=int, default=10, help="Conversations in flight at once")
+    parser.add_argument("--warmup", type=int, default=20, help="Conversations replayed first and not measured")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds per request")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for choosing example utterances")
+    parser.add_argument("--report", default="benchmark_report.json", help="Where to write the JSON report")
+    parser.add_argument("--save-baseline", help="Also write the report here, for later --baseline runs")
+    parser.add_argument("--baseline", help="Fail if p95 regressed against this earlier report")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-count", type=int, default=20, help="Ignore intents/actions with fewer samples")
+    return parser.parse_args(argv)
+
+def main(args):
+    if args.load_fixture:
+        load_fixture(args.fixture, args.database)
+        return 0
+
+    rng = random.Random(args.seed)
+    conversations = []
+    if args.source in ("stories", "both"):
+        conversations += story_conversations(os.path.join("data", "stories.yml"),
+                                             load_nlu_examples(os.path.join("data", "nlu.yml")), rng)
+    if args.source in ("csv", "both"):
+        conversations += csv_conversations("intent_accuracy.csv")
+    rng.shuffle(conversations)
+    print(f"{len(conversations)} distinct conversations; replaying {args.conversations} "
+          f"at concurrency {args.concurrency} against {args.rasa_url}")
+
+    if args.warmup:
+        run_load(conversations, args.warmup, args.concurrency, args.rasa_url, args.timeout, record=False)
+    before = scrape_action_metrics(args.metrics_url) if args.metrics_url else None
+    results, wall_seconds = run_load(conversations, args.conversations, args.concurrency, args.rasa_url, args.timeout)
+    after = scrape_action_metrics(args.metrics_url) if before is not None else None
+
+    ok_latencies = [seconds for _, seconds, error in results if not error]
+    report = {
+        "config": {"conversations": args.conversations, "concurrency": args.concurrency, "source": args.source,
+                   "rasa_url": args.rasa_url},
+        "wall_seconds": wall_seconds,
+        "turns_per_second": len(results) / wall_seconds if wall_seconds else 0.0,
+        "overall": summarize(ok_latencies, len(results) - len(ok_latencies)),
+        "intents": summarize_by_intent(results),
+        "actions": summarize_actions(before, after) if after is not None else {},
+    }
+
+    print(f"\n{len(results)} turns in {wall_seconds:.1f}s = {report['turns_per_second']:.1f} turns/s "
+          f"({report['overall']['errors']} errors)")
+    print_table("Per turn, by intent (client side)", {"ALL": report["overall"], **report["intents"]})
+    if report["actions"]:
+        print_table("Per action (action server, from /metrics)", report["actions"])
+
+    for path in filter(None, [args.report, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to '{path}'")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.max_regression, args.min_count)
+        if regressions:
+            print(f"\nREGRESSIONS (p95 more than {args.max_regression:.0%} slower than '{args.baseline}'):")
+            for message in regressions:
+                print(f"- {message}")
+            return 1
+        print(f"\nNo p95 regressions beyond {args.max_regression:.0%} against '{args.baseline}'.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,202 @@
+"""Chunked input and incremental output for the evaluation scripts.
+
+intent.py and rouge_bert.py use these in --stream mode so that replaying a very large
+conversation log keeps memory flat: the input CSV is read a chunk at a time, scored rows
+are appended to the output file as each chunk finishes, and averages are kept in running
+accumulators instead of being computed from a full DataFrame at the end.
+
+RowCheckpoint persists per-row results as they finish, so a crashed or interrupted run
+resumes where it stopped instead of starting again from row 0.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import pandas as pd
+
+try:
+    import pyarrow as pa # Optional: only needed for .parquet output
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+def iter_csv_chunks(path, chunk_size):
+    """Yields DataFrames of up to chunk_size rows. The index keeps counting across chunks,
+    so index + 2 is still the row number in the CSV file."""
+    with pd.read_csv(path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+class ResultWriter:
+    """Appends rows to a CSV or Parquet file (picked by extension) one chunk at a time.
+
+    The first chunk written fixes the columns; later chunks are aligned to them.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.is_parquet = path.lower().endswith(".parquet")
+        if self.is_parquet and pq is None:
+            raise ImportError(f"Writing '{path}' needs pyarrow (pip install pyarrow); use a .csv path instead.")
+        self.columns = None
+        self.rows_written = 0
+        self._parquet_writer = None
+
+    def write(self, rows):
+        """Appends a list of row dicts (or a DataFrame)."""
+        chunk_df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+        if chunk_df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(chunk_df.columns)
+        else:
+            chunk_df = chunk_df.reindex(columns=self.columns)
+
+        if self.is_parquet:
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(chunk_df, preserve_index=False)
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk_df, schema=self._parquet_writer.schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+        else:
+            first = self.rows_written == 0
+            chunk_df.to_csv(self.path, mode="w" if first else "a", header=first, index=False)
+        self.rows_written += len(chunk_df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RunningMean:
+    """Mean of a stream of values; non-numeric and NaN values are skipped, like
+    pd.to_numeric(..., errors='coerce').mean()."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        if math.isnan(value):
+            return
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+# --- Resumable Runs ---
+def fingerprint_file(path, block_size=1 << 20):
+    """SHA-256 of a file's contents (e.g. a trained model archive)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def checkpoint_path(directory, name, *fingerprint_parts):
+    """Checkpoint file for one script + model (+ scoring settings); a new model gets a fresh file."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in fingerprint_parts).encode("utf-8")).hexdigest()
+    return os.path.join(directory, f"{name}-{digest[:16]}.sqlite")
+
+def _json_default(value):
+    if hasattr(value, "tolist"): # numpy scalars and arrays
+        return value.tolist()
+    return str(value)
+
+
+class RowCheckpoint:
+    """Per-row results stored in SQLite, keyed by input row.
+
+    A row key combines the CSV row index with a hash of the row's inputs, so an edited row
+    is recomputed rather than served stale. Writes are committed every flush_every rows.
+    """
+    def __init__(self, path, flush_every=64):
+        self.path = path
+        self.flush_every = flush_every
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rows (row_key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+        self._conn.commit()
+        self._pending = 0
+
+    @staticmethod
+    def row_key(index, *values):
+        digest = hashlib.sha1("\x1f".join(str(v) for v in values).encode("utf-8")).hexdigest()
+        return f"{index}:{digest[:16]}"
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def load(self, keys, batch_size=500):
+        """Returns {row_key: result} for the keys that already have a stored result."""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ", ".join("?" * len(batch))
+            for row_key, result in self._conn.execute(
+                    f"SELECT row_key, result FROM rows WHERE row_key IN ({placeholders})", batch):
+                found[row_key] = json.loads(result)
+        return found
+
+    def save(self, row_key, result):
+        self._conn.execute("INSERT OR REPLACE INTO rows (row_key, result) VALUES (?, ?)",
+                           (row_key, json.dumps(result, default=_json_default)))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_checkpoint(args, name, *fingerprint_parts):
+    """Opens the checkpoint selected by the --checkpoint-dir / --no-checkpoint / --restart flags, or returns None."""
+    if args.no_checkpoint:
+        return None
+    path = checkpoint_path(args.checkpoint_dir, name, *fingerprint_parts)
+    if args.restart and os.path.exists(path):
+        os.remove(path)
+        print(f"Discarded checkpoint '{path}'")
+    checkpoint = RowCheckpoint(path)
+    done = len(checkpoint)
+    if done:
+        print(f"Resuming from checkpoint '{path}' ({done} rows already done for this model)")
+    else:
+        print(f"Checkpointing finished rows to '{path}'")
+    return checkpoint
+
+def add_checkpoint_args(parser):
+    parser.add_argument("--checkpoint-dir", default=".eval_checkpoints",
+                        help="Where finished rows are kept so an interrupted run can resume")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help="Do not read or write checkpoints")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard this model's checkpoint and evaluate every row again")
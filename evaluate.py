@@ -0,0 +1,36 @@
+"""Runs the intent evaluation (intent.py) and the response evaluation (rouge_bert.py) in one
+process, on one loaded model.
+
+    python evaluate.py
+    python evaluate.py --only intent --intent-args "--stream --chunk-size 5000"
+"""
+import argparse
+import asyncio
+import shlex
+import intent
+import rouge_bert
+from model_loader import load_agent
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run intent and response evaluation with a single model load")
+    parser.add_argument("--only", choices=["intent", "responses"], help="Run just one of the evaluations")
+    parser.add_argument("--intent-args", default="", help='Extra intent.py options, e.g. "--stream --chunk-size 5000"')
+    parser.add_argument("--response-args", default="", help='Extra rouge_bert.py options, e.g. "--bertscore-batch-size 32"')
+    return parser.parse_args()
+
+async def main(args):
+    try:
+        load_agent("models") # Both scripts get this agent back from load_agent()
+    except Exception as e:
+        print(f"Error loading agent from 'models': {e}")
+        return
+
+    if args.only != "responses":
+        print("\n========== Intent evaluation (intent.py) ==========")
+        await intent.main(intent.parse_args(shlex.split(args.intent_args)))
+    if args.only != "intent":
+        print("\n========== Response evaluation (rouge_bert.py) ==========")
+        await rouge_bert.main(rouge_bert.parse_args(shlex.split(args.response_args)))
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,238 @@
+"""Deterministic fast path for PNR numbers, train numbers and station names.
+
+Many messages are just "PNR 4521367890" or "status of 12951". For those the intent and entity are
+certain from the text alone, so install_fast_path() answers them from precompiled patterns before
+the NLU pipeline runs, the same way nlu_cache.py answers repeated messages. Anything the patterns do
+not fully match (including bare numbers, whose meaning depends on the dialogue) goes to the model.
+
+For the rest, FastPathExtractor runs after DIETClassifier in config.yml. It puts the exact 10-digit
+PNR and 5-digit train number spans, and station names from the `station` / `station_code` lookup
+tables in data/nlu.yml, in place of whatever DIET extracted there.
+
+Only the server uses the short-circuit, through nlu_cache.CachedRestInput. The evaluation scripts
+(intent.py, rouge_bert.py, evaluate.py) measure the model and load their agent without it.
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional, Text
+import rasa.shared.utils.io
+from rasa.engine.graph import ExecutionContext, GraphComponent
+from rasa.engine.recipes.default_recipe import DefaultV1Recipe
+from rasa.engine.storage.resource import Resource
+from rasa.engine.storage.storage import ModelStorage
+from rasa.nlu.extractors.extractor import EntityExtractorMixin
+from rasa.shared.nlu.constants import ENTITIES, INTENT, TEXT
+from rasa.shared.nlu.training_data.message import Message
+from rasa.shared.nlu.training_data.training_data import TrainingData
+
+# --- Fast Path Configuration ---
+FAST_PATH_CONFIG = {
+    "enabled": os.environ.get("NLU_FAST_PATH", "1") == "1", # 0 sends every message to the model
+}
+
+PNR_PATTERN = re.compile(r"(?<!\d)\d{10}(?!\d)")
+TRAIN_NUMBER_PATTERN = re.compile(r"(?<!\d)\d{5}(?!\d)")
+
+# Whole-message patterns (case-insensitive, surrounding whitespace ignored) -> (intent, entity).
+# Only phrasings that cannot mean anything else belong here; "12951" alone may be a fare or an
+# inform turn, so it is left to the model.
+_PNR = r"pnr(?:\s+(?:no\.?|number|status))?(?:\s+(?:is|for|of))?\s*[:#-]?\s*(?P<value>\d{10})"
+_TRAIN = r"(?:train\s+)?(?:(?:no\.?|number)\s*)?(?P<value>\d{5})"
+SHORT_CIRCUIT_PATTERNS = [
+    ("ask_pnr_status", "pnr_number", rf"(?:(?:check|show|get)\s+)?(?:my\s+)?{_PNR}(?:\s+status)?\s*[.?!]*"),
+    ("ask_pnr_status", "pnr_number", rf"(?:what(?:'s|\s+is)\s+the\s+)?status\s+(?:of|for)\s+(?:my\s+)?{_PNR}\s*[.?!]*"),
+    ("ask_train_status", "train_number",
+     rf"(?:what(?:'s|\s+is)\s+the\s+)?(?:running\s+|current\s+)?status\s+(?:of|for)\s+{_TRAIN}\s*[.?!]*"),
+    ("ask_train_status", "train_number", rf"{_TRAIN}\s+(?:running\s+|current\s+)?status\s*[.?!]*"),
+]
+
+# Entity types each number pattern may stand for; the first is used unless the intent says otherwise
+NUMBER_ENTITIES = [
+    (PNR_PATTERN, ("pnr_number", "pnr_number_to_cancel")),
+    (TRAIN_NUMBER_PATTERN, ("train_number",)),
+]
+STATION_ENTITIES = ("from_location", "to_location", "station_identifier")
+KNOWN_ENTITIES = {entity for _, allowed in NUMBER_ENTITIES for entity in allowed} | set(STATION_ENTITIES)
+INTENT_ENTITY_OVERRIDES = {"cancel_ticket": {"pnr_number": "pnr_number_to_cancel"}}
+STATION_PREPOSITIONS = {"from": "from_location", "to": "to_location"}
+
+
+def _entity(entity, start, end, value, extractor="FastPathExtractor"):
+    return {"entity": entity, "start": start, "end": end, "value": value,
+            "confidence_entity": 1.0, "extractor": extractor}
+
+
+class FastPath:
+    """Parses whole messages matching SHORT_CIRCUIT_PATTERNS without the model, with hit counters."""
+
+    def __init__(self, patterns=SHORT_CIRCUIT_PATTERNS, enabled=True):
+        self.enabled = enabled
+        self.patterns = [(intent, entity, re.compile(pattern, re.IGNORECASE)) for intent, entity, pattern in patterns]
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, text):
+        """Returns a parse result like the processor's for text, or None if the model should parse it."""
+        if not self.enabled or not text or text.startswith("/"):
+            return None
+        stripped = text.strip()
+        offset = len(text) - len(text.lstrip())
+        for intent, entity, pattern in self.patterns:
+            match = pattern.fullmatch(stripped)
+            if match:
+                self.hits += 1
+                start, end = match.span("value")
+                return {
+                    "text": text,
+                    "intent": {"name": intent, "confidence": 1.0},
+                    "entities": [_entity(entity, offset + start, offset + end, match.group("value"))],
+                    "intent_ranking": [{"name": intent, "confidence": 1.0}],
+                }
+        self.misses += 1
+        return None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0, "enabled": self.enabled}
+
+
+fast_path = FastPath(enabled=FAST_PATH_CONFIG["enabled"])
+
+
+def install_fast_path(agent, path=fast_path):
+    """Wraps agent.processor.parse_message so fast-path messages skip the model; safe to call repeatedly.
+
+    Install it after install_parse_cache() so it is checked first: a pattern match is cheaper than a cache copy.
+    """
+    processor = getattr(agent, "processor", None)
+    if processor is None or not path.enabled or getattr(processor, "_fast_path", None) is path:
+        return
+    model_parse_message = processor.parse_message
+
+    async def parse_message(message, *args, **kwargs):
+        result = path.parse(message.text)
+        if result is None:
+            result = await model_parse_message(message, *args, **kwargs)
+        return result
+
+    processor.parse_message = parse_message
+    processor._fast_path = path
+
+
+# --- Station Lookup ---
+class StationMatcher:
+    """Finds lookup-table station names (any case) and station codes (upper case only) in text, longest first."""
+
+    def __init__(self, names=(), codes=()):
+        self.names = sorted({name.strip() for name in names if name.strip()}, key=len, reverse=True)
+        self.codes = sorted({code.strip() for code in codes if code.strip()}, key=len, reverse=True)
+        self._patterns = []
+        if self.names:
+            self._patterns.append(re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, self.names)) + r")(?!\w)",
+                                             re.IGNORECASE))
+        if self.codes:
+            self._patterns.append(re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, self.codes)) + r")(?!\w)"))
+
+    def find(self, text):
+        """Returns non-overlapping (start, end) spans, preferring the longest match."""
+        spans = sorted((m.span() for pattern in self._patterns for m in pattern.finditer(text)),
+                       key=lambda span: (span[0], span[0] - span[1]))
+        found, last_end = [], -1
+        for start, end in spans:
+            if start >= last_end:
+                found.append((start, end))
+                last_end = end
+        return found
+
+
+def _overlapping(entities, start, end):
+    return [e for e in entities if e.get("start") is not None and e["start"] < end and start < e["end"]]
+
+def _previous_word(text, start):
+    words = text[:start].split()
+    return words[-1].lower() if words else ""
+
+
+@DefaultV1Recipe.register([DefaultV1Recipe.ComponentType.ENTITY_EXTRACTOR], is_trainable=True)
+class FastPathExtractor(GraphComponent, EntityExtractorMixin):
+    """Replaces model entities with exact pattern and lookup matches for PNRs, train numbers and stations.
+
+    Where DIET tagged the same span with a type the pattern allows (e.g. pnr_number_to_cancel), its type
+    is kept and only the span is corrected; a wrong type from these entities (a 10-digit train_number)
+    is replaced. A span DIET gave an unrelated type (e.g. a 5-digit user_id) is left alone.
+    """
+
+    @staticmethod
+    def get_default_config() -> Dict[Text, Any]:
+        return {
+            "station_lookup": "station",           # Lookup table of station and city names (any case)
+            "station_code_lookup": "station_code", # Lookup table of station codes (matched in upper case only)
+        }
+
+    def __init__(self, config: Dict[Text, Any], model_storage: ModelStorage, resource: Resource,
+                 names: Optional[List[Text]] = None, codes: Optional[List[Text]] = None) -> None:
+        self._config = config
+        self._model_storage = model_storage
+        self._resource = resource
+        self._stations = StationMatcher(names or [], codes or [])
+
+    @classmethod
+    def create(cls, config: Dict[Text, Any], model_storage: ModelStorage, resource: Resource,
+               execution_context: ExecutionContext) -> GraphComponent:
+        return cls(config, model_storage, resource)
+
+    def train(self, training_data: TrainingData) -> Resource:
+        def elements(name):
+            return [element for table in training_data.lookup_tables if table.get("name") == name
+                    for element in (table.get("elements") or []) if isinstance(element, str)]
+
+        self._stations = StationMatcher(elements(self._config["station_lookup"]),
+                                        elements(self._config["station_code_lookup"]))
+        with self._model_storage.write_to(self._resource) as directory:
+            rasa.shared.utils.io.dump_obj_as_json_to_file(
+                directory / "stations.json", {"names": self._stations.names, "codes": self._stations.codes})
+        return self._resource
+
+    @classmethod
+    def load(cls, config: Dict[Text, Any], model_storage: ModelStorage, resource: Resource,
+             execution_context: ExecutionContext, **kwargs: Any) -> GraphComponent:
+        try:
+            with model_storage.read_from(resource) as directory:
+                stations = rasa.shared.utils.io.read_json_file(directory / "stations.json")
+        except ValueError:
+            stations = {}
+        return cls(config, model_storage, resource, stations.get("names"), stations.get("codes"))
+
+    def process(self, messages: List[Message]) -> List[Message]:
+        for message in messages:
+            text = message.get(TEXT)
+            if not text:
+                continue
+            intent = (message.get(INTENT) or {}).get("name")
+            entities = list(message.get(ENTITIES, []))
+            for start, end, allowed, default in self._candidates(text, intent):
+                overlapping = _overlapping(entities, start, end)
+                if any(e["entity"] not in KNOWN_ENTITIES for e in overlapping):
+                    continue # DIET read this span as something else (e.g. user_id); trust the context
+                kept = [e["entity"] for e in overlapping if e["entity"] in allowed]
+                entity_type = kept[0] if kept else default
+                if entity_type is None:
+                    continue
+                entities = [e for e in entities if e not in overlapping]
+                entities.append(_entity(entity_type, start, end, text[start:end], self.name))
+            message.set(ENTITIES, sorted(entities, key=lambda e: e.get("start") or 0), add_to_output=True)
+        return messages
+
+    def _candidates(self, text, intent):
+        """Yields (start, end, allowed entity types, default type or None) for every pattern/lookup match."""
+        overrides = INTENT_ENTITY_OVERRIDES.get(intent, {})
+        for pattern, allowed in NUMBER_ENTITIES:
+            for match in pattern.finditer(text):
+                yield match.start(), match.end(), allowed, overrides.get(allowed[0], allowed[0])
+        for start, end in self._stations.find(text):
+            # "from X" / "to X" decide the role; otherwise only a station question has an obvious one
+            default = STATION_PREPOSITIONS.get(_previous_word(text, start))
+            if default is None and intent == "ask_station_info":
+                default = "station_identifier"
+            yield start, end, STATION_ENTITIES, default
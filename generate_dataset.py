@@ -0,0 +1,267 @@
+"""Synthetic railway_chatbot dataset at production scale, for benchmarking and tuning the actions' queries.
+
+Writes one tab-separated file per table (MySQL LOAD DATA format, \\N for NULL) plus load.sql, which
+recreates the schema from the `railway_chatbot database` dump in a separate database and bulk-loads
+the files:
+
+    python generate_dataset.py --out dataset --trains 10000 --users 1000000 --pnrs 10000000
+    mysql --local-infile=1 -u root -p < dataset/load.sql
+    DB_NAME=railway_chatbot_bench rasa run actions
+
+Popularity is skewed like real traffic: PNRs pick trains and booking_history picks users from Zipf
+distributions (--train-skew, --user-skew), so a few hot trains and heavy bookers dominate, and trains
+run mostly between big cities. Rows are generated in chunks, so memory stays flat at any scale.
+"""
+import argparse
+import csv
+import datetime
+import os
+import numpy as np
+import pandas as pd
+from benchmark import BENCH_CONFIG, LIVE_DATABASE, iter_sql_statements
+
+# --- Vocabulary ---
+BIG_CITIES = ["New Delhi", "Mumbai", "Kolkata", "Chennai", "Bangalore", "Hyderabad", "Pune", "Ahmedabad",
+              "Jaipur", "Lucknow", "Patna", "Bhopal", "Nagpur", "Surat", "Kanpur", "Indore", "Varanasi",
+              "Guwahati", "Bhubaneswar", "Chandigarh", "Amritsar", "Jammu Tawi", "Coimbatore", "Madurai",
+              "Visakhapatnam", "Vijayawada", "Thiruvananthapuram", "Ernakulam", "Mangalore", "Agra"]
+TOWN_PREFIXES = ["Ram", "Dev", "Shiv", "Krishna", "Hari", "Chandra", "Raj", "Sita", "Ganga", "Indra",
+                 "Lakshmi", "Sur", "Vijay", "Kalyan", "Anand", "Bhawani", "Sultan", "Jagdish", "Narayan",
+                 "Madhav", "Gopal", "Kishan", "Mohan", "Sundar", "Bela", "Nand", "Udai", "Jay", "Amar", "Prem"]
+TOWN_SUFFIXES = ["pur", "nagar", "abad", "ganj", "garh", "pura", "wadi", "kot", "gaon", "palli", "halli",
+                 "puram", "ner", "sar"]
+STATION_KINDS = ["Junction", "Cantt", "Road", "City", "Terminus", "Town"]
+STATES = ["Delhi", "Maharashtra", "West Bengal", "Tamil Nadu", "Karnataka", "Telangana", "Gujarat",
+          "Rajasthan", "Uttar Pradesh", "Bihar", "Madhya Pradesh", "Assam", "Odisha", "Punjab", "Kerala",
+          "Andhra Pradesh", "Jammu and Kashmir", "Haryana", "Jharkhand", "Chhattisgarh"]
+FIRST_NAMES = ["Rajesh", "Priya", "Amit", "Sunita", "Vikram", "Anjali", "Rahul", "Neha", "Suresh", "Kavita",
+               "Arjun", "Pooja", "Manoj", "Deepa", "Sanjay", "Meera", "Karan", "Ritu", "Vivek", "Asha"]
+LAST_NAMES = ["Kumar", "Sharma", "Singh", "Patel", "Reddy", "Iyer", "Gupta", "Das", "Nair", "Joshi",
+              "Verma", "Mehta", "Rao", "Banerjee", "Chopra", "Mishra", "Pillai", "Yadav", "Bose", "Khan"]
+STREETS = ["MG Road", "Station Road", "Nehru Nagar", "Gandhi Chowk", "Park Street", "Lake View", "Civil Lines",
+           "Market Road", "Ring Road", "Temple Street"]
+TRAIN_STATUSES = (["On Time", "Delayed", "Cancelled"], [0.75, 0.20, 0.05])
+PNR_STATUSES = (["Confirmed", "Waiting List", "RAC", "Cancelled"], [0.70, 0.12, 0.05, 0.13])
+FARE_CLASSES = [("Sleeper", 1.0), ("AC Third", 2.6), ("AC Second", 3.7), ("AC First", 6.2),
+                ("Chair Car", 1.9), ("Second Sitting", 0.45), ("Executive Chair Car", 3.9)]
+COACH_PREFIXES = ["S", "B", "A", "H", "C", "D"]
+
+TABLE_COLUMNS = {
+    "stations": ["station_code", "station_name", "details", "state", "location"],
+    "train_details": ["train_number", "from_location", "to_location", "timings", "status"],
+    "train_fare": ["train_number", "from_location", "to_location", "class", "fare"],
+    "user_details": ["user_id", "name", "email_id", "phone_number", "address"],
+    "pnr_status": ["pnr_number", "train_number", "seat_number", "journey_date", "status"],
+    "booking_history": ["booking_id", "user_id", "pnr_number", "booking_date"],
+}
+LOAD_ORDER = ["stations", "train_details", "train_fare", "user_details", "pnr_status", "booking_history"]
+
+
+def zipf_cdf(n, exponent):
+    """Cumulative distribution over ranks 0..n-1 with P(rank k) proportional to 1 / (k + 1) ** exponent."""
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+def sample_ranks(rng, cdf, size):
+    return np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+
+def permuted_ids(base, span, multiplier, start, stop):
+    """Distinct, scattered-looking ids base + (i * multiplier mod span) for i in start..stop-1.
+    Distinct because multiplier and span are coprime."""
+    i = np.arange(start, stop, dtype=np.int64)
+    return base + (i * multiplier) % span
+
+
+class TableWriter:
+    """Appends DataFrames to <out>/<table>.tsv in the format LOAD DATA reads by default."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.row_counts = {}
+
+    def path(self, table):
+        return os.path.abspath(os.path.join(self.out_dir, f"{table}.tsv"))
+
+    def write(self, table, df):
+        first = table not in self.row_counts
+        # No escapechar: it would also escape the \N NULL marker (LOAD DATA would then read the text "\N").
+        # Generated values never contain tabs or backslashes, and csv raises if one ever needs escaping.
+        df[TABLE_COLUMNS[table]].to_csv(self.path(table), mode="w" if first else "a", sep="\t", header=False,
+                                       index=False, na_rep="\\N", lineterminator="\n", quoting=csv.QUOTE_NONE)
+        self.row_counts[table] = self.row_counts.get(table, 0) + len(df)
+
+
+# --- Tables ---
+def generate_stations(rng, count):
+    """Returns the stations DataFrame and the city names trains run between (big cities first)."""
+    towns = [prefix + suffix for prefix in TOWN_PREFIXES for suffix in TOWN_SUFFIXES]
+    rng.shuffle(towns)
+    cities = BIG_CITIES + towns
+    rows, codes = [], set()
+    for i in range(count):
+        city = cities[i % len(cities)]
+        lap = i // len(cities) # First lap uses the bare city name, later laps add "Junction", "Cantt", ...
+        name = city if lap == 0 else f"{city} {STATION_KINDS[(lap - 1) % len(STATION_KINDS)]}"
+        base = "".join(ch for ch in name.upper() if ch.isalpha())[:4]
+        code, suffix = base, 0
+        while code in codes:
+            suffix += 1
+            code = f"{base[:3]}{suffix}"
+        codes.add(code)
+        state = STATES[i % len(STATES)]
+        rows.append({"station_code": code, "station_name": name, "state": state,
+                     "details": f"Platforms 1-{2 + i % 14}. Waiting room and enquiry counter available.",
+                     "location": f"{city}, {state}"})
+    return pd.DataFrame(rows), cities[:max(2, min(count, len(cities)))]
+
+def generate_trains(rng, count, cities, city_skew):
+    numbers = np.arange(10001, 10001 + count, dtype=np.int64)
+    city_cdf = zipf_cdf(len(cities), city_skew) # Big cities (listed first) get most routes
+    origin = sample_ranks(rng, city_cdf, count)
+    destination = sample_ranks(rng, city_cdf, count)
+    same = origin == destination
+    destination[same] = (destination[same] + 1 + rng.integers(0, len(cities) - 1, same.sum())) % len(cities)
+    minutes = rng.integers(0, 24 * 60, count)
+    city_names = np.array(cities, dtype=object)
+    return pd.DataFrame({
+        "train_number": numbers,
+        "from_location": city_names[origin],
+        "to_location": city_names[destination],
+        "timings": [f"{m // 60:02d}:{m % 60:02d}:00" for m in minutes],
+        "status": rng.choice(TRAIN_STATUSES[0], count, p=TRAIN_STATUSES[1]),
+    })
+
+def generate_fares(rng, trains):
+    rows = []
+    base_fares = rng.uniform(250, 1400, len(trains)).round(-1)
+    class_counts = rng.integers(2, 6, len(trains))
+    for train, base, n_classes in zip(trains.itertuples(index=False), base_fares, class_counts):
+        for index in sorted(rng.choice(len(FARE_CLASSES), n_classes, replace=False)):
+            fare_class, multiplier = FARE_CLASSES[index]
+            rows.append((train.train_number, train.from_location, train.to_location, fare_class,
+                         round(base * multiplier, 2)))
+    return pd.DataFrame(rows, columns=TABLE_COLUMNS["train_fare"])
+
+def generate_users(rng, start, stop, cities):
+    user_ids = np.arange(start + 1, stop + 1, dtype=np.int64)
+    n = len(user_ids)
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+    ids = pd.Series(user_ids).astype(str)
+    phones = permuted_ids(6_000_000_000, 4_000_000_000, 48_271, start, stop) # 10 digits, starting 6-9
+    city_names = np.array(cities, dtype=object)[rng.integers(0, len(cities), n)]
+    return pd.DataFrame({
+        "user_id": user_ids,
+        "name": pd.Series(first) + " " + pd.Series(last),
+        "email_id": pd.Series(first).str.lower() + "." + pd.Series(last).str.lower() + ids + "@example.com",
+        "phone_number": phones.astype(str),
+        "address": (pd.Series(rng.integers(1, 999, n)).astype(str) + ", "
+                    + pd.Series(np.array(STREETS, dtype=object)[rng.integers(0, len(STREETS), n)]) + ", "
+                    + pd.Series(city_names) + " - " + pd.Series(rng.integers(110001, 855999, n)).astype(str)),
+    })
+
+def generate_pnrs(rng, start, stop, train_numbers, train_cdf, user_cdf, today, days_back, days_ahead):
+    """One chunk of pnr_status rows and the booking_history rows that point at them."""
+    n = stop - start
+    pnrs = permuted_ids(6_000_000_000, 4_000_000_000, 7_919, start, stop)
+    status = rng.choice(PNR_STATUSES[0], n, p=PNR_STATUSES[1])
+    seats = (pd.Series(np.array(COACH_PREFIXES, dtype=object)[rng.integers(0, len(COACH_PREFIXES), n)])
+             + pd.Series(rng.integers(1, 13, n)).astype(str) + "-"
+             + pd.Series(rng.integers(1, 73, n)).astype(str).str.zfill(2))
+    seats[(status == "Waiting List") | (status == "Cancelled")] = None
+    journey = np.datetime64(today) + rng.integers(-days_back, days_ahead + 1, n).astype("timedelta64[D]")
+    booked = journey - rng.integers(0, 121, n).astype("timedelta64[D]")
+    pnr_df = pd.DataFrame({
+        "pnr_number": pnrs,
+        "train_number": train_numbers[sample_ranks(rng, train_cdf, n)], # Hot trains get most bookings
+        "seat_number": seats,
+        "journey_date": journey.astype(str),
+        "status": status,
+    })
+    booking_df = pd.DataFrame({
+        "booking_id": np.arange(start + 1, stop + 1, dtype=np.int64),
+        "user_id": sample_ranks(rng, user_cdf, n) + 1, # Heavy bookers have most of the history
+        "pnr_number": pnrs,
+        "booking_date": booked.astype(str),
+    })
+    return pnr_df, booking_df
+
+
+# --- Bulk Load Script ---
+def write_load_script(out_dir, writer, database, schema_path):
+    """load.sql: recreate `database` with the dump's tables, then LOAD DATA every generated file."""
+    lines = [f"DROP DATABASE IF EXISTS `{database}`;", f"CREATE DATABASE `{database}`;", f"USE `{database}`;", ""]
+    for statement in iter_sql_statements(schema_path):
+        if statement.upper().startswith("CREATE TABLE"):
+            lines += [statement + ";", ""]
+    # Checks are redundant for generated data and make multi-million row loads several times slower
+    lines += ["SET FOREIGN_KEY_CHECKS = 0;", "SET UNIQUE_CHECKS = 0;", "SET autocommit = 0;", ""]
+    for table in LOAD_ORDER:
+        path = writer.path(table).replace("\\", "/")
+        lines.append(f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} ({', '.join(TABLE_COLUMNS[table])});")
+    lines += ["COMMIT;", "SET UNIQUE_CHECKS = 1;", "SET FOREIGN_KEY_CHECKS = 1;", "SET autocommit = 1;", ""]
+    lines += [f"ANALYZE TABLE {', '.join(LOAD_ORDER)};", ""]
+    with open(os.path.join(out_dir, "load.sql"), "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large, skewed railway_chatbot dataset for bulk loading")
+    parser.add_argument("--out", default="dataset", help="Output directory")
+    parser.add_argument("--database", default=BENCH_CONFIG["database"], help="Database load.sql (re)creates")
+    parser.add_argument("--schema", default=BENCH_CONFIG["fixture"], help="SQL dump to take the CREATE TABLEs from")
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--trains", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--pnrs", type=int, default=1000000, help="PNRs; each gets one booking_history row")
+    parser.add_argument("--train-skew", type=float, default=0.9, help="Zipf exponent for PNR -> train (0 = uniform)")
+    parser.add_argument("--user-skew", type=float, default=0.7, help="Zipf exponent for booking -> user (0 = uniform)")
+    parser.add_argument("--city-skew", type=float, default=1.0, help="Zipf exponent for route endpoints")
+    parser.add_argument("--days-back", type=int, default=365, help="Journey dates start this many days before today")
+    parser.add_argument("--days-ahead", type=int, default=120, help="... and end this many days after")
+    parser.add_argument("--chunk-size", type=int, default=500000, help="Rows generated and written at a time")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+def main(args):
+    if args.database == LIVE_DATABASE:
+        raise SystemExit(f"Refusing to generate a load script that drops '{LIVE_DATABASE}'; pick another --database.")
+    os.makedirs(args.out, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    writer = TableWriter(args.out)
+    today = datetime.date.today().isoformat()
+
+    stations, cities = generate_stations(rng, args.stations)
+    writer.write("stations", stations)
+    trains = generate_trains(rng, args.trains, cities, args.city_skew)
+    writer.write("train_details", trains)
+    writer.write("train_fare", generate_fares(rng, trains))
+    print(f"Generated {args.stations} stations, {args.trains} trains and their fares.")
+
+    for start in range(0, args.users, args.chunk_size):
+        writer.write("user_details", generate_users(rng, start, min(start + args.chunk_size, args.users), cities))
+    print(f"Generated {args.users} users.")
+
+    # Popularity ranks are shuffled so hot trains are not simply the lowest train numbers
+    train_numbers = rng.permutation(trains["train_number"].to_numpy())
+    train_cdf = zipf_cdf(args.trains, args.train_skew)
+    user_cdf = zipf_cdf(args.users, args.user_skew)
+    for start in range(0, args.pnrs, args.chunk_size):
+        stop = min(start + args.chunk_size, args.pnrs)
+        pnr_df, booking_df = generate_pnrs(rng, start, stop, train_numbers, train_cdf, user_cdf,
+                                           today, args.days_back, args.days_ahead)
+        writer.write("pnr_status", pnr_df)
+        writer.write("booking_history", booking_df)
+        print(f"Generated {stop}/{args.pnrs} PNRs and bookings...")
+
+    write_load_script(args.out, writer, args.database, args.schema)
+    top_trains = max(1, args.trains // 100)
+    print(f"\nSkew: the top 1% of trains ({top_trains}) get {train_cdf[top_trains - 1]:.0%} of PNRs; "
+          f"the top 1% of users get {user_cdf[max(1, args.users // 100) - 1]:.0%} of bookings.")
+    for table in LOAD_ORDER:
+        print(f"{table:<16}{writer.row_counts.get(table, 0):>12} rows  {writer.path(table)}")
+    print(f"\nLoad with: mysql --local-infile=1 -u <user> -p < {os.path.join(args.out, 'load.sql')}")
+
+if __name__ == "__main__":
+    main(parse_args())
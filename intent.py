@@ -1,15 +1,16 @@
-from rasa.core.agent import Agent
 import asyncio
 import os
 import json
 import pandas as pd # For reading CSV
-from sklearn.metrics import confusion_matrix, accuracy_score, log_loss, roc_auc_score, classification_report
-from sklearn.metrics import roc_curve, auc # Specifically for ROC curve plotting
-from sklearn.preprocessing import LabelBinarizer # For binarizing labels for ROC plotting
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np # For unique labels and probability arrays
-import glob # To find model files
+import argparse
+import multiprocessing
+import math
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from nlu_cache import parse_cache
+from eval_io import ResultWriter, iter_csv_chunks, add_checkpoint_args, open_checkpoint
+from model_loader import load_agent, model_fingerprint, resolve_model_path
 
 async def get_rasa_nlu_output_async(text_to_classify, agent):
     if not agent:
@@ -66,17 +67,412 @@ def format_rasa_output(rasa_result):
     }
     return formatted_output
 
+# --- Parallel Evaluation (one Agent per worker process) ---
+_worker_agent = None
+
+def _init_worker(model_path):
+    """Process-pool initializer: loads the model once per worker."""
+    global _worker_agent
+    _worker_agent = load_agent(model_path) # Reuses the unpacked model instead of extracting it per worker
+
+async def _parse_texts_async(texts, agent):
+    return [await get_rasa_nlu_output_async(text, agent) for text in texts]
+
+def _parse_batch_in_worker(texts):
+    return asyncio.run(_parse_texts_async(texts, _worker_agent))
+
+def create_parse_executor(model_path, workers):
+    """Process pool whose workers each load the model once; reused for every chunk in --stream mode."""
+    # 'spawn' avoids forking a process that may already hold TensorFlow threads
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(model_path,))
+
+def parse_texts_parallel(texts, executor, batch_size=64):
+    """Parses texts on the worker pool; results come back in input order."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = []
+    for batch_result in executor.map(_parse_batch_in_worker, batches): # map() preserves batch order
+        results.extend(batch_result)
+        print(f"  Parsed {len(results)}/{len(texts)} utterances")
+    return results
+
+async def parse_texts(texts, agent=None, executor=None, batch_size=64):
+    """Parses texts on the worker pool if there is one, otherwise in-process with agent."""
+    if executor is not None:
+        return parse_texts_parallel(texts, executor, batch_size)
+    return await _parse_texts_async(texts, agent)
+
+async def parse_rows(rows_to_evaluate, agent=None, executor=None, batch_size=64, checkpoint=None, workers=1):
+    """Returns the Rasa parse output for each (index, text, expected) row, in order.
+
+    With a checkpoint, rows parsed by an earlier run are read back instead of re-parsed, and
+    new results are saved a batch at a time so a crash loses at most the batch in flight.
+    """
+    if checkpoint is None:
+        return await parse_texts([text for _, text, _ in rows_to_evaluate], agent, executor, batch_size)
+
+    keys = [checkpoint.row_key(index, text) for index, text, _ in rows_to_evaluate]
+    outputs = checkpoint.load(keys)
+    pending = [(key, text) for key, (_, text, _) in zip(keys, rows_to_evaluate) if key not in outputs]
+    if outputs:
+        print(f"  {len(outputs)} of {len(rows_to_evaluate)} rows taken from checkpoint, parsing {len(pending)}")
+    segment_size = batch_size * max(workers, 1)
+    for start in range(0, len(pending), segment_size):
+        segment = pending[start:start + segment_size]
+        segment_outputs = await parse_texts([text for _, text in segment], agent, executor, batch_size)
+        for (key, _), rasa_output in zip(segment, segment_outputs):
+            checkpoint.save(key, rasa_output)
+            outputs[key] = rasa_output
+        checkpoint.flush()
+    return [outputs[key] for key in keys]
+
+# --- Row Handling (shared by the in-memory and --stream paths) ---
+def select_rows_to_evaluate(df):
+    """Returns (index, user_input_text, expected_intent) for rows with both columns filled, in CSV order."""
+    rows_to_evaluate = []
+    for index, row in df.iterrows():
+        user_input_text = str(row['UserInput'])
+        expected_intent = str(row['ExpectedIntent'])
+
+        if pd.isna(user_input_text) or not user_input_text.strip():
+            print(f"Skipping empty UserInput at CSV row {index+2}")
+            continue
+        if pd.isna(expected_intent) or not expected_intent.strip():
+            print(f"Skipping CSV row {index+2} due to empty ExpectedIntent for input: '{user_input_text}'")
+            continue
+        rows_to_evaluate.append((index, user_input_text, expected_intent))
+    return rows_to_evaluate
+
+def interpret_rasa_output(index, user_input_text, rasa_output):
+    """Returns (predicted_intent, top_confidence, ranking_list, confidence_for_incorrect_report)."""
+    if rasa_output:
+        simplified_output = format_rasa_output(rasa_output)
+        current_predicted_intent = simplified_output.get("intent", "N/A")
+        current_top_confidence = simplified_output.get("confidence", 0.0)
+        current_ranking_list = rasa_output.get("intent_ranking", [])
+        if not current_ranking_list and simplified_output.get("intent") != "N/A":
+             current_ranking_list = [{"name": simplified_output.get("intent"), "confidence": simplified_output.get("confidence")}]
+        return current_predicted_intent, current_top_confidence, current_ranking_list, current_top_confidence
+
+    print(f"Could not get RASA NLU output for: \"{user_input_text}\" (CSV row {index+2})")
+    return "NO_RASA_OUTPUT", 1.0, [{"name": "NO_RASA_OUTPUT", "confidence": 1.0}], 0.0
+
+# --- Plotting (only with --plots; matplotlib/seaborn are imported on first use) ---
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg") # File output only, so no display is needed (CI, servers)
+    import matplotlib.pyplot as plt
+    return plt
+
+def save_confusion_matrix_plot(cm_df, path="confusion_matrix.png"):
+    plt = _pyplot()
+    import seaborn as sns
+    labels = list(cm_df.index)
+    plt.figure(figsize=(max(12, len(labels)*0.6), max(10, len(labels)*0.5)))
+    sns.heatmap(cm_df, annot=True, fmt='d', cmap='Blues', cbar=True)
+    plt.title('Confusion Matrix: Expected vs. Predicted Intents', fontsize=16)
+    plt.ylabel('Expected Intent (True)', fontsize=12)
+    plt.xlabel('Predicted Intent (Actual)', fontsize=12)
+    plt.xticks(rotation=45, ha='right', fontsize=10)
+    plt.yticks(rotation=0, fontsize=10)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    print(f"\nConfusion matrix plot saved as {path}")
+
+# --- Vectorized Metrics ---
+MICRO_AVERAGE = "micro"
+
+def build_probability_matrix(all_intent_rankings, y_pred_str, all_top_confidences, label_index):
+    """Sparse CSR (samples x labels) matrix of ranking confidences, each row normalized to sum to 1.
+
+    Ranking entries for intents outside label_index are dropped; a row with an empty ranking
+    falls back to the confidence of its top prediction.
+    """
+    import scipy.sparse as sp
+    n_samples = len(all_intent_rankings)
+    lengths = np.fromiter((len(ranking) for ranking in all_intent_rankings), dtype=np.int64, count=n_samples)
+    rows = np.repeat(np.arange(n_samples), lengths)
+    cols = label_index.get_indexer([d.get("name") for ranking in all_intent_rankings for d in ranking])
+    values = np.fromiter((d.get("confidence") or 0.0 for ranking in all_intent_rankings for d in ranking),
+                         dtype=float, count=int(lengths.sum()))
+
+    empty_rows = np.flatnonzero(lengths == 0)
+    if len(empty_rows):
+        rows = np.concatenate([rows, empty_rows])
+        cols = np.concatenate([cols, label_index.get_indexer([y_pred_str[i] for i in empty_rows])])
+        values = np.concatenate([values, np.asarray(all_top_confidences, dtype=float)[empty_rows]])
+
+    known = cols >= 0
+    proba = sp.csr_matrix((values[known], (rows[known], cols[known])), shape=(n_samples, len(label_index)))
+    row_sums = np.asarray(proba.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, row_sums, out=np.ones_like(row_sums), where=row_sums > 0) # All-zero rows stay zero
+    return sp.diags(inverse) @ proba
+
+def _roc_from_nonzero(scores, is_positive, n_positive, n_negative):
+    """ROC curve from the explicitly stored scores; every other sample has score 0 and enters as
+    one weighted point per class, so the curve is exact without materializing the zeros."""
+    from sklearn.metrics import roc_curve, auc
+    stored_positive = int(is_positive.sum())
+    y = np.concatenate([is_positive.astype(int), [1, 0]])
+    y_score = np.concatenate([scores, [0.0, 0.0]])
+    weights = np.concatenate([np.ones(len(scores)),
+                              [n_positive - stored_positive, n_negative - (len(scores) - stored_positive)]])
+    fpr, tpr, _ = roc_curve(y, y_score, sample_weight=weights)
+    return fpr, tpr, auc(fpr, tpr)
+
+def one_vs_rest_roc_curves(y_pred_proba, y_true_idx, labels):
+    """Returns {label: (fpr, tpr, auc)} for every class with both positives and negatives,
+    plus the micro-average under MICRO_AVERAGE."""
+    n_samples = y_pred_proba.shape[0]
+    positives_per_class = np.bincount(y_true_idx, minlength=len(labels))
+    by_class = y_pred_proba.tocsc()
+    curves = {}
+    for c, label in enumerate(labels):
+        n_positive = positives_per_class[c]
+        if n_positive == 0 or n_positive == n_samples:
+            continue
+        start, end = by_class.indptr[c], by_class.indptr[c + 1]
+        curves[label] = _roc_from_nonzero(by_class.data[start:end], y_true_idx[by_class.indices[start:end]] == c,
+                                          n_positive, n_samples - n_positive)
+
+    by_row = y_pred_proba.tocsr()
+    stored_rows = np.repeat(np.arange(n_samples), np.diff(by_row.indptr))
+    curves[MICRO_AVERAGE] = _roc_from_nonzero(by_row.data, by_row.indices == y_true_idx[stored_rows],
+                                              n_samples, n_samples * (len(labels) - 1))
+    return curves
+
+def save_roc_curves_plot(roc_curves, path="roc_auc_multiclass_curves.png"):
+    plt = _pyplot()
+    class_labels = [label for label in roc_curves if label != MICRO_AVERAGE]
+    n_classes = len(class_labels)
+
+    fpr_micro, tpr_micro, roc_auc_micro = roc_curves[MICRO_AVERAGE]
+    plt.figure(figsize=(10, 8)) # New figure for ROC
+    lw = 2 # line width
+    plt.plot(fpr_micro, tpr_micro,
+             label=f'Micro-average ROC curve (area = {roc_auc_micro:.2f})',
+             color='deeppink', linestyle=':', linewidth=4)
+
+    # --- Plot One-vs-Rest ROC Curve for each class ---
+    # Use a suitable colormap that provides distinct colors
+    colors = plt.cm.get_cmap('tab10', n_classes) if n_classes <= 10 else plt.cm.get_cmap('nipy_spectral', n_classes)
+    for i, class_label in enumerate(class_labels):
+        fpr_class, tpr_class, roc_auc_class = roc_curves[class_label]
+        plt.plot(fpr_class, tpr_class, color=colors(i), lw=lw, # Use color from colormap
+                 label=f'ROC for {class_label} (area = {roc_auc_class:.2f})')
+
+    plt.plot([0, 1], [0, 1], color='navy', lw=lw, linestyle='--', label='No Skill (area = 0.50)')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate', fontsize=12)
+    plt.ylabel('True Positive Rate', fontsize=12)
+    plt.title('Multi-class Receiver Operating Characteristic (ROC)', fontsize=16)
+
+    # Adjust legend placement
+    if n_classes > 7: # Heuristic for when legend might get too crowded inside
+         plt.legend(loc='center left', bbox_to_anchor=(1, 0.5), prop={'size': 8})
+    else:
+         plt.legend(loc="lower right", prop={'size': 9})
+
+    plt.tight_layout(rect=[0, 0, 0.85 if n_classes > 7 else 1, 1]) # Adjust layout if legend is outside
+    plt.savefig(path)
+    plt.close()
+    print(f"\nROC AUC (Micro-average and OvR) curves plot saved as {path}")
+
+# --- Streaming Evaluation (--stream) ---
+class StreamingIntentMetrics:
+    """Online accumulators for the NLU metrics; memory grows with the number of intents, not rows.
+
+    Accuracy, the classification report and the confusion matrix are exact. Log loss normalizes
+    each ranking over the intents in that ranking, and AUC comes from per-intent score histograms
+    (n_bins buckets), so both can differ slightly from the in-memory path, which normalizes over
+    every label in the run and sorts exact scores.
+    """
+    def __init__(self, n_bins=1000):
+        self.n_bins = n_bins
+        self.count = 0
+        self.confusion = defaultdict(Counter) # expected intent -> Counter of predicted intents
+        self.log_loss_sum = 0.0
+        self._positive_hist = {} # intent -> score histogram over rows where it is the expected intent
+        self._negative_hist = {} # intent -> score histogram over other rows that gave it a nonzero score
+
+    def _histogram(self, histograms, label):
+        if label not in histograms:
+            histograms[label] = np.zeros(self.n_bins)
+        return histograms[label]
+
+    def _bin(self, score):
+        return min(max(int(score * self.n_bins), 0), self.n_bins - 1)
+
+    def add(self, expected_intent, predicted_intent, ranking_list):
+        self.count += 1
+        self.confusion[expected_intent][predicted_intent] += 1
+
+        scores = {}
+        for intent_data in ranking_list:
+            if intent_data.get("name") is not None:
+                scores[intent_data["name"]] = intent_data.get("confidence") or 0.0
+        total = sum(scores.values())
+        if total > 0:
+            scores = {name: conf / total for name, conf in scores.items()}
+
+        true_score = scores.get(expected_intent, 0.0)
+        self.log_loss_sum -= math.log(min(max(true_score, 1e-15), 1 - 1e-15))
+        self._histogram(self._positive_hist, expected_intent)[self._bin(true_score)] += 1
+        for name, score in scores.items():
+            if name != expected_intent and score > 0:
+                self._histogram(self._negative_hist, name)[self._bin(score)] += 1
+
+    def labels(self):
+        predicted = {p for counts in self.confusion.values() for p in counts}
+        return sorted(set(self.confusion) | predicted)
+
+    def auc_macro_ovr(self, labels):
+        """Macro one-vs-rest AUC from the score histograms (ties within a bin count half)."""
+        aucs = []
+        for label in labels:
+            positives = self._positive_hist.get(label, np.zeros(self.n_bins))
+            negatives = self._negative_hist.get(label, np.zeros(self.n_bins)).copy()
+            # Rows that never scored this label are negatives with score 0
+            negatives[0] += (self.count - positives.sum()) - negatives.sum()
+            n_pos, n_neg = positives.sum(), negatives.sum()
+            if n_pos == 0 or n_neg == 0:
+                continue
+            negatives_below = np.concatenate(([0.0], np.cumsum(negatives)[:-1]))
+            aucs.append(float(np.sum(positives * (negatives_below + 0.5 * negatives)) / (n_pos * n_neg)))
+        return float(np.mean(aucs)) if aucs else None
+
+    def report(self):
+        """Prints the metrics and returns the confusion matrix as a DataFrame (None if there is no data)."""
+        from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+        if not self.count:
+            print("\nNo data to calculate metrics.")
+            return None
+        labels = self.labels()
+        # One weighted sample per (expected, predicted) pair gives sklearn the same counts as every row would
+        pairs = [(t, p, n) for t, counts in self.confusion.items() for p, n in counts.items()]
+        pair_true, pair_pred, weights = (list(column) for column in zip(*pairs))
+
+        print("\n--- NLU Evaluation Metrics ---")
+        accuracy = accuracy_score(pair_true, pair_pred, sample_weight=weights)
+        print(f"Overall Accuracy: {accuracy * 100:.2f}% ({self.count} rows)")
+
+        print("\nClassification Report:")
+        report = classification_report(pair_true, pair_pred, labels=labels, target_names=labels,
+                                       sample_weight=weights, zero_division=0, output_dict=True)
+        print(_format_classification_report(report, labels, accuracy))
+
+        print(f"Logarithmic Loss: {self.log_loss_sum / self.count:.4f}")
+
+        if len(labels) > 1 and len(self.confusion) > 1:
+            auc_score_macro_ovr = self.auc_macro_ovr(labels)
+            if auc_score_macro_ovr is not None:
+                print(f"Area Under ROC Curve (AUC) (Macro OvR, {self.n_bins}-bin histogram): {auc_score_macro_ovr:.4f}")
+        else:
+            print("AUC Macro OvR calculation skipped: Not enough classes or only one class in y_true.")
+
+        cm = confusion_matrix(pair_true, pair_pred, labels=labels, sample_weight=weights).astype(int)
+        cm_df = pd.DataFrame(cm, index=labels, columns=labels)
+        print("\nConfusion Matrix:")
+        print(cm_df)
+        return cm_df
+
+def _format_classification_report(report, labels, accuracy):
+    """Lays out classification_report(output_dict=True) like its text form, with integer supports
+    (weighted samples would otherwise print them as floats)."""
+    width = max(len(name) for name in labels + ["weighted avg"])
+    line = "{:>{width}s}  {:>9.2f} {:>9.2f} {:>9.2f} {:>9}"
+    lines = [f"{'':>{width}s}  {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+    for name in labels:
+        row = report[name]
+        lines.append(line.format(name, row["precision"], row["recall"], row["f1-score"], int(row["support"]), width=width))
+    total = int(report["macro avg"]["support"])
+    lines += ["", f"{'accuracy':>{width}s}  {'':>9} {'':>9} {accuracy:>9.2f} {total:>9}"]
+    for name in ("macro avg", "weighted avg"):
+        row = report[name]
+        lines.append(line.format(name, row["precision"], row["recall"], row["f1-score"], total, width=width))
+    return "\n".join(lines) + "\n"
+
+async def evaluate_streaming(csv_file_path, absolute_model_path, agent, args, checkpoint=None):
+    """Evaluates the CSV chunk by chunk, appending predictions to disk as it goes."""
+    metrics = StreamingIntentMetrics()
+    executor = create_parse_executor(absolute_model_path, args.workers) if args.workers > 1 else None
+    incorrect_csv_path = "incorrect_nlu_predictions.csv"
+    try:
+        with ResultWriter(args.predictions_out) as predictions_writer, \
+             ResultWriter(incorrect_csv_path) as incorrect_writer:
+            for chunk in iter_csv_chunks(csv_file_path, args.chunk_size):
+                if 'UserInput' not in chunk.columns or 'ExpectedIntent' not in chunk.columns:
+                    print(f"CSV file '{csv_file_path}' must contain columns named 'UserInput' and 'ExpectedIntent'.")
+                    return
+
+                rows_to_evaluate = select_rows_to_evaluate(chunk)
+                rasa_outputs = await parse_rows(rows_to_evaluate, agent, executor, args.batch_size,
+                                                checkpoint, args.workers)
+
+                prediction_rows, incorrect_rows = [], []
+                for (index, user_input_text, expected_intent), rasa_output in zip(rows_to_evaluate, rasa_outputs):
+                    predicted_intent, _, ranking_list, report_confidence = interpret_rasa_output(
+                        index, user_input_text, rasa_output)
+                    metrics.add(expected_intent, predicted_intent, ranking_list)
+                    prediction = {
+                        "row_number": index + 2,
+                        "user_input": user_input_text,
+                        "expected_intent": expected_intent,
+                        "predicted_intent": predicted_intent,
+                        "confidence": report_confidence
+                    }
+                    prediction_rows.append(prediction)
+                    if expected_intent != predicted_intent:
+                        incorrect_rows.append(prediction)
+
+                predictions_writer.write(prediction_rows)
+                incorrect_writer.write(incorrect_rows)
+                print(f"Processed {metrics.count} rows so far ({chunk.index[-1] + 2} CSV rows read)")
+    except Exception as e:
+        print(f"Error during streaming evaluation of '{csv_file_path}': {e}")
+        return
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print("\nFinished processing CSV inputs.")
+    print(f"Per-row predictions saved to '{args.predictions_out}'")
+    cm_df = metrics.report()
+    if cm_df is not None and args.plots:
+        save_confusion_matrix_plot(cm_df)
+        print("\nROC curve plotting is not available in --stream mode (AUC above comes from score histograms).")
+    if incorrect_writer.rows_written:
+        print(f"\nDetails of incorrect predictions saved to '{incorrect_csv_path}'")
+    else:
+        print("\nNo incorrect predictions to save.")
+
 def find_latest_model(model_dir="models"):
-    """Finds the latest .tar.gz model file in the specified directory, relative to CWD."""
-    search_path = os.path.join(os.getcwd(), model_dir, '*.tar.gz')
-    list_of_files = glob.glob(search_path)
-    if not list_of_files:
-        print(f"Debug: No .tar.gz files found in search path: {search_path}")
-        return None
-    latest_file = max(list_of_files, key=os.path.getctime)
+    """Finds the model to evaluate in the specified directory, relative to CWD (same rule as rouge_bert.py and `rasa run`)."""
+    latest_file = resolve_model_path(os.path.join(os.getcwd(), model_dir))
+    if not latest_file:
+        print(f"Debug: No model archive found in: {os.path.join(os.getcwd(), model_dir)}")
     return latest_file
 
-async def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate Rasa NLU intent classification against intent_accuracy.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each with its own loaded model (1 = serial, in-process)")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="Utterances sent to a worker at a time when --workers > 1")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the CSV in chunks and write predictions as they are scored (flat memory for large logs)")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="CSV rows read per chunk in --stream mode")
+    parser.add_argument("--predictions-out", default="nlu_predictions.csv",
+                        help="Per-row predictions file written in --stream mode (.csv, or .parquet with pyarrow)")
+    parser.add_argument("--plots", action="store_true",
+                        help="Also save confusion_matrix.png and roc_auc_multiclass_curves.png (metrics only by default)")
+    add_checkpoint_args(parser)
+    return parser.parse_args(argv)
+
+async def main(args):
     current_working_dir = os.getcwd()
     print(f"IMPORTANT: Script is running from CWD: {current_working_dir}")
     print(f"           The 'models' directory should be here: {os.path.join(current_working_dir, 'models')}")
@@ -99,18 +495,33 @@ async def main():
         return
 
     agent = None
-    try:
-        agent = Agent.load(model_path=absolute_model_path)
-        print("Agent loaded successfully.")
-    except Exception as e:
-        print(f"Error loading agent from '{absolute_model_path}': {e}")
-        return
+    if args.workers <= 1: # Parallel mode loads the model inside each worker instead
+        try:
+            agent = load_agent(absolute_model_path) # Also installs the NLU parse cache
+            print("Agent loaded successfully.")
+        except Exception as e:
+            print(f"Error loading agent from '{absolute_model_path}': {e}")
+            return
 
     csv_file_path = os.path.join(current_working_dir, csv_file_name)
     if not os.path.exists(csv_file_path):
         print(f"CSV file not found at '{csv_file_path}'. Please make sure the file exists in your project root.")
         return
 
+    # Parse results depend only on the model, so a rerun with the same archive resumes from the checkpoint
+    checkpoint = open_checkpoint(args, "intent", model_fingerprint(absolute_model_path))
+    try:
+        if args.stream:
+            await evaluate_streaming(csv_file_path, absolute_model_path, agent, args, checkpoint)
+        else:
+            await evaluate_in_memory(csv_file_path, absolute_model_path, agent, args, checkpoint)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    if agent is not None:
+        parse_cache.report()
+
+async def evaluate_in_memory(csv_file_path, absolute_model_path, agent, args, checkpoint=None):
     try:
         df = pd.read_csv(csv_file_path)
         print(f"\nSuccessfully loaded {len(df)} rows from {csv_file_path}")
@@ -127,38 +538,23 @@ async def main():
     all_top_confidences = [] # To store the confidence of the determined y_pred intent
 
     print("\n--- Processing User Inputs from CSV ---")
-    for index, row in df.iterrows():
-        user_input_text = str(row['UserInput'])
-        expected_intent = str(row['ExpectedIntent'])
+    rows_to_evaluate = select_rows_to_evaluate(df) # (index, user_input_text, expected_intent) in CSV order
 
-        if pd.isna(user_input_text) or not user_input_text.strip():
-            print(f"Skipping empty UserInput at CSV row {index+2}")
-            continue
-        if pd.isna(expected_intent) or not expected_intent.strip():
-            print(f"Skipping CSV row {index+2} due to empty ExpectedIntent for input: '{user_input_text}'")
-            continue
+    if args.workers > 1:
+        print(f"Parsing {len(rows_to_evaluate)} utterances with {args.workers} worker processes...")
+        try:
+            with create_parse_executor(absolute_model_path, args.workers) as executor:
+                rasa_outputs = await parse_rows(rows_to_evaluate, executor=executor, batch_size=args.batch_size,
+                                                checkpoint=checkpoint, workers=args.workers)
+        except Exception as e:
+            print(f"Error during parallel parsing: {e}")
+            return
+    else:
+        rasa_outputs = await parse_rows(rows_to_evaluate, agent, checkpoint=checkpoint)
 
-        rasa_output = await get_rasa_nlu_output_async(user_input_text, agent)
-
-        current_predicted_intent = "N/A"
-        current_top_confidence = 0.0
-        current_ranking_list = []
-        confidence_for_incorrect_report = 0.0
-
-        if rasa_output:
-            simplified_output = format_rasa_output(rasa_output)
-            current_predicted_intent = simplified_output.get("intent", "N/A")
-            current_top_confidence = simplified_output.get("confidence", 0.0)
-            current_ranking_list = rasa_output.get("intent_ranking", [])
-            if not current_ranking_list and simplified_output.get("intent") != "N/A":
-                 current_ranking_list = [{"name": simplified_output.get("intent"), "confidence": simplified_output.get("confidence")}]
-            confidence_for_incorrect_report = current_top_confidence
-        else:
-            print(f"Could not get RASA NLU output for: \"{user_input_text}\" (CSV row {index+2})")
-            current_predicted_intent = "NO_RASA_OUTPUT"
-            current_top_confidence = 1.0
-            current_ranking_list = [{"name": "NO_RASA_OUTPUT", "confidence": 1.0}]
-            confidence_for_incorrect_report = 0.0
+    for (index, user_input_text, expected_intent), rasa_output in zip(rows_to_evaluate, rasa_outputs):
+        (current_predicted_intent, current_top_confidence, current_ranking_list,
+         confidence_for_incorrect_report) = interpret_rasa_output(index, user_input_text, rasa_output)
 
         y_true.append(expected_intent)
         y_pred.append(current_predicted_intent)
@@ -180,29 +576,16 @@ async def main():
         print("\nNo data to calculate metrics.")
         return
 
+    from sklearn.metrics import confusion_matrix, accuracy_score, classification_report
+
     y_true_str = [str(i) for i in y_true]
     y_pred_str = [str(i) for i in y_pred]
     labels = sorted(list(set(y_true_str + y_pred_str))) # All unique labels present in true or pred
-    label_to_idx = {label: i for i, label in enumerate(labels)}
-
-    y_pred_proba = np.zeros((len(y_true_str), len(labels)))
-
-    for i in range(len(y_true_str)):
-        ranking_for_sample = all_intent_rankings[i]
-        if ranking_for_sample:
-            for intent_data in ranking_for_sample:
-                intent_name = intent_data.get("name")
-                intent_conf = intent_data.get("confidence", 0.0)
-                if intent_name in label_to_idx:
-                    y_pred_proba[i, label_to_idx[intent_name]] = intent_conf
-        elif y_pred_str[i] in label_to_idx: # Fallback if no ranking but top prediction exists
-             y_pred_proba[i, label_to_idx[y_pred_str[i]]] = all_top_confidences[i]
-
-        row_sum = np.sum(y_pred_proba[i, :])
-        if row_sum > 0:
-            y_pred_proba[i, :] = y_pred_proba[i, :] / row_sum
-        # else: # If row_sum is 0 (no confidences for any known label)
-            # y_pred_proba[i, :] = 1.0 / len(labels) # Assign uniform probability
+    label_index = pd.Index(labels)
+    y_true_idx = label_index.get_indexer(y_true_str)
+
+    # Sparse (samples x labels): rankings are truncated, so most entries are zero
+    y_pred_proba = build_probability_matrix(all_intent_rankings, y_pred_str, all_top_confidences, label_index)
 
     print("\n--- NLU Evaluation Metrics ---")
     accuracy = accuracy_score(y_true_str, y_pred_str)
@@ -212,112 +595,36 @@ async def main():
     report = classification_report(y_true_str, y_pred_str, labels=labels, target_names=labels, zero_division=0)
     print(report)
 
-    try:
-        log_loss_value = log_loss(y_true_str, np.clip(y_pred_proba, 1e-15, 1 - 1e-15), labels=labels)
-        print(f"Logarithmic Loss: {log_loss_value:.4f}")
-    except ValueError as e:
-        print(f"Could not calculate Logarithmic Loss: {e}")
-        print(f"  y_pred_proba sample (first 5 rows, first 5 labels):\n{y_pred_proba[:5, :min(5, len(labels))]}")
-
-    if len(labels) > 1:
-        try:
-            if len(np.unique(y_true_str)) > 1:
-                 auc_score_macro_ovr = roc_auc_score(y_true_str, y_pred_proba, multi_class='ovr', average='macro', labels=labels)
-                 print(f"Area Under ROC Curve (AUC) (Macro OvR): {auc_score_macro_ovr:.4f}")
-            else:
-                print("AUC Macro OvR calculation skipped: y_true contains only one class.")
-        except ValueError as e:
-            print(f"Could not calculate AUC Macro OvR: {e}")
-            print(f"  y_pred_proba sample (first 5 rows, first 5 labels) after normalization:\n{y_pred_proba[:5, :min(5, len(labels))]}")
+    # Probability assigned to the expected intent, one value per row
+    true_class_proba = np.asarray(y_pred_proba[np.arange(len(y_true_idx)), y_true_idx]).ravel()
+    log_loss_value = -np.mean(np.log(np.clip(true_class_proba, 1e-15, 1 - 1e-15)))
+    print(f"Logarithmic Loss: {log_loss_value:.4f}")
+
+    # One-vs-rest ROC per class (and micro-average), computed once for the AUC and the plot
+    roc_curves = {}
+    if len(labels) > 1 and len(np.unique(y_true_idx)) > 1:
+        roc_curves = one_vs_rest_roc_curves(y_pred_proba, y_true_idx, labels)
+        class_aucs = [roc_auc for label, (_, _, roc_auc) in roc_curves.items() if label != MICRO_AVERAGE]
+        print(f"Area Under ROC Curve (AUC) (Macro OvR): {np.mean(class_aucs):.4f}")
     else:
-        print("AUC Macro OvR calculation skipped: Not enough classes (need at least 2).")
+        print("AUC Macro OvR calculation skipped: Not enough classes or only one class in y_true.")
 
     if labels:
         cm = confusion_matrix(y_true_str, y_pred_str, labels=labels)
         cm_df = pd.DataFrame(cm, index=labels, columns=labels)
         print("\nConfusion Matrix:")
         print(cm_df)
-
-        plt.figure(figsize=(max(12, len(labels)*0.6), max(10, len(labels)*0.5)))
-        sns.heatmap(cm_df, annot=True, fmt='d', cmap='Blues', cbar=True)
-        plt.title('Confusion Matrix: Expected vs. Predicted Intents', fontsize=16)
-        plt.ylabel('Expected Intent (True)', fontsize=12)
-        plt.xlabel('Predicted Intent (Actual)', fontsize=12)
-        plt.xticks(rotation=45, ha='right', fontsize=10)
-        plt.yticks(rotation=0, fontsize=10)
-        plt.tight_layout()
-        plt.savefig("confusion_matrix.png")
-        print("\nConfusion matrix plot saved as confusion_matrix.png")
+        if args.plots:
+            save_confusion_matrix_plot(cm_df)
     else:
         print("\nNot enough distinct labels to generate a confusion matrix.")
 
     # --- ROC AUC Curve Plotting ---
-    if len(labels) > 1 and len(np.unique(y_true_str)) > 1:
+    if not args.plots:
+        print("\nPlots skipped (pass --plots to save confusion_matrix.png and roc_auc_multiclass_curves.png).")
+    elif roc_curves:
         print("\n--- ROC AUC Curve Plotting ---")
-        
-        lb = LabelBinarizer()
-        # Fit LabelBinarizer on all possible labels to ensure consistent shape
-        lb.fit(labels) 
-        y_true_binarized = lb.transform(y_true_str)
-        
-        n_classes = len(lb.classes_) # Number of unique classes used by LabelBinarizer
-
-        # Ensure y_pred_proba columns align with lb.classes_
-        # This step is crucial if `labels` (used for y_pred_proba) and `lb.classes_` differ in order or content
-        aligned_y_pred_proba = np.zeros_like(y_true_binarized, dtype=float)
-        for i, class_label in enumerate(lb.classes_):
-            if class_label in label_to_idx: # label_to_idx is based on `labels`
-                aligned_y_pred_proba[:, i] = y_pred_proba[:, label_to_idx[class_label]]
-            # else: class_label from lb.classes_ not in y_pred_proba's original labels, so prob is 0
-
-        # --- Plot Micro-Average ROC Curve ---
-        # For micro-average, we use the binarized true labels and the aligned predicted probabilities
-        fpr_micro, tpr_micro, _ = roc_curve(y_true_binarized.ravel(), aligned_y_pred_proba.ravel())
-        roc_auc_micro = auc(fpr_micro, tpr_micro)
-
-        plt.figure(figsize=(10, 8)) # New figure for ROC
-        lw = 2 # line width
-        plt.plot(fpr_micro, tpr_micro,
-                 label=f'Micro-average ROC curve (area = {roc_auc_micro:.2f})',
-                 color='deeppink', linestyle=':', linewidth=4)
-
-        # --- Plot One-vs-Rest ROC Curve for each class ---
-        # Use a suitable colormap that provides distinct colors
-        colors = plt.cm.get_cmap('tab10', n_classes) if n_classes <= 10 else plt.cm.get_cmap('nipy_spectral', n_classes)
-
-
-        for i in range(n_classes):
-            class_label = lb.classes_[i]
-            
-            y_true_for_class_ovr = y_true_binarized[:, i]
-            y_score_for_class = aligned_y_pred_proba[:, i]
-
-            if np.sum(y_true_for_class_ovr == 1) == 0 or np.sum(y_true_for_class_ovr == 0) == 0:
-                # print(f"Skipping OvR ROC curve for class '{class_label}' due to only one class value present in its binarized y_true.")
-                continue
-
-            fpr_class, tpr_class, _ = roc_curve(y_true_for_class_ovr, y_score_for_class)
-            roc_auc_class = auc(fpr_class, tpr_class)
-            plt.plot(fpr_class, tpr_class, color=colors(i), lw=lw, # Use color from colormap
-                     label=f'ROC for {class_label} (area = {roc_auc_class:.2f})')
-
-        plt.plot([0, 1], [0, 1], color='navy', lw=lw, linestyle='--', label='No Skill (area = 0.50)')
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel('False Positive Rate', fontsize=12)
-        plt.ylabel('True Positive Rate', fontsize=12)
-        plt.title('Multi-class Receiver Operating Characteristic (ROC)', fontsize=16)
-        
-        # Adjust legend placement
-        if n_classes > 7: # Heuristic for when legend might get too crowded inside
-             plt.legend(loc='center left', bbox_to_anchor=(1, 0.5), prop={'size': 8})
-        else:
-             plt.legend(loc="lower right", prop={'size': 9})
-
-        plt.tight_layout(rect=[0, 0, 0.85 if n_classes > 7 else 1, 1]) # Adjust layout if legend is outside
-        plt.savefig("roc_auc_multiclass_curves.png")
-        print("\nROC AUC (Micro-average and OvR) curves plot saved as roc_auc_multiclass_curves.png")
-
+        save_roc_curves_plot(roc_curves)
     else:
         print("\nROC AUC curve plotting skipped: Not enough classes or only one class in y_true.")
 
@@ -331,4 +638,4 @@ async def main():
         print("\nNo incorrect predictions to save.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""Shared model loading for the evaluation scripts.
+
+intent.py and rouge_bert.py used to pick "the latest model" differently and each unpacked and
+loaded the .tar.gz from scratch. This module gives them one rule and two levels of reuse:
+
+* resolve_model_path() picks the archive the same way `rasa run` does (rasa.model.get_latest_model).
+* The archive is unpacked once into MODEL_CACHE_DIR/<archive sha256>/ and later loads read that
+  directory instead of extracting the tarball again.
+* load_agent() keeps loaded agents per process, so one process (see evaluate.py) can run the
+  intent and the response evaluation on a single loaded model.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import rasa.core.agent
+from rasa.core.agent import Agent
+from rasa.core.processor import MessageProcessor
+from rasa.engine.graph import ExecutionContext
+from rasa.engine.runner.dask import DaskGraphRunner
+from rasa.engine.storage.local_model_storage import LocalModelStorage
+from rasa.engine.storage.storage import ModelMetadata
+from rasa.model import get_latest_model
+from eval_io import fingerprint_file
+from nlu_cache import install_parse_cache
+
+# --- Model Cache Configuration ---
+MODEL_CACHE_CONFIG = {
+    "cache_dir": os.environ.get("MODEL_CACHE_DIR", ".model_cache"),
+    "reuse_unpacked": os.environ.get("MODEL_CACHE_UNPACKED", "1") == "1", # 0 = always extract the archive
+    "keep": int(os.environ.get("MODEL_CACHE_KEEP", 3)),                   # Unpacked models kept on disk
+}
+
+FINGERPRINTS_FILE = "fingerprints.json"
+
+
+def resolve_model_path(model_dir="models"):
+    """Returns the archive to evaluate: model_dir itself if it is a file, else the newest archive in it
+    (the same choice `rasa run` makes). None if there is no model."""
+    if os.path.isfile(model_dir):
+        return os.path.abspath(model_dir)
+    if not os.path.isdir(model_dir):
+        return None
+    latest = get_latest_model(model_dir)
+    return os.path.abspath(latest) if latest else None
+
+def model_fingerprint(archive_path, cache_dir=None):
+    """SHA-256 of the archive, remembered per (path, size, mtime) so an unchanged model is hashed once."""
+    cache_dir = cache_dir or MODEL_CACHE_CONFIG["cache_dir"]
+    stat = os.stat(archive_path)
+    stamp = f"{os.path.abspath(archive_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    index_path = os.path.join(cache_dir, FINGERPRINTS_FILE)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if stamp not in index:
+        index[stamp] = fingerprint_file(archive_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=1)
+    return index[stamp]
+
+
+# --- Unpacked Model Cache ---
+def _unpacked_model(archive_path, cache_dir, keep):
+    """Returns (LocalModelStorage, ModelMetadata) for the archive, extracting it on first use."""
+    target = Path(cache_dir) / model_fingerprint(archive_path, cache_dir)
+    metadata_path = target / "metadata.json"
+    if not metadata_path.exists():
+        os.makedirs(cache_dir, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix="unpacking-", dir=cache_dir))
+        try:
+            _, metadata = LocalModelStorage.from_model_archive(
+                storage_path=staging / "storage", model_archive_path=archive_path)
+            (staging / "metadata.json").write_text(json.dumps(metadata.as_dict()))
+            # Another process (e.g. an intent.py --workers spawn worker) may have finished first and be
+            # loading from target already: never replace it, keep its copy and drop ours
+            unpacked_here = False
+            if not target.exists():
+                try:
+                    staging.rename(target) # Only complete directories ever appear under their hash
+                    unpacked_here = True
+                except OSError:
+                    pass # Lost the race between the check and the rename
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        if unpacked_here:
+            print(f"Unpacked {os.path.basename(archive_path)} into {target}")
+            _prune(cache_dir, keep, current=target)
+        else:
+            print(f"Reusing unpacked model {target} (unpacked concurrently by another process)")
+    else:
+        os.utime(target) # Mark as recently used for _prune
+        print(f"Reusing unpacked model {target}")
+    metadata = ModelMetadata.from_dict(json.loads(metadata_path.read_text()))
+    return LocalModelStorage(target / "storage"), metadata
+
+def _prune(cache_dir, keep, current):
+    unpacked = [p for p in Path(cache_dir).iterdir()
+                if p.is_dir() and (p / "metadata.json").exists() and p != current]
+    unpacked.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in unpacked[max(keep - 1, 0):]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+class CachedModelProcessor(MessageProcessor):
+    """MessageProcessor that loads its graph from the unpacked model cache.
+
+    Mirrors MessageProcessor._load_model, minus the extraction into a fresh temporary directory.
+    """
+
+    @staticmethod
+    def _load_model(model_path):
+        archive_path = resolve_model_path(str(model_path))
+        if not archive_path:
+            return MessageProcessor._load_model(model_path) # Let Rasa raise its usual ModelNotFound
+        model_storage, metadata = _unpacked_model(
+            archive_path, MODEL_CACHE_CONFIG["cache_dir"], MODEL_CACHE_CONFIG["keep"])
+        runner = DaskGraphRunner.create(
+            graph_schema=metadata.predict_schema,
+            model_storage=model_storage,
+            execution_context=ExecutionContext(graph_schema=metadata.predict_schema, model_id=metadata.model_id),
+        )
+        return os.path.basename(archive_path), metadata, runner
+
+_load_lock = threading.Lock()
+
+@contextmanager
+def _agent_processor_class(processor_class):
+    # Agent.load_model builds rasa.core.agent.MessageProcessor; swap it only for the duration of one load
+    original = rasa.core.agent.MessageProcessor
+    rasa.core.agent.MessageProcessor = processor_class
+    try:
+        yield
+    finally:
+        rasa.core.agent.MessageProcessor = original
+
+
+# --- Agent Reuse ---
+_agents = {} # archive sha256 -> loaded Agent
+
+def load_agent(model_path="models"):
+    """Returns a loaded Agent for model_path (an archive or a models directory), with the NLU parse
+    cache installed. The same model is only loaded once per process.
+
+    The fast path from fast_path.py is deliberately not installed: the evaluation scripts score the
+    NLU model itself, not pattern shortcuts."""
+    archive_path = resolve_model_path(model_path)
+    if not archive_path:
+        raise FileNotFoundError(f"No trained model found at '{model_path}'. Train one with 'rasa train'.")
+    fingerprint = model_fingerprint(archive_path)
+    with _load_lock:
+        agent = _agents.get(fingerprint)
+        if agent is None:
+            print(f"Loading model {archive_path}")
+            if MODEL_CACHE_CONFIG["reuse_unpacked"]:
+                with _agent_processor_class(CachedModelProcessor):
+                    agent = Agent.load(model_path=archive_path)
+            else:
+                agent = Agent.load(model_path=archive_path)
+            install_parse_cache(agent)
+            _agents[fingerprint] = agent
+        else:
+            print(f"Reusing already loaded model {archive_path}")
+    return agent
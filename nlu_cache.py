@@ -0,0 +1,159 @@
+"""Parse-result cache in front of Rasa NLU inference.
+
+Most traffic (and most of intent_accuracy.csv) is short repeated utterances such as "hi",
+"pnr status" or "thanks", and each one otherwise runs through the whole NLU pipeline in
+config.yml. install_parse_cache() wraps an agent's processor.parse_message with an LRU cache
+keyed by (model id, normalized text), so repeats skip the model. A new model has a new
+model id, so entries from the previous model are never served and simply age out.
+
+Used by intent.py and rouge_bert.py after loading their agent, and by the server through
+CachedRestInput (see credentials.yml), which also puts the pattern fast path from fast_path.py
+in front of the cache.
+"""
+import copy
+import logging
+import os
+from collections import OrderedDict
+from sanic import response
+from rasa.core.channels.rest import RestInput
+from fast_path import fast_path, install_fast_path
+
+logger = logging.getLogger(__name__)
+
+# --- NLU Cache Configuration ---
+NLU_CACHE_CONFIG = {
+    "max_entries": int(os.environ.get("NLU_CACHE_SIZE", 10000)),           # 0 disables the cache
+    # Off by default: LexicalSyntacticFeaturizer looks at casing, so "PNR" and "pnr" may parse differently
+    "case_fold": os.environ.get("NLU_CACHE_CASE_FOLD", "0") == "1",
+    "report_every": int(os.environ.get("NLU_CACHE_REPORT_EVERY", 1000)),   # Debug-log stats every N lookups (0 = never)
+}
+
+
+class ParseCache:
+    """LRU cache of parse results keyed by (model id, normalized text), with hit-rate counters."""
+
+    def __init__(self, max_entries=10000, case_fold=False, report_every=1000):
+        self.max_entries = max_entries
+        self.case_fold = case_fold
+        self.report_every = report_every
+        self._entries = OrderedDict() # key -> (original text, parse result)
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, text):
+        text = " ".join(text.split())
+        return text.lower() if self.case_fold else text
+
+    def cacheable(self, text):
+        # "/intent{...}" shortcuts bypass the model anyway
+        return self.max_entries > 0 and bool(text) and not text.startswith("/")
+
+    def get(self, model_id, text):
+        """Returns a copy of the cached result for text (with text set to the new input), or None."""
+        key = (model_id, self.normalize(text))
+        entry = self._entries.get(key)
+        # Entity offsets point into the original text, so only reuse them for the exact same string
+        if entry is not None and entry[0] != text and entry[1].get("entities"):
+            entry = None
+        if entry is None:
+            self._record(hit=False)
+            return None
+        self._entries.move_to_end(key)
+        self._record(hit=True)
+        result = copy.deepcopy(entry[1])
+        result["text"] = text
+        return result
+
+    def put(self, model_id, text, result):
+        key = (model_id, self.normalize(text))
+        self._entries[key] = (text, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4),
+                "entries": len(self._entries), "max_entries": self.max_entries}
+
+    def summary(self):
+        return (f"NLU parse cache: {self.hits} hits / {self.hits + self.misses} lookups "
+                f"({self.hit_rate * 100:.1f}% hit rate), {len(self._entries)} entries")
+
+    def report(self):
+        """Prints the stats; for the end of an evaluation run (the server has GET /webhooks/rest/nlu_cache)."""
+        print(self.summary())
+
+    def _record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        # On the server this runs per request, so it logs at debug level instead of writing to stdout
+        if self.report_every and (self.hits + self.misses) % self.report_every == 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(self.summary())
+
+
+parse_cache = ParseCache(**NLU_CACHE_CONFIG)
+
+
+def _model_id(processor):
+    metadata = getattr(processor, "model_metadata", None)
+    return getattr(metadata, "model_id", None) or id(processor)
+
+def install_parse_cache(agent, cache=parse_cache):
+    """Wraps agent.processor.parse_message with the cache; safe to call repeatedly.
+
+    Everything that parses through the processor (agent.parse_message, agent.handle_text,
+    channel messages, the /model/parse endpoint) then goes through the cache.
+    """
+    processor = getattr(agent, "processor", None)
+    if processor is None or cache.max_entries <= 0 or getattr(processor, "_parse_cache", None) is cache:
+        return
+    uncached_parse_message = processor.parse_message
+
+    async def parse_message(message, *args, **kwargs):
+        text = message.text
+        if not cache.cacheable(text):
+            return await uncached_parse_message(message, *args, **kwargs)
+        model_id = _model_id(processor)
+        result = cache.get(model_id, text)
+        if result is None:
+            result = await uncached_parse_message(message, *args, **kwargs)
+            cache.put(model_id, text, result)
+        return result
+
+    processor.parse_message = parse_message
+    processor._parse_cache = cache
+
+
+class CachedRestInput(RestInput):
+    """The REST channel (same /webhooks/rest/webhook URL) with the fast path and parse cache installed
+    on the server's agent. Cache and fast-path stats are served at GET /webhooks/rest/nlu_cache."""
+
+    @classmethod
+    def name(cls):
+        return "rest"
+
+    def blueprint(self, on_new_message):
+        webhook = super().blueprint(on_new_message)
+
+        @webhook.middleware("request")
+        async def attach_parse_cache(request):
+            # Checked per request so a model loaded later (PUT /model) gets the cache too
+            agent = getattr(request.app.ctx, "agent", None)
+            install_parse_cache(agent)
+            install_fast_path(agent)
+
+        @webhook.route("/nlu_cache", methods=["GET"])
+        async def nlu_cache_stats(request):
+            return response.json({**parse_cache.stats(), "fast_path": fast_path.stats()})
+
+        return webhook
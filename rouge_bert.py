@@ -1,19 +1,25 @@
-from rasa.core.agent import Agent
 import asyncio
+from rasa.shared.constants import DEFAULT_SENDER_ID
 import os
 import pandas as pd
-from rouge_score import rouge_scorer
-from bert_score import score as bert_score_calculate
+from rouge_score import rouge_scorer, tokenizers
+from bert_score import BERTScorer
 import torch
 from tqdm import tqdm
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from nlu_cache import parse_cache
+from eval_io import ResultWriter, RunningMean, iter_csv_chunks, add_checkpoint_args, open_checkpoint
+from model_loader import load_agent, model_fingerprint, resolve_model_path
 
 # --- RASA Interaction Functions ---
-async def get_rasa_bot_response_async(text_to_process, agent):
+async def get_rasa_bot_response_async(text_to_process, agent, sender_id=DEFAULT_SENDER_ID):
     if not agent:
         print("Agent not loaded.")
         return "[AGENT_NOT_LOADED]"
     
-    bot_messages = await agent.handle_text(text_to_process)
+    bot_messages = await agent.handle_text(text_to_process, sender_id=sender_id)
     
     if bot_messages:
         responses = [msg.get("text") for msg in bot_messages if msg.get("text")]
@@ -24,6 +30,87 @@ async def get_rasa_bot_response_async(text_to_process, agent):
     else:
         return "[NO_BOT_RESPONSE]"
 
+# --- Conversation Replay ---
+# shared: every row goes to one sender (one ever-growing tracker, slots carry over between rows)
+# row:    each row is its own single-turn conversation
+# group:  rows sharing a --conversation-column value are one conversation, in CSV order
+SENDER_MODES = ("shared", "row", "group")
+
+def conversation_sender_id(sender_mode, index, row, conversation_column):
+    if sender_mode == "row":
+        return f"eval-row-{index}"
+    if sender_mode == "group" and pd.notna(row[conversation_column]):
+        return f"eval-conversation-{row[conversation_column]}"
+    if sender_mode == "group": # Rows without a conversation id stand alone
+        return f"eval-row-{index}"
+    return DEFAULT_SENDER_ID
+
+def group_column(args):
+    return args.conversation_column if args.sender_mode == "group" else None
+
+_recycle_warned = False
+
+async def recycle_tracker(agent, sender_id):
+    """Drops a finished conversation's tracker so replaying a large log does not keep them all in memory.
+
+    Uses the tracker store's public delete() where it has one. Otherwise it unwraps every wrapper
+    (AwaitableTrackerStore, FailSafeTrackerStore, ...) down to an InMemoryTrackerStore and removes
+    the tracker there. If neither works, it warns once instead of silently keeping every tracker.
+    """
+    global _recycle_warned
+    delete = getattr(agent.tracker_store, "delete", None)
+    if delete is not None:
+        try:
+            await delete(sender_id)
+            return
+        except NotImplementedError:
+            pass
+    tracker_store, seen = agent.tracker_store, set()
+    while tracker_store is not None and id(tracker_store) not in seen:
+        seen.add(id(tracker_store))
+        store = getattr(tracker_store, "store", None) # InMemoryTrackerStore keeps serialized trackers here
+        if isinstance(store, dict):
+            store.pop(sender_id, None)
+            return
+        tracker_store = getattr(tracker_store, "_tracker_store", None) or getattr(tracker_store, "tracker_store", None)
+    if not _recycle_warned:
+        _recycle_warned = True
+        print(f"WARNING: Cannot drop finished trackers from {type(agent.tracker_store).__name__}; "
+              f"every replayed conversation stays in memory.")
+
+async def replay_conversations(agent, conversations, sender_mode, concurrency=1, on_response=None):
+    """Sends each conversation's turns in order under its own sender ID and returns {position: response}.
+
+    conversations maps sender_id -> [(position, user_input_text, cached_response)]. Up to `concurrency`
+    conversations are in flight at once (their turns still go one by one), which overlaps the
+    action-server and database round trips. Outside shared mode a conversation is only taken from
+    the cache when every turn of it is cached (a partial replay would lack context), and its tracker
+    is dropped once it finishes. on_response(position, response) is called for newly generated turns.
+    """
+    responses = {}
+    pending = iter(conversations.items()) # Shared by the workers below; next() never yields mid-call
+    progress = tqdm(total=sum(len(turns) for turns in conversations.values()), desc="Generating responses")
+
+    async def worker():
+        for sender_id, turns in pending:
+            use_cached = sender_mode == "shared" or all(cached is not None for _, _, cached in turns)
+            for position, user_input_text, cached_response in turns:
+                if use_cached and cached_response is not None:
+                    responses[position] = cached_response
+                else:
+                    responses[position] = await get_rasa_bot_response_async(user_input_text, agent, sender_id)
+                    if on_response:
+                        on_response(position, responses[position])
+                progress.update(1)
+            if sender_mode != "shared":
+                await recycle_tracker(agent, sender_id)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        progress.close()
+    return responses
+
 # --- Scoring Functions ---
 def calculate_simplified_rouge_scores(reference, hypothesis, scorer_instance):
     if not reference or not hypothesis or reference.isspace() or hypothesis.isspace():
@@ -46,36 +133,259 @@ def calculate_simplified_rouge_scores(reference, hypothesis, scorer_instance):
             'rougeL_fmeasure': 0.0,
         }
 
-def calculate_simplified_bertscore(references, hypotheses, lang="en", model_type=None, device=None):
-    # Ensure references and hypotheses are lists and handle empty or whitespace-only strings
-    # by replacing them with a single space to avoid errors with BERTScore.
-    # BERTScore can be sensitive to truly empty strings.
-    
-    processed_refs = [ref if ref and not ref.isspace() else " " for ref in references]
-    processed_hyps = [hyp if hyp and not hyp.isspace() else " " for hyp in hypotheses]
+class CachingTokenizer:
+    """rouge_score tokenizer that memoizes tokenized + stemmed text.
 
-    if not any(r.strip() for r in processed_refs) or not any(h.strip() for h in processed_hyps):
-        return {'bertscore_f1': 0.0}
-    
+    Expected responses come from a handful of canned domain.yml replies, so most
+    references are tokenized and stemmed once instead of once per row.
+    """
+    def __init__(self, use_stemmer=True, max_entries=100000):
+        self._tokenizer = tokenizers.DefaultTokenizer(use_stemmer=use_stemmer)
+        self._cache = {}
+        self.max_entries = max_entries
+
+    def tokenize(self, text):
+        tokens = self._cache.get(text)
+        if tokens is None:
+            tokens = self._tokenizer.tokenize(text)
+            if len(self._cache) < self.max_entries:
+                self._cache[text] = tokens
+        return tokens
+
+def create_rouge_scorer(rouge_types):
+    return rouge_scorer.RougeScorer(rouge_types, tokenizer=CachingTokenizer(use_stemmer=True))
+
+_worker_rouge_scorer = None
+
+def _init_rouge_worker(rouge_types):
+    global _worker_rouge_scorer
+    _worker_rouge_scorer = create_rouge_scorer(rouge_types)
+
+def _score_rouge_chunk(pairs):
+    return [calculate_simplified_rouge_scores(ref, hyp, _worker_rouge_scorer) for ref, hyp in pairs]
+
+def calculate_rouge_batched(references, hypotheses, rouge_types, workers=1, chunk_size=256):
+    """Returns one ROUGE score dict per (reference, hypothesis) pair.
+
+    Identical pairs are scored once, and unique pairs are spread over `workers` processes
+    when there are enough of them to be worth it.
+    """
+    pairs = list(zip(references, hypotheses))
+    # Sorting by reference keeps pairs sharing a reference in the same chunk (and tokenizer cache)
+    unique_pairs = sorted(set(pairs))
+    print(f"ROUGE: {len(pairs)} rows, {len(unique_pairs)} unique (reference, response) pairs")
+
+    if workers > 1 and len(unique_pairs) > chunk_size:
+        chunks = [unique_pairs[i:i + chunk_size] for i in range(0, len(unique_pairs), chunk_size)]
+        # 'spawn', like intent.py: forking a process that already holds TensorFlow/torch threads can
+        # deadlock. Each worker re-imports this script's modules once at startup, which only pays off
+        # for large logs, hence --rouge-workers defaults to 1
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_rouge_worker, initargs=(rouge_types,)) as executor:
+            unique_scores = []
+            for chunk_scores in tqdm(executor.map(_score_rouge_chunk, chunks), total=len(chunks), desc="ROUGE chunks"):
+                unique_scores.extend(chunk_scores)
+    else:
+        scorer_instance = create_rouge_scorer(rouge_types)
+        unique_scores = [calculate_simplified_rouge_scores(ref, hyp, scorer_instance) for ref, hyp in unique_pairs]
+
+    scores_by_pair = dict(zip(unique_pairs, unique_scores))
+    return [scores_by_pair[pair] for pair in pairs]
+
+def create_bertscore_scorer(lang="en", model_type=None, device=None, batch_size=64):
+    """Loads the BERTScore model once so every pair in the run reuses it."""
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
-    
+    return BERTScorer(lang=lang, model_type=model_type, device=device, batch_size=batch_size)
+
+def calculate_bertscore_batched(references, hypotheses, scorer, chunk_size=1024):
+    """Returns one BERTScore F1 per (reference, hypothesis) pair, scored in batches.
+
+    Pairs where either side is empty or whitespace-only score 0.0 without touching the model
+    (BERTScore can be sensitive to truly empty strings). Pairs are sent to the scorer in chunks
+    of chunk_size so one failing chunk only zeroes that chunk.
+    """
+    f1_scores = [0.0] * len(references)
+    to_score = [i for i, (ref, hyp) in enumerate(zip(references, hypotheses))
+                if ref and not ref.isspace() and hyp and not hyp.isspace()]
+
+    for start in tqdm(range(0, len(to_score), chunk_size), desc="BERTScore batches"):
+        chunk = to_score[start:start + chunk_size]
+        try:
+            P, R, F1 = scorer.score([hypotheses[i] for i in chunk], [references[i] for i in chunk], verbose=False,
+                                    batch_size=scorer.batch_size) # score() ignores the constructor's batch_size
+            for i, f1 in zip(chunk, F1.tolist()):
+                f1_scores[i] = f1
+        except Exception as e: # Catch any exception from bert_score
+            print(f"BERTScore calculation error for rows {chunk[0]}..{chunk[-1]}: {e}")
+    return f1_scores
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score Rasa bot responses against rouge_bert.csv with ROUGE and BERTScore")
+    parser.add_argument("--bertscore-batch-size", type=int, default=64,
+                        help="Sentence pairs per BERTScore forward pass (lower it if memory is tight)")
+    parser.add_argument("--rouge-workers", type=int, default=1,
+                        help="Processes used for ROUGE scoring of unique pairs (1 = in-process)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the CSV in chunks and append scored rows to the output as they finish (flat memory for large logs)")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="CSV rows read and scored per chunk in --stream mode")
+    parser.add_argument("--output", default="rouge_bert_simplified_response.csv",
+                        help="Scored rows output file (.csv, or .parquet with pyarrow in --stream mode)")
+    parser.add_argument("--sender-mode", choices=SENDER_MODES, default="shared",
+                        help="shared: all rows in one conversation (original behaviour); row: one conversation per row; "
+                             "group: one conversation per --conversation-column value")
+    parser.add_argument("--conversation-column", default="ConversationId",
+                        help="Column grouping rows into multi-turn conversations for --sender-mode group "
+                             "(with --stream, a conversation cut by a chunk boundary is replayed as two)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Conversations replayed at once with --sender-mode row/group")
+    add_checkpoint_args(parser)
+    args = parser.parse_args(argv)
+    if args.sender_mode == "shared" and args.concurrency > 1:
+        parser.error("--concurrency needs --sender-mode row or group (a shared conversation is sequential)")
+    return args
+
+SCORE_COLUMNS = ['rouge1_fmeasure', 'rouge2_fmeasure', 'rougeL_fmeasure', 'bertscore_f1']
+
+async def score_rows(df, agent, expected_response_column_name, rouge_types, bert_scorer, args, checkpoint=None):
+    """Generates a bot response for every row of df and returns the rows with their scores added.
+
+    With a checkpoint, fully scored rows from an earlier run are reused as-is, rows whose response
+    was generated but not yet scored skip Rasa, and both stages are saved as they finish.
+    """
+    results_data = []
+    if checkpoint:
+        row_keys = [checkpoint.row_key(index, row['UserInput (Clean)'], row[expected_response_column_name])
+                    for index, row in df.iterrows()]
+    else:
+        row_keys = [None] * len(df)
+    cached_rows = checkpoint.load(row_keys) if checkpoint else {}
+    if cached_rows:
+        print(f"{len(cached_rows)} of {len(df)} rows found in checkpoint")
+    # One pair per row still to be scored for each metric, scored together after the loop
+    to_score = [] # positions in results_data
+    rouge_references, rouge_hypotheses = [], []
+    bert_references, bert_hypotheses = [], []
+
+    conversations = {} # sender_id -> [(position, user_input_text, cached_response)], in CSV order
+    for position, (index, row) in enumerate(df.iterrows()):
+        cached = cached_rows.get(row_keys[position], {})
+        if 'bertscore_f1' in cached: # Scored by an earlier run
+            results_data.append({**row.to_dict(), **cached})
+            continue
+
+        to_score.append(position)
+        user_input_text = str(row['UserInput (Clean)'])
+        results_data.append(row.to_dict())
+        if not user_input_text or pd.isna(user_input_text):
+            # Add a row with NaNs or placeholders
+            results_data[position]['Newly_Generated_Bot_Response'] = '[SKIPPED_EMPTY_INPUT]'
+            continue
+        sender_id = conversation_sender_id(args.sender_mode, index, row, args.conversation_column)
+        conversations.setdefault(sender_id, []).append(
+            (position, user_input_text, cached.get('Newly_Generated_Bot_Response')))
+
+    def save_response(position, response):
+        if checkpoint:
+            checkpoint.save(row_keys[position], {'Newly_Generated_Bot_Response': response})
+
+    responses = await replay_conversations(agent, conversations, args.sender_mode, args.concurrency, save_response)
+
+    for position in to_score:
+        current_row_output = results_data[position]
+        row = df.iloc[position]
+        expected_bot_response_text = str(row[expected_response_column_name]) if pd.notna(row[expected_response_column_name]) else ""
+
+        if position not in responses: # Skipped empty input
+            rouge_references.append("")
+            rouge_hypotheses.append("")
+            bert_references.append("")
+            bert_hypotheses.append("")
+            continue
+
+        newly_generated_bot_response_text = responses[position]
+        rouge_references.append(expected_bot_response_text)
+        rouge_hypotheses.append(newly_generated_bot_response_text)
+        
+        # Handle placeholders for BERTScore calculation
+        if newly_generated_bot_response_text.startswith("[") and newly_generated_bot_response_text.endswith("]"):
+            bert_hypotheses.append(" ") # Treat placeholder as empty
+        else:
+            bert_hypotheses.append(newly_generated_bot_response_text)
+        bert_references.append(expected_bot_response_text)
+        
+        current_row_output['Newly_Generated_Bot_Response'] = newly_generated_bot_response_text
+    if checkpoint:
+        checkpoint.flush() # Responses are safe even if scoring below crashes
+
+    if not to_score:
+        return results_data
+
+    # --- ROUGE (deduplicated, parallel across CPU cores) ---
+    print(f"\n--- Calculating ROUGE for {len(rouge_references)} rows ---")
+    rouge_scores_per_row = calculate_rouge_batched(rouge_references, rouge_hypotheses, rouge_types, workers=args.rouge_workers)
+    for position, rouge_scores in zip(to_score, rouge_scores_per_row):
+        results_data[position].update(rouge_scores)
+
+    # --- BERTScore (one model load, batched over all rows) ---
+    print(f"\n--- Calculating BERTScore for {len(bert_references)} rows ---")
+    bert_f1_scores = calculate_bertscore_batched(bert_references, bert_hypotheses, bert_scorer)
+    for position, f1 in zip(to_score, bert_f1_scores):
+        results_data[position]['bertscore_f1'] = f1
+
+    if checkpoint:
+        for position in to_score:
+            checkpoint.save(row_keys[position], {col: results_data[position][col]
+                                                 for col in ['Newly_Generated_Bot_Response'] + SCORE_COLUMNS})
+        checkpoint.flush()
+    return results_data
+
+def check_columns(df, input_csv_path, expected_response_column_name, conversation_column=None):
+    if 'UserInput (Clean)' not in df.columns:
+        print(f"CSV file '{input_csv_path}' must contain 'UserInput (Clean)'.")
+        return False
+    if expected_response_column_name not in df.columns:
+        print(f"CSV file '{input_csv_path}' must contain '{expected_response_column_name}'.")
+        return False
+    if conversation_column and conversation_column not in df.columns:
+        print(f"CSV file '{input_csv_path}' must contain '{conversation_column}' for --sender-mode group.")
+        return False
+    return True
+
+async def score_streaming(input_csv_path, output_path, agent, expected_response_column_name, rouge_types, bert_scorer, args,
+                          checkpoint=None):
+    """Scores the CSV chunk by chunk, appending each scored chunk to output_path and keeping running averages."""
+    running_means = {col: RunningMean() for col in SCORE_COLUMNS}
     try:
-        P, R, F1 = bert_score_calculate(
-            processed_hyps, processed_refs, lang=lang, model_type=model_type, device=device, verbose=False
-        )
-        return {
-            'bertscore_f1': F1.mean().item(),
-        }
-    except Exception as e: # Catch any exception from bert_score
-        print(f"BERTScore calculation error: {e}. Inputs: Hyps='{hypotheses}', Refs='{references}'")
-        return {'bertscore_f1': 0.0}
+        with ResultWriter(output_path) as writer:
+            for chunk in iter_csv_chunks(input_csv_path, args.chunk_size):
+                if not check_columns(chunk, input_csv_path, expected_response_column_name, group_column(args)):
+                    return
+                print(f"\n=== Rows {chunk.index[0] + 2}..{chunk.index[-1] + 2} of {input_csv_path} ===")
+                results_data = await score_rows(chunk, agent, expected_response_column_name, rouge_types, bert_scorer, args,
+                                                checkpoint)
+                for current_row_output in results_data:
+                    for col, running_mean in running_means.items():
+                        running_mean.add(current_row_output.get(col))
+                writer.write(results_data)
+                print(f"Wrote {writer.rows_written} scored rows to '{output_path}'")
+    except Exception as e:
+        print(f"Error during streaming evaluation of '{input_csv_path}': {e}")
+        return
 
+    print("\n--- Average Scores ---")
+    for col, running_mean in running_means.items():
+        if running_mean.count:
+            print(f"Average {col}: {running_mean.mean:.4f}")
+    print(f"\nEvaluation scores saved to '{output_path}'")
 
-async def main():
+async def main(args):
     model_directory = "models"
     input_csv_path = "rouge_bert.csv" 
-    output_csv_path = "rouge_bert_simplified_response.csv"
+    output_csv_path = args.output
     
     expected_response_column_name = "Predicted Bot Response" 
 
@@ -87,7 +397,7 @@ async def main():
     print(f"Loading agent from directory: {model_directory}")
     agent = None
     try:
-        agent = Agent.load(model_path=model_directory) # Tries to find latest model in dir
+        agent = load_agent(model_directory) # Latest model in dir; reused if already loaded in this process
         print("Agent loaded successfully.")
     except Exception as e:
         print(f"Error loading agent: {e}")
@@ -99,6 +409,31 @@ async def main():
         print(f"CSV file not found at '{input_csv_path}'.")
         return
 
+    # --- Initialize Scorers ---
+    rouge_types = ['rouge1', 'rouge2', 'rougeL']
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Using device: {device} for BERTScore calculations.")
+    bert_scorer = create_bertscore_scorer(device=device, batch_size=args.bertscore_batch_size)
+
+    # Responses depend on the model and on how rows are grouped into conversations; scores also depend on the scorers
+    checkpoint = open_checkpoint(args, "rouge_bert", model_fingerprint(resolve_model_path(model_directory)),
+                                 rouge_types, bert_scorer.hash, args.sender_mode, group_column(args))
+    try:
+        if args.stream:
+            print(f"\n--- Streaming {input_csv_path} in chunks of {args.chunk_size} rows ---")
+            await score_streaming(input_csv_path, output_csv_path, agent, expected_response_column_name,
+                                  rouge_types, bert_scorer, args, checkpoint)
+        else:
+            await score_in_memory(input_csv_path, output_csv_path, agent, expected_response_column_name,
+                                  rouge_types, bert_scorer, args, checkpoint)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    parse_cache.report()
+
+async def score_in_memory(input_csv_path, output_csv_path, agent, expected_response_column_name, rouge_types, bert_scorer, args,
+                          checkpoint=None):
     try:
         df = pd.read_csv(input_csv_path)
         print(f"\nSuccessfully loaded {len(df)} rows from {input_csv_path}")
@@ -106,49 +441,11 @@ async def main():
         print(f"Error reading CSV file '{input_csv_path}': {e}")
         return
 
-    if 'UserInput (Clean)' not in df.columns:
-        print(f"CSV file '{input_csv_path}' must contain 'UserInput (Clean)'.")
-        return
-    if expected_response_column_name not in df.columns:
-        print(f"CSV file '{input_csv_path}' must contain '{expected_response_column_name}'.")
+    if not check_columns(df, input_csv_path, expected_response_column_name, group_column(args)):
         return
 
-    # --- Initialize Scorers ---
-    rouge_types = ['rouge1', 'rouge2', 'rougeL']
-    rouge_scorer_instance = rouge_scorer.RougeScorer(rouge_types, use_stemmer=True)
-    
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Using device: {device} for BERTScore calculations.")
-
-    results_data = []
-
     print("\n--- Processing User Inputs and Calculating Scores ---")
-    for index, row in tqdm(df.iterrows(), total=df.shape[0], desc="Processing rows"):
-        user_input_text = str(row['UserInput (Clean)'])
-        expected_bot_response_text = str(row[expected_response_column_name]) if pd.notna(row[expected_response_column_name]) else ""
-
-        if not user_input_text or pd.isna(user_input_text):
-            # Add a row with NaNs or placeholders
-            results_data.append({**row.to_dict(), 'Newly_Generated_Bot_Response': '[SKIPPED_EMPTY_INPUT]', 
-                                 **calculate_simplified_rouge_scores("", "", rouge_scorer_instance), 
-                                 **calculate_simplified_bertscore([""], [""] , device=device)})
-            continue
-        
-        newly_generated_bot_response_text = await get_rasa_bot_response_async(user_input_text, agent)
-
-        rouge_scores = calculate_simplified_rouge_scores(expected_bot_response_text, newly_generated_bot_response_text, rouge_scorer_instance)
-        
-        # Handle placeholders for BERTScore calculation
-        if newly_generated_bot_response_text.startswith("[") and newly_generated_bot_response_text.endswith("]"):
-            current_bert_scores = calculate_simplified_bertscore([expected_bot_response_text], [" "], device=device) # Treat placeholder as empty
-        else:
-            current_bert_scores = calculate_simplified_bertscore([expected_bot_response_text], [newly_generated_bot_response_text], device=device)
-        
-        current_row_output = row.to_dict()
-        current_row_output['Newly_Generated_Bot_Response'] = newly_generated_bot_response_text
-        current_row_output.update(rouge_scores)
-        current_row_output.update(current_bert_scores)
-        results_data.append(current_row_output)
+    results_data = await score_rows(df, agent, expected_response_column_name, rouge_types, bert_scorer, args, checkpoint)
 
     # --- Create and Save Output CSV ---
     output_df = pd.DataFrame(results_data)
@@ -156,8 +453,7 @@ async def main():
     print("\n--- Average Scores ---")
     avg_scores = {}
     # Only average the F-measures for ROUGE and BERTScore F1
-    score_cols_to_average = ['rouge1_fmeasure', 'rouge2_fmeasure', 'rougeL_fmeasure', 'bertscore_f1']
-    for col in score_cols_to_average:
+    for col in SCORE_COLUMNS:
         if col in output_df.columns: # Check if column exists
             avg_scores[f'avg_{col}'] = pd.to_numeric(output_df[col], errors='coerce').mean()
             print(f"Average {col}: {avg_scores[f'avg_{col}']:.4f}")
@@ -169,4 +465,4 @@ async def main():
         print(f"Error saving output CSV to '{output_csv_path}': {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
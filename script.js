@@ -12,7 +12,14 @@ messageInputArea.classList.add("message-input-area");
 
 const API_KEY = "YOUR_GEMINI_API_KEY"; // IMPORTANT: Replace with your actual Gemini API Key
 const API_URL = `https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key=${API_KEY}`;
-const RASA_API_URL = "http://localhost:5005/webhooks/rest/webhook";
+const RASA_SERVER_URL = "http://localhost:5005";
+const RASA_API_URL = `${RASA_SERVER_URL}/webhooks/rest/webhook`;
+// "rest": one HTTP POST per message. "socketio": one persistent connection per tab, replies pushed
+// as they are ready (needs the socketio channel in credentials.yml). Falls back to REST if it cannot connect.
+const RASA_TRANSPORT = "rest";
+const SOCKET_IO_CLIENT_URL = "https://cdn.socket.io/4.7.5/socket.io.min.js";
+const SOCKET_REPLY_IDLE_MS = 800; // A reply is complete once no bot message arrived for this long
+const SOCKET_REPLY_TIMEOUT_MS = 15000;
 // const RASA_ACTION_URL = "http://localhost:5055/webhook"; // Uncomment if you use Rasa actions
 
 const userData = {
@@ -24,6 +31,27 @@ const userData = {
 };
 
 const chatHistory = [];
+
+// One Rasa conversation (tracker) per browser, kept across page reloads
+const SESSION_STORAGE_KEY = "rasa_session_id";
+const getSessionId = () => {
+    let sessionId = null;
+    try {
+        sessionId = localStorage.getItem(SESSION_STORAGE_KEY);
+    } catch (e) {
+        console.warn("localStorage unavailable; this session ID will not survive a reload.", e);
+    }
+    if (!sessionId) {
+        sessionId = (window.crypto && crypto.randomUUID)
+            ? crypto.randomUUID()
+            : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+        try {
+            localStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+        } catch (e) { /* Already warned above */ }
+    }
+    return sessionId;
+};
+const sessionId = getSessionId();
 let initialInputHeight = messageInput.scrollHeight;
 
 const setupInputArea = () => {
@@ -166,6 +194,103 @@ const formatTrainResponse = (text) => {
     return tempDiv.innerHTML.replace(/\n/g, '<br>');
 };
 
+// --- Rasa transports ---
+const sendViaRest = async (message) => {
+    const rasaRequestOptions = {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+            sender: sessionId,
+            message: message
+        })
+    };
+
+    console.log("Sending to Rasa:", RASA_API_URL, rasaRequestOptions.body);
+    const rasaResponse = await fetch(RASA_API_URL, rasaRequestOptions);
+    if (!rasaResponse.ok) {
+        console.error("Rasa API error:", rasaResponse.status, await rasaResponse.text());
+        return null;
+    }
+    const rasaData = await rasaResponse.json();
+    console.log("Rasa response data:", rasaData);
+    return rasaData;
+};
+
+let rasaSocketPromise = null;
+let pendingSocketReply = null; // { messages, onMessage, finish } for the reply being received
+
+const loadScript = (src) => new Promise((resolve, reject) => {
+    const script = document.createElement("script");
+    script.src = src;
+    script.onload = resolve;
+    script.onerror = () => reject(new Error(`Could not load ${src}`));
+    document.head.appendChild(script);
+});
+
+// Resolves to a connected socket whose session is confirmed; the same socket serves every message
+const connectRasaSocket = () => {
+    if (!rasaSocketPromise) {
+        rasaSocketPromise = (typeof io === "undefined" ? loadScript(SOCKET_IO_CLIENT_URL) : Promise.resolve())
+            .then(() => new Promise((resolve, reject) => {
+                const socket = io(RASA_SERVER_URL, { path: "/socket.io", transports: ["websocket"] });
+                const connectTimer = setTimeout(() => reject(new Error("Socket connection timed out")), SOCKET_REPLY_TIMEOUT_MS);
+                socket.on("connect", () => socket.emit("session_request", { session_id: sessionId }));
+                socket.on("session_confirm", () => {
+                    clearTimeout(connectTimer);
+                    resolve(socket);
+                });
+                socket.on("bot_uttered", (botMessage) => {
+                    if (pendingSocketReply) pendingSocketReply.onMessage(botMessage);
+                });
+                socket.on("connect_error", (error) => console.error("Rasa socket connection error:", error));
+            }))
+            .catch((error) => {
+                rasaSocketPromise = null; // Try again on the next message
+                throw error;
+            });
+    }
+    return rasaSocketPromise;
+};
+
+// Resolves with every bot message of the reply; onPartial(messagesSoFar) runs as each one arrives
+const sendViaSocket = async (message, onPartial) => {
+    const socket = await connectRasaSocket();
+    if (pendingSocketReply) pendingSocketReply.finish(); // A newer message ends the previous reply
+
+    return new Promise((resolve) => {
+        const reply = { messages: [] };
+        let idleTimer = null;
+        const timeoutTimer = setTimeout(() => reply.finish(), SOCKET_REPLY_TIMEOUT_MS);
+        reply.finish = () => {
+            clearTimeout(idleTimer);
+            clearTimeout(timeoutTimer);
+            if (pendingSocketReply === reply) pendingSocketReply = null;
+            resolve(reply.messages);
+        };
+        reply.onMessage = (botMessage) => {
+            reply.messages.push(botMessage);
+            onPartial(reply.messages);
+            clearTimeout(idleTimer);
+            idleTimer = setTimeout(reply.finish, SOCKET_REPLY_IDLE_MS);
+        };
+        pendingSocketReply = reply;
+        console.log("Sending to Rasa over socket:", message);
+        socket.emit("user_uttered", { message: message, session_id: sessionId });
+    });
+};
+
+const rasaReplyText = (rasaData) => {
+    let apiResponseText = rasaData.map(msg => msg.text || "").join("\n").trim();
+    rasaData.forEach(msg => {
+        if (msg.custom) {
+            if (msg.custom.type === "table_markdown" && msg.custom.data) {
+                apiResponseText += "\n```\n" + msg.custom.data + "\n```";
+            }
+        }
+    });
+    return apiResponseText;
+};
+
 const generateBotResponse = async (incomingMessageDiv) => {
     const messageElement = incomingMessageDiv.querySelector(".message-text");
     
@@ -177,41 +302,31 @@ const generateBotResponse = async (incomingMessageDiv) => {
         ]
     });
 
-    const rasaRequestOptions = {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-            sender: "user123_frontend",
-            message: userData.message
-        })
-    };
-
     try {
         incomingMessageDiv.classList.add("thinking");
         let apiResponseText = "";
 
-        console.log("Sending to Rasa:", RASA_API_URL, JSON.stringify(rasaRequestOptions.body));
-        const rasaResponse = await fetch(RASA_API_URL, rasaRequestOptions);
-        
-        if (rasaResponse.ok) {
-            const rasaData = await rasaResponse.json();
-            console.log("Rasa response data:", rasaData);
-            
-            if (rasaData && rasaData.length > 0) {
-                apiResponseText = rasaData.map(msg => msg.text || "").join("\n").trim();
-                rasaData.forEach(msg => {
-                    if (msg.custom) {
-                        if (msg.custom.type === "table_markdown" && msg.custom.data) {
-                            apiResponseText += "\n```\n" + msg.custom.data + "\n```";
-                        }
-                    }
+        let rasaData = undefined;
+        if (RASA_TRANSPORT === "socketio") {
+            try {
+                rasaData = await sendViaSocket(userData.message, (messagesSoFar) => {
+                    incomingMessageDiv.classList.remove("thinking");
+                    messageElement.innerHTML = formatTrainResponse(rasaReplyText(messagesSoFar));
                 });
-            } else {
-                apiResponseText = "I'm sorry, I didn't get a specific response from the server.";
+            } catch (socketError) {
+                console.warn("Socket transport unavailable, falling back to REST:", socketError);
             }
-        } else {
-            console.error("Rasa API error:", rasaResponse.status, await rasaResponse.text());
+        }
+        if (rasaData === undefined) {
+            rasaData = await sendViaRest(userData.message);
+        }
+        
+        if (rasaData === null) {
             apiResponseText = "Sorry, I'm having trouble connecting to my brain right now. Please try again later.";
+        } else if (rasaData && rasaData.length > 0) {
+            apiResponseText = rasaReplyText(rasaData);
+        } else {
+            apiResponseText = "I'm sorry, I didn't get a specific response from the server.";
         }
         
         if (apiResponseText) {
@@ -0,0 +1,35 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import benchmark
+
+
+def test_fixture_statements_skip_the_dumps_example_queries():
+    dump = os.path.join(REPO_ROOT, benchmark.BENCH_CONFIG["fixture"])
+    statements = list(benchmark.fixture_statements(dump))
+    keywords = [statement.split(None, 1)[0].upper() for statement in statements]
+
+    # The dump ends with two example SELECTs; an unread result set aborts load_fixture before its commit
+    assert any(statement.upper().startswith("SELECT") for statement in benchmark.iter_sql_statements(dump))
+    assert set(keywords) == {"CREATE", "INSERT"}
+    assert not any(statement.upper().startswith(("CREATE DATABASE", "USE")) for statement in statements)
+    assert keywords.count("CREATE") == keywords.count("INSERT") == 6
+    assert statements[-1].startswith("INSERT INTO stations")
+
+
+def _scrape(count, errors):
+    return benchmark.parse_action_metrics("\n".join([
+        f'action_duration_seconds_bucket{{action="action_check_pnr_status",le="0.1"}} {count}',
+        f'action_duration_seconds_bucket{{action="action_check_pnr_status",le="+Inf"}} {count}',
+        f'action_errors_total{{action="action_check_pnr_status",kind="db"}} {errors}',
+        f'action_errors_total{{action="action_check_pnr_status",kind="timeout"}} 1',
+    ]))
+
+
+def test_action_errors_are_read_from_metrics():
+    summary = benchmark.summarize_actions(_scrape(10, 2), _scrape(25, 5))
+    assert summary["action_check_pnr_status"]["count"] == 15
+    assert summary["action_check_pnr_status"]["errors"] == 3
@@ -0,0 +1,26 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import generate_dataset
+
+
+def test_nulls_are_written_as_load_data_null_marker(tmp_path):
+    args = generate_dataset.parse_args([
+        "--out", str(tmp_path), "--schema", os.path.join(REPO_ROOT, "railway_chatbot database"),
+        "--stations", "40", "--trains", "20", "--users", "50", "--pnrs", "500", "--seed", "7",
+    ])
+    generate_dataset.main(args)
+
+    rows = [line.split("\t") for line in (tmp_path / "pnr_status.tsv").read_text().splitlines()]
+    seats = {row[4]: [] for row in rows}
+    for row in rows:
+        seats[row[4]].append(row[2])
+
+    # Waiting List / Cancelled PNRs have no seat: LOAD DATA only reads an unescaped \N as NULL
+    assert seats["Waiting List"] and set(seats["Waiting List"]) == {"\\N"}
+    assert set(seats["Cancelled"]) == {"\\N"}
+    assert all(seat != "\\N" and "\\" not in seat for seat in seats["Confirmed"])
+    assert not any("\\\\" in line for line in (tmp_path / "pnr_status.tsv").read_text().splitlines())
@@ -0,0 +1,161 @@
+"""SQLite tracker store with TTL eviction and a bounded in-memory hot set.
+
+The default InMemoryTrackerStore keeps every conversation in the server's memory for as long
+as the process lives. This store keeps conversations in a local SQLite file instead:
+
+* Trackers are stored as zlib-compressed dialogue JSON, one row per sender.
+* Conversations idle for longer than `ttl` seconds are evicted (checked on read and swept
+  periodically on write).
+* The `hot_set_size` most recently used trackers stay in memory in serialized form, so active
+  conversations skip the database read and decompression.
+* Restarting the server keeps every conversation that has not expired.
+* SQLite I/O and (de)compression run on the default thread pool, never on Rasa's event loop.
+
+Enabled in endpoints.yml:
+
+    tracker_store:
+      type: tracker_store.SQLiteTrackerStore
+      db: trackers.db
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from rasa.core.tracker_store import TrackerStore
+from rasa.shared.core.trackers import DialogueStateTracker
+
+logger = logging.getLogger(__name__)
+
+class SQLiteTrackerStore(TrackerStore):
+    """Stores conversation trackers in SQLite; see the module docstring."""
+
+    def __init__(self, domain, host=None, db="trackers.db", ttl=24 * 3600, hot_set_size=1000,
+                 sweep_interval=300, compression_level=6, event_broker=None, **kwargs):
+        self.db_path = db or host or "trackers.db"
+        self.ttl = float(ttl)
+        self.hot_set_size = int(hot_set_size)
+        self.sweep_interval = float(sweep_interval)
+        self.compression_level = int(compression_level)
+        self._hot = OrderedDict() # sender_id -> (serialized dialogue JSON, updated_at)
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL") # Readers don't block the writer
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS trackers ("
+            " sender_id TEXT PRIMARY KEY, updated_at REAL NOT NULL, dialogue BLOB NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS trackers_updated_at ON trackers (updated_at)")
+        self._conn.commit()
+        super().__init__(domain, event_broker, **kwargs)
+
+    # --- TrackerStore interface ---
+
+    async def save(self, tracker: DialogueStateTracker) -> None:
+        if self.event_broker:
+            await self.stream_events(tracker)
+        await self._off_loop(self._save, tracker)
+
+    async def retrieve(self, sender_id):
+        return await self._off_loop(self._retrieve, sender_id)
+
+    async def keys(self):
+        return await self._off_loop(self._keys)
+
+    async def delete(self, sender_id):
+        """Drops the conversation from the hot set and the database."""
+        await self._off_loop(self._delete, sender_id)
+
+    @staticmethod
+    def serialise_tracker(tracker):
+        # Compact separators: the dialogue JSON is mostly event dicts, so this trims a good share of it
+        return json.dumps(tracker.as_dialogue().as_dict(), separators=(",", ":"))
+
+    # --- Blocking work (default thread pool) ---
+
+    @staticmethod
+    async def _off_loop(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _save(self, tracker):
+        serialized = self.serialise_tracker(tracker)
+        compressed = zlib.compress(serialized.encode("utf-8"), self.compression_level)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trackers (sender_id, updated_at, dialogue) VALUES (?, ?, ?)",
+                (tracker.sender_id, now, compressed))
+            self._conn.commit()
+            self._remember(tracker.sender_id, serialized, now)
+            if now - self._swept_at > self.sweep_interval:
+                self._sweep(now)
+
+    def _retrieve(self, sender_id):
+        now = time.time()
+        with self._lock:
+            serialized = self._lookup(sender_id, now)
+        if serialized is None:
+            return None
+        return self.deserialise_tracker(sender_id, serialized)
+
+    def _keys(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sender_id FROM trackers WHERE updated_at >= ?", (time.time() - self.ttl,)).fetchall()
+        return [sender_id for sender_id, in rows]
+
+    def _delete(self, sender_id):
+        with self._lock:
+            self._evict(sender_id)
+
+    # --- Internals (caller holds self._lock) ---
+
+    def _lookup(self, sender_id, now):
+        entry = self._hot.get(sender_id)
+        if entry is not None:
+            serialized, updated_at = entry
+            if now - updated_at <= self.ttl:
+                self._hot.move_to_end(sender_id)
+                return serialized
+            self._evict(sender_id)
+            return None
+
+        row = self._conn.execute(
+            "SELECT dialogue, updated_at FROM trackers WHERE sender_id = ?", (sender_id,)).fetchone()
+        if row is None:
+            return None
+        dialogue, updated_at = row
+        if now - updated_at > self.ttl:
+            self._evict(sender_id)
+            return None
+        serialized = zlib.decompress(dialogue).decode("utf-8")
+        self._remember(sender_id, serialized, updated_at)
+        return serialized
+
+    def _remember(self, sender_id, serialized, updated_at):
+        if self.hot_set_size <= 0:
+            return
+        self._hot[sender_id] = (serialized, updated_at)
+        self._hot.move_to_end(sender_id)
+        while len(self._hot) > self.hot_set_size:
+            self._hot.popitem(last=False)
+
+    def _evict(self, sender_id):
+        self._hot.pop(sender_id, None)
+        self._conn.execute("DELETE FROM trackers WHERE sender_id = ?", (sender_id,))
+        self._conn.commit()
+
+    def _sweep(self, now):
+        """Deletes every conversation idle for longer than the TTL."""
+        cutoff = now - self.ttl
+        deleted = self._conn.execute("DELETE FROM trackers WHERE updated_at < ?", (cutoff,)).rowcount
+        self._conn.commit()
+        for sender_id in [s for s, (_, updated_at) in self._hot.items() if updated_at < cutoff]:
+            del self._hot[sender_id]
+        self._swept_at = now
+        if deleted:
+            logger.info(f"Tracker store: evicted {deleted} conversations idle for more than {self.ttl:.0f}s")